@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tekrar Eden Alanların Birleştirilmesi
+Aynı alan birden çok kaynakta (ör. pendik_pdf_1 / pendik_pdf_2, sile.json / Şile.json)
+tekrar edebilir. Alanlar normalize edilmiş ad, mahalle, ilçe ve koordinat hash'i ile
+gruplanır (O(n)); her gruptan en dolu kayıt kanonik kalır, boş veya sıfır alanları
+gruptaki diğer kayıtlardan doldurulur ve diğerlerinin id'leri alias_ids, alan anahtarları
+(area_key, ilçe/alan_id#sıra) alias_keys olarak eklenir.
+Aynı alan için farklı dolu değerler çakışma olarak loglanır.
+"""
+
+import hashlib
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from turkish_text import ascii_fold, normalize_query
+
+logger = logging.getLogger(__name__)
+
+# ~1 metre hassasiyet
+COORDINATE_DECIMALS = 5
+
+# Tekrarlar arasında birleştirilen alanlar (full_data anahtarlarıyla aynı adlı olanlar)
+MERGE_FIELDS = ('alan_bilgileri', 'altyapi', 'ulasim', 'ozellikler')
+
+
+def _normalize(value: Any) -> str:
+    return ascii_fold(normalize_query(str(value or '')))
+
+
+def dedup_key(meta: Dict[str, Any]) -> str:
+    """Ad, mahalle, ilçe ve koordinattan gruplama hash'i üretir"""
+    koordinat = meta.get('koordinat') or {}
+    lat = round(float(koordinat.get('lat', 0) or 0), COORDINATE_DECIMALS)
+    lng = round(float(koordinat.get('lng', 0) or 0), COORDINATE_DECIMALS)
+    parts = [
+        _normalize(meta.get('alan_adi')),
+        _normalize(meta.get('mahalle')),
+        _normalize(meta.get('ilce')),
+        f"{lat:.{COORDINATE_DECIMALS}f},{lng:.{COORDINATE_DECIMALS}f}"
+    ]
+    return hashlib.sha1('\x00'.join(parts).encode('utf-8')).hexdigest()
+
+
+def _is_empty(value: Any) -> bool:
+    """Boş, sıfır veya False değerler eksik bilgi sayılır"""
+    return value in (None, '', 0, False) or (isinstance(value, (dict, list)) and not value)
+
+
+def _completeness(meta: Dict[str, Any]) -> int:
+    """Kayıttaki dolu alan sayısı (iç içe alanlar yaprak bazında)"""
+    count = 0
+    for field in MERGE_FIELDS:
+        value = meta.get(field)
+        if isinstance(value, dict):
+            count += sum(1 for item in value.values() if not _is_empty(item))
+        elif not _is_empty(value):
+            count += 1
+    return count
+
+
+def _merge_into(base: Dict[str, Any], other: Dict[str, Any]) -> List[str]:
+    """Tabandaki boş alanları diğer kayıttan doldurur; farklı dolu değerli alanları döner"""
+    conflicts = []
+    for field in MERGE_FIELDS:
+        value, other_value = base.get(field), other.get(field)
+        if isinstance(value, dict) or isinstance(other_value, dict):
+            merged = dict(value or {})
+            for key, item in (other_value or {}).items():
+                if _is_empty(merged.get(key)):
+                    if not _is_empty(item):
+                        merged[key] = item
+                elif not _is_empty(item) and item != merged[key]:
+                    conflicts.append(f"{field}.{key}")
+            base[field] = merged
+        elif _is_empty(value):
+            if not _is_empty(other_value):
+                base[field] = other_value
+        elif not _is_empty(other_value) and other_value != value:
+            conflicts.append(field)
+    return conflicts
+
+
+def collapse_duplicates(documents: Sequence[str], metadata: Sequence[Dict[str, Any]],
+                        document_for: Optional[Callable[[Dict[str, Any]], str]] = None
+                        ) -> Tuple[List[str], List[Dict[str, Any]], int]:
+    """
+    Tekrar eden alanları birleştirir; (dokümanlar, metadata, birleştirilen sayısı) döner.
+    document_for verilirse eksikleri doldurulan kayıtların doküman metni yeniden üretilir.
+    """
+    groups: Dict[str, List[int]] = {}
+    for row, meta in enumerate(metadata):
+        groups.setdefault(dedup_key(meta), []).append(row)
+
+    kept_documents: List[str] = []
+    kept_metadata: List[Dict[str, Any]] = []
+    conflict_groups = 0
+    for rows in groups.values():
+        # En dolu kayıt taban olur (eşitlikte ilk görülen), boş alanları diğerlerinden doldurulur
+        base_row = max(rows, key=lambda row: (_completeness(metadata[row]), -row))
+        base = {**metadata[base_row], 'alias_ids': [], 'alias_keys': []}
+        filled = False
+        conflicts: List[str] = []
+        for row in rows:
+            if row == base_row:
+                continue
+            meta = metadata[row]
+            before = _completeness(base)
+            conflicts.extend(_merge_into(base, meta))
+            filled = filled or _completeness(base) > before
+
+            alias_id = meta.get('alan_id', '')
+            if alias_id != base.get('alan_id') and alias_id not in base['alias_ids']:
+                base['alias_ids'].append(alias_id)
+            # Aynı alan_id tekrar ediyorsa (#1, #2...) canlı durum ancak tam anahtarla bulunur
+            if meta.get('area_key'):
+                base['alias_keys'].append(meta['area_key'])
+
+        if conflicts:
+            conflict_groups += 1
+            logger.warning(f"Tekrar eden alan çakışması ({base.get('ilce', '')}/{base.get('alan_id', '')}, "
+                           f"alias: {', '.join(base['alias_ids'])}): {', '.join(sorted(set(conflicts)))}; "
+                           f"en dolu kaydın değeri kullanıldı")
+
+        if filled:
+            # full_data (diske yazılmaz) birleştirilmiş alanlarla uyumlu tutulur
+            if isinstance(base.get('full_data'), dict):
+                base['full_data'] = {**base['full_data'],
+                                     **{field: base[field] for field in MERGE_FIELDS if field in base}}
+            document = document_for(base) if document_for is not None else documents[base_row]
+        else:
+            document = documents[base_row]
+        kept_documents.append(document)
+        kept_metadata.append(base)
+
+    collapsed = len(metadata) - len(kept_metadata)
+    logger.info(f"Tekrar eden alan birleştirme: {len(metadata)} -> {len(kept_metadata)} "
+                f"({collapsed} kayıt birleştirildi, {conflict_groups} grupta çakışan değer)")
+    return kept_documents, kept_metadata, collapsed
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Öznitelik Filtreleri
+Alanların altyapı bayraklarını (elektrik, su, wc, kanalizasyon) bit maskesi,
+toplam alanını sayısal sütun, tür ve durumunu kategori kodu olarak tutar. Yapısal
+filtreler (ör. {"altyapi": ["su", "wc"], "min_alan": 10000}) bu sütunlar üzerinde
+vektörize değerlendirilip izin verilen satır maskesine çevrilir; vektör araması bu
+maskeyle ön filtre (IDSelector) veya uyarlamalı son filtre olarak daraltılır.
+
+Desteklenen filtreler:
+    altyapi:  olması gereken altyapı bayrakları (hepsi)
+    min_alan: en az toplam alan (m²)
+    max_alan: en çok toplam alan (m²)
+    tur:      izin verilen türler (ör. ["Park", "Boş Alan"])
+    durum:    izin verilen durumlar (ör. ["Aktif"])
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from turkish_text import normalize_query
+
+logger = logging.getLogger(__name__)
+
+# Bit sırası diskteki sütunun anlamını belirler, sadece sona eklenmeli
+ALTYAPI_FLAGS = ('elektrik', 'su', 'wc', 'kanalizasyon')
+
+FILTER_KEYS = ('altyapi', 'min_alan', 'max_alan', 'tur', 'durum')
+
+
+def _as_list(value: Any) -> List[str]:
+    if isinstance(value, str):
+        value = value.split(',')
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+def normalize_filters(filters: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Filtreleri doğrular ve önbellek anahtarı için tek biçime getirir (boşsa None)"""
+    if not filters:
+        return None
+    if not isinstance(filters, dict):
+        raise ValueError("Filtreler JSON nesnesi olmalı")
+
+    unknown = set(filters) - set(FILTER_KEYS)
+    if unknown:
+        raise ValueError(f"Bilinmeyen filtre: {', '.join(sorted(unknown))} (seçenekler: {', '.join(FILTER_KEYS)})")
+
+    normalized: Dict[str, Any] = {}
+    if filters.get('altyapi'):
+        flags = sorted({normalize_query(flag) for flag in _as_list(filters['altyapi'])})
+        invalid = [flag for flag in flags if flag not in ALTYAPI_FLAGS]
+        if invalid:
+            raise ValueError(f"Bilinmeyen altyapı: {', '.join(invalid)} (seçenekler: {', '.join(ALTYAPI_FLAGS)})")
+        normalized['altyapi'] = flags
+
+    for key in ('min_alan', 'max_alan'):
+        if filters.get(key) is not None:
+            try:
+                normalized[key] = float(filters[key])
+            except (TypeError, ValueError):
+                raise ValueError(f"{key} sayı olmalı")
+
+    for key in ('tur', 'durum'):
+        if filters.get(key):
+            normalized[key] = sorted({normalize_query(value) for value in _as_list(filters[key])})
+
+    return normalized or None
+
+
+def _encode_categories(values: Sequence[str]):
+    """Değerleri (normalize edilmiş) kategori kodlarına çevirir"""
+    vocabulary: Dict[str, int] = {}
+    codes = np.fromiter((vocabulary.setdefault(normalize_query(value), len(vocabulary)) for value in values),
+                        dtype=np.int32, count=len(values))
+    return codes, sorted(vocabulary, key=vocabulary.get)
+
+
+class AttributeColumns:
+    def __init__(self, altyapi: np.ndarray, toplam_alan: np.ndarray,
+                 tur_codes: np.ndarray, tur_values: List[str],
+                 durum_codes: np.ndarray, durum_values: List[str]):
+        self.altyapi = np.asarray(altyapi, dtype=np.uint8)
+        self.toplam_alan = np.asarray(toplam_alan, dtype=np.float64)
+        self.tur_codes = np.asarray(tur_codes, dtype=np.int32)
+        self.tur_values = list(tur_values)
+        self.durum_codes = np.asarray(durum_codes, dtype=np.int32)
+        self.durum_values = list(durum_values)
+
+    def __len__(self) -> int:
+        return len(self.altyapi)
+
+    @classmethod
+    def from_metadata(cls, metadata: Iterable[Dict[str, Any]]) -> "AttributeColumns":
+        """Metadata kayıtlarından sütunları çıkarır"""
+        altyapi, toplam_alan, turler, durumlar = [], [], [], []
+        for meta in metadata:
+            flags = meta.get('altyapi') or {}
+            altyapi.append(sum(1 << bit for bit, name in enumerate(ALTYAPI_FLAGS) if flags.get(name)))
+            try:
+                toplam_alan.append(float((meta.get('alan_bilgileri') or {}).get('toplam_alan', 0) or 0))
+            except (TypeError, ValueError):
+                toplam_alan.append(0.0)
+            ozellikler = meta.get('ozellikler') or {}
+            turler.append(ozellikler.get('tur', '') or '')
+            durumlar.append(ozellikler.get('durum', '') or '')
+
+        tur_codes, tur_values = _encode_categories(turler)
+        durum_codes, durum_values = _encode_categories(durumlar)
+        return cls(np.asarray(altyapi, dtype=np.uint8), np.asarray(toplam_alan, dtype=np.float64),
+                   tur_codes, tur_values, durum_codes, durum_values)
+
+    def save(self, path: Path):
+        """Sütunları .npz dosyasına kaydeder"""
+        with open(path, 'wb') as f:
+            np.savez(f, altyapi=self.altyapi, toplam_alan=self.toplam_alan,
+                     tur_codes=self.tur_codes, durum_codes=self.durum_codes,
+                     values=np.asarray(json.dumps({'tur': self.tur_values, 'durum': self.durum_values},
+                                                  ensure_ascii=False)))
+
+    @classmethod
+    def load(cls, path: Path) -> "AttributeColumns":
+        """Kaydedilmiş sütunları yükler"""
+        with np.load(path) as data:
+            values = json.loads(str(data['values']))
+            return cls(data['altyapi'], data['toplam_alan'], data['tur_codes'], values['tur'],
+                       data['durum_codes'], values['durum'])
+
+    def _category_mask(self, codes: np.ndarray, vocabulary: List[str], allowed: List[str]) -> np.ndarray:
+        allowed_codes = [code for code, value in enumerate(vocabulary) if value in allowed]
+        return np.isin(codes, allowed_codes)
+
+    def mask(self, filters: Optional[Dict[str, Any]]) -> np.ndarray:
+        """Filtrelere uyan satırların boolean maskesi (filtreler normalize_filters çıktısı)"""
+        allowed = np.ones(len(self), dtype=bool)
+        if not filters:
+            return allowed
+
+        if filters.get('altyapi'):
+            required = sum(1 << ALTYAPI_FLAGS.index(flag) for flag in filters['altyapi'])
+            allowed &= (self.altyapi & required) == required
+        if filters.get('min_alan') is not None:
+            allowed &= self.toplam_alan >= filters['min_alan']
+        if filters.get('max_alan') is not None:
+            allowed &= self.toplam_alan <= filters['max_alan']
+        if filters.get('tur'):
+            allowed &= self._category_mask(self.tur_codes, self.tur_values, filters['tur'])
+        if filters.get('durum'):
+            allowed &= self._category_mask(self.durum_codes, self.durum_values, filters['durum'])
+        return allowed
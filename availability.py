@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Canlı Doluluk Katmanı
+Olay sırasında dolan veya güvenli olmayan toplanma alanlarının durumunu (open/full/closed)
+ve doluluk sayacını index'i yeniden kurmadan tutar. alan_id'ler ilçeler arasında ve aynı
+ilçe içinde tekrar edebildiğinden (ör. tuzla_12) kayıtlar manifest'teki tekil alan
+anahtarıyla (ilçe/alan_id#sıra, metadata'da area_key) anahtarlanır ve memory-mapped bir
+açık adresli hash tablosunda (faiss_index/availability.bin) saklanır; arama her aday için
+kendi anahtarının ve birleştirilmiş tekrarlarının (alias_keys) yuvalarına bakar, en ağır
+durum (kapalı > dolu > açık) geçerli olur.
+
+Dosya paylaşımlı mmap ile açıldığından bu script'ten veya sunucunun set_availability
+işleminden yapılan güncelleme çalışan sunucuda bir sonraki sorguda görünür. Her yazma
+başlıktaki sürümü artırır, sonuç önbelleği bu sürümle anahtarlanır.
+
+Kullanım:
+    python3 availability.py set kadıköy_pdf_1 --ilce Kadıköy --status full --occupancy 850
+    python3 availability.py set "tuzla/tuzla_12#1" --status closed
+    python3 availability.py get kadıköy_pdf_1 --ilce Kadıköy
+    python3 availability.py list
+    python3 availability.py reset
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from index_manifest import area_key
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = int.from_bytes(b'REACHAV2', 'little')
+DEFAULT_CAPACITY = 1024
+MAX_LOAD = 0.7
+
+# Durum kodları (0: boş yuva)
+OPEN, FULL, CLOSED = 1, 2, 3
+STATUS_CODES = {'open': OPEN, 'full': FULL, 'closed': CLOSED}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+
+# Başlık: sihirli sayı, yuva sayısı, sürüm, kayıt sayısı, kapalı alan sayısı, emekli bayrağı
+HEADER_WORDS = 8
+_MAGIC, _CAPACITY, _VERSION, _COUNT, _CLOSED, _RETIRED = range(6)
+HEADER_BYTES = HEADER_WORDS * 8
+
+SLOT_DTYPE = np.dtype([
+    ('key', '<u8'),
+    ('occupancy', '<u4'),
+    ('status', 'u1'),
+    ('_pad', 'u1', (3,)),
+    ('updated', '<f8'),
+    ('area_key', 'S96')
+])
+
+
+def normalize_area_key(key: str, ilce: Optional[str] = None, occurrence: int = 0) -> str:
+    """ilçe verilirse alan_id'den, verilmezse ilçe/alan_id[#sıra] metninden alan anahtarı üretir"""
+    key = str(key).strip()
+    if ilce is not None:
+        return area_key(ilce, key, occurrence)
+    if '/' not in key:
+        raise ValueError(f"Alan anahtarı ilçe/alan_id[#sıra] biçiminde olmalı veya ilçe verilmeli: {key}")
+    ilce, alan_id = key.split('/', 1)
+    if '#' in alan_id:
+        alan_id, sira = alan_id.rsplit('#', 1)
+        try:
+            occurrence = int(sira)
+        except ValueError:
+            raise ValueError(f"Geçersiz sıra numarası: {sira}")
+    return area_key(ilce, alan_id, occurrence)
+
+
+def availability_keys(meta: Dict[str, Any]) -> List[str]:
+    """Kaydın katmanda bakılacak anahtarları: kendi alan anahtarı ve birleştirilen tekrarlarınınkiler"""
+    # area_key'i olmayan eski index'lerde ilk sıra varsayılır; alias_ids'ten anahtar tahmin edilmez
+    # (tekrar eden alan_id'de #0 başka bir alan olabilir), tekrarlar alias_keys ile bulunur
+    keys = [meta.get('area_key') or area_key(meta.get('ilce', '') or '', meta.get('alan_id', ''))]
+    keys.extend(meta.get('alias_keys') or [])
+    return keys
+
+
+@lru_cache(maxsize=65536)
+def table_key(key: str) -> int:
+    """Alan anahtarından sıfır olmayan 64 bit tablo anahtarı üretir"""
+    digest = hashlib.blake2b(str(key).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') or 1
+
+
+class AvailabilityOverlay:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + '.lock')
+        self._header: Optional[np.ndarray] = None
+        self._table: Optional[np.ndarray] = None
+
+    def _map(self):
+        """Dosyayı paylaşımlı mmap ile açar (yoksa katman boştur)"""
+        self._header = self._table = None
+        if not self.path.exists():
+            return
+        header = np.memmap(self.path, dtype='<u8', mode='r+', shape=(HEADER_WORDS,))
+        if int(header[_MAGIC]) != MAGIC:
+            logger.error(f"Geçersiz doluluk dosyası: {self.path}")
+            return
+        # memmap alt sınıfı her indekslemede ek yük getirir, aynı belleğe düz ndarray görünümü kullanılır
+        self._header = header.view(np.ndarray)
+        self._table = np.memmap(self.path, dtype=SLOT_DTYPE, mode='r+', offset=HEADER_BYTES,
+                                shape=(int(header[_CAPACITY]),)).view(np.ndarray)
+
+    def _current(self) -> bool:
+        """Eşlemeyi günceller; tablo büyütüldüyse (eski dosya emekli) yeni dosyayı açar"""
+        if self._header is None or self._header[_RETIRED]:
+            self._map()
+        return self._header is not None
+
+    @property
+    def version(self) -> int:
+        return int(self._header[_VERSION]) if self._current() else 0
+
+    @property
+    def closed_count(self) -> int:
+        """Kapalı alan sayısı (aramada elenecek en fazla aday sayısı)"""
+        return int(self._header[_CLOSED]) if self._current() else 0
+
+    def __len__(self) -> int:
+        return int(self._header[_COUNT]) if self._current() else 0
+
+    def _probe(self, keys: np.ndarray) -> np.ndarray:
+        """Anahtarların yuva numaraları (bulunamayan: -1), doğrusal yoklama vektörize"""
+        keys = np.asarray(keys, dtype=np.uint64)
+        found = np.full(len(keys), -1, dtype=np.int64)
+        if not self._current() or len(keys) == 0:
+            return found
+
+        table_keys = self._table['key']
+        mask = np.uint64(len(table_keys) - 1)
+        slots = keys & mask
+        pending = np.arange(len(keys))
+        for _ in range(len(table_keys)):
+            slot_keys = table_keys[slots[pending]]
+            hit = slot_keys == keys[pending]
+            found[pending[hit]] = slots[pending[hit]]
+            pending = pending[~hit & (slot_keys != 0)]
+            if len(pending) == 0:
+                break
+            slots[pending] = (slots[pending] + np.uint64(1)) & mask
+        return found
+
+    def lookup(self, keys: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Alan anahtarlarının durum kodlarını ve doluluklarını döner (kaydı olmayan: 0)"""
+        status = np.zeros(len(keys), dtype=np.uint8)
+        occupancy = np.zeros(len(keys), dtype=np.uint32)
+        slots = self._probe(np.fromiter((table_key(key) for key in keys), dtype=np.uint64, count=len(keys)))
+        hit = slots >= 0
+        if hit.any():
+            entries = self._table[slots[hit]]
+            status[hit] = entries['status']
+            occupancy[hit] = entries['occupancy']
+        return status, occupancy
+
+    def lookup_areas(self, key_groups: Sequence[Sequence[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Her alan için anahtar grubunun (availability_keys) en ağır durumu ve en yüksek doluluğu"""
+        sizes = np.fromiter((len(keys) for keys in key_groups), dtype=np.int64, count=len(key_groups))
+        if len(sizes) == 0 or sizes.max() <= 1:
+            return self.lookup([keys[0] if keys else '' for keys in key_groups])
+
+        status, occupancy = self.lookup([key for keys in key_groups for key in keys])
+        # Durum kodları ağırlık sırasında (açık < dolu < kapalı), gruplar bitişik
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        return np.maximum.reduceat(status, starts), np.maximum.reduceat(occupancy, starts)
+
+    def _entry(self, slot: int) -> Dict[str, Any]:
+        entry = self._table[slot]
+        return {
+            'area_key': bytes(entry['area_key']).decode('utf-8', errors='ignore'),
+            'status': STATUS_NAMES.get(int(entry['status']), 'open'),
+            'occupancy': int(entry['occupancy']),
+            'updated_at': float(entry['updated'])
+        }
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        slot = int(self._probe(np.asarray([table_key(key)], dtype=np.uint64))[0])
+        return self._entry(slot) if slot >= 0 else None
+
+    def entries(self) -> List[Dict[str, Any]]:
+        if not self._current():
+            return []
+        return [self._entry(int(slot)) for slot in np.flatnonzero(self._table['key'])]
+
+    def _locked(self):
+        """Yazıcılar arası dosya kilidi (fcntl yoksa kilitsiz)"""
+        handle = open(self.lock_path, 'a+')
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        return handle
+
+    def _create(self, path: Path, capacity: int) -> Tuple[np.ndarray, np.ndarray]:
+        with open(path, 'wb') as f:
+            f.truncate(HEADER_BYTES + capacity * SLOT_DTYPE.itemsize)
+        header = np.memmap(path, dtype='<u8', mode='r+', shape=(HEADER_WORDS,))
+        header[_MAGIC] = MAGIC
+        header[_CAPACITY] = capacity
+        table = np.memmap(path, dtype=SLOT_DTYPE, mode='r+', offset=HEADER_BYTES, shape=(capacity,))
+        return header, table
+
+    def _grow(self, capacity: int, keep_entries: bool = True):
+        """
+        Daha büyük (keep_entries=False ise boş) tabloya yeniden yazar; eski dosya emekli işaretlenir,
+        okuyucular yeniden açar. Boşaltmada sürüm bir artar, eski sürümle anahtarlanmış önbellekler geçersiz olur.
+        """
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        header, table = self._create(tmp_path, capacity)
+        if self._table is not None and not keep_entries:
+            header[_VERSION] = self._header[_VERSION] + 1
+        elif self._table is not None:
+            old = self._table[self._table['key'] != 0]
+            mask = np.uint64(capacity - 1)
+            for entry in old:
+                slot = int(entry['key'] & mask)
+                while table['key'][slot] != 0:
+                    slot = (slot + 1) & int(mask)
+                table[slot] = entry
+            header[_VERSION] = self._header[_VERSION]
+            header[_COUNT] = self._header[_COUNT]
+            header[_CLOSED] = self._header[_CLOSED]
+        header.flush()
+        table.flush()
+        os.replace(tmp_path, self.path)
+
+        if self._header is not None:
+            self._header[_RETIRED] = 1
+        self._map()
+
+    def set(self, key: str, status: Optional[str] = None,
+            occupancy: Optional[int] = None) -> Dict[str, Any]:
+        """Alanın (alan anahtarı ile) durumunu ve/veya doluluğunu günceller, güncel kaydı döner"""
+        if status is not None and status not in STATUS_CODES:
+            raise ValueError(f"Bilinmeyen durum: {status} (seçenekler: {', '.join(STATUS_CODES)})")
+        if occupancy is not None and int(occupancy) < 0:
+            raise ValueError("Doluluk negatif olamaz")
+
+        with self._locked():
+            self._current()
+            text_key, key = key, table_key(key)
+            slot = int(self._probe(np.asarray([key], dtype=np.uint64))[0])
+
+            if slot < 0:
+                # Yeni kayıt; doluluk oranı aşılacaksa tablo iki katına çıkar
+                capacity = len(self._table) if self._table is not None else DEFAULT_CAPACITY
+                if self._table is None or len(self) + 1 > capacity * MAX_LOAD:
+                    while len(self) + 1 > capacity * MAX_LOAD:
+                        capacity *= 2
+                    self._grow(capacity)
+                mask = np.uint64(len(self._table) - 1)
+                slot = int(np.uint64(key) & mask)
+                while self._table['key'][slot] != 0:
+                    slot = (slot + 1) & int(mask)
+                self._table['area_key'][slot] = str(text_key).encode('utf-8')[:SLOT_DTYPE['area_key'].itemsize]
+                self._table['status'][slot] = OPEN
+                self._header[_COUNT] += 1
+
+            previous = int(self._table['status'][slot])
+            if status is not None:
+                self._table['status'][slot] = STATUS_CODES[status]
+                if STATUS_CODES[status] == CLOSED and previous != CLOSED:
+                    self._header[_CLOSED] += 1
+                elif STATUS_CODES[status] != CLOSED and previous == CLOSED:
+                    self._header[_CLOSED] -= 1
+            if occupancy is not None:
+                self._table['occupancy'][slot] = int(occupancy)
+            self._table['updated'][slot] = time.time()
+
+            # Anahtar en son yazılır, okuyucu yarım kayıt görmez; sürüm önbellekleri geçersiz kılar
+            self._table['key'][slot] = key
+            self._header[_VERSION] += 1
+            return self._entry(slot)
+
+    def reset(self):
+        """Tüm kayıtları siler (tüm alanlar açık sayılır); sürüm sıfırlanmaz, artmaya devam eder"""
+        with self._locked():
+            if self._current():
+                self._grow(DEFAULT_CAPACITY, keep_entries=False)
+
+
+def main():
+    """Ana fonksiyon"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Toplanma alanı canlı durum katmanı")
+    parser.add_argument('command', choices=('set', 'get', 'list', 'reset'))
+    parser.add_argument('alan', nargs='?', help="alan_id (--ilce ile) veya ilçe/alan_id[#sıra] alan anahtarı")
+    parser.add_argument('--ilce', help="Alanın ilçesi (alan_id'ler ilçeler arasında tekrar eder)")
+    parser.add_argument('--occurrence', type=int, default=0,
+                        help="Aynı ilçede tekrar eden alan_id'nin sıra numarası (area_key'deki #sıra)")
+    parser.add_argument('--status', choices=tuple(STATUS_CODES))
+    parser.add_argument('--occupancy', type=int)
+    parser.add_argument('--index-dir', default="faiss_index")
+    args = parser.parse_args()
+
+    overlay = AvailabilityOverlay(Path(args.index_dir) / "availability.bin")
+    if args.command in ('set', 'get'):
+        if not args.alan:
+            parser.error(f"{args.command} için alan_id gerekli")
+        try:
+            key = normalize_area_key(args.alan, args.ilce, args.occurrence)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.command == 'set':
+        if args.status is None and args.occupancy is None:
+            parser.error("--status veya --occupancy gerekli")
+        result: Any = overlay.set(key, args.status, args.occupancy)
+    elif args.command == 'get':
+        result = overlay.get(key)
+    elif args.command == 'list':
+        result = overlay.entries()
+    else:
+        overlay.reset()
+        result = {'reset': True}
+
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+FAISS Index Tipi Karşılaştırması
+Toplanma alanı vektörleri üzerinde her index tipini kurar; kurulum süresi, bellek
+(serileştirilmiş boyut), sorgu gecikmesi (p50/p99) ve tam Flat index'e göre
+recall@k değerlerini raporlar. Sorgular test_search sorguları ile korpustan
+türetilen sentetik sorgulardır.
+
+Kullanım:
+    python benchmark_index_types.py
+    python benchmark_index_types.py --scale 20 --types flat ivf_flat hnsw --json
+"""
+
+import sys
+import json
+import time
+import argparse
+import logging
+from typing import Any, Dict, List
+
+import numpy as np
+import faiss
+
+from faiss_indexer import TEST_QUERIES, ToplanmaAlanlariIndexer
+from index_types import INDEX_TYPES, configure_search, create_index, factory_string, train_index
+
+logger = logging.getLogger(__name__)
+
+
+def load_corpus(index_dir: str) -> ToplanmaAlanlariIndexer:
+    """Kayıtlı index'i yükler"""
+    indexer = ToplanmaAlanlariIndexer(index_dir=index_dir)
+    if not indexer.load_index():
+        raise SystemExit("Index bulunamadı, önce 'python faiss_indexer.py' çalıştırın")
+    return indexer
+
+
+def scale_corpus(embeddings: np.ndarray, scale: int, rng: np.random.Generator) -> np.ndarray:
+    """Daha büyük bir veri setini (ör. tüm iller) taklit etmek için gürültülü kopyalar ekler"""
+    if scale <= 1:
+        return embeddings
+    noise = embeddings.std(axis=0) * 0.3
+    copies = [embeddings]
+    for _ in range(scale - 1):
+        copies.append(embeddings + rng.normal(size=embeddings.shape).astype('float32') * noise)
+    return np.vstack(copies).astype('float32')
+
+
+def build_queries(indexer: ToplanmaAlanlariIndexer, embeddings: np.ndarray, synthetic: int,
+                  rng: np.random.Generator) -> np.ndarray:
+    """test_search sorguları (model varsa) + korpus vektörlerinden gürültülü sentetik sorgular"""
+    queries = []
+    if indexer.model is not None:
+        queries.append(np.asarray(indexer.model.encode(TEST_QUERIES), dtype='float32'))
+    else:
+        logger.warning("Model yüklenemedi, sadece sentetik sorgular kullanılacak")
+
+    rows = rng.integers(0, len(embeddings), size=synthetic)
+    noise = embeddings.std(axis=0) * 0.5
+    queries.append(embeddings[rows] + rng.normal(size=(synthetic, embeddings.shape[1])).astype('float32') * noise)
+    return np.vstack(queries).astype('float32')
+
+
+def measure(index_type: str, embeddings: np.ndarray, queries: np.ndarray,
+            exact: np.ndarray, k: int) -> Dict[str, Any]:
+    """Tek bir index tipini kurar ve ölçer"""
+    start = time.perf_counter()
+    index = create_index(index_type, embeddings.shape[1], len(embeddings), id_map=False)
+    train_index(index, embeddings)
+    index.add(embeddings)
+    configure_search(index)
+    build_s = time.perf_counter() - start
+
+    # Gerçek sunucu gibi sorgu sorgu ölçülür
+    latencies = []
+    found = np.empty((len(queries), k), dtype='int64')
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        _, ids = index.search(query[None, :], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        found[i] = ids[0]
+
+    recall = np.mean([len(set(f) & set(e)) / k for f, e in zip(found, exact)])
+    return {
+        'index_type': index_type,
+        'factory': factory_string(index_type, embeddings.shape[1], len(embeddings)),
+        'build_s': round(build_s, 3),
+        'size_mb': round(faiss.serialize_index(index).nbytes / 1024 / 1024, 2),
+        'p50_ms': round(float(np.percentile(latencies, 50)), 3),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 3),
+        f'recall@{k}': round(float(recall), 4)
+    }
+
+
+def main():
+    """Ana fonksiyon"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--index-dir', default="faiss_index")
+    parser.add_argument('--types', nargs='+', choices=INDEX_TYPES, default=list(INDEX_TYPES))
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--synthetic', type=int, default=500, help="Sentetik sorgu sayısı")
+    parser.add_argument('--scale', type=int, default=1,
+                        help="Korpusu gürültülü kopyalarla N katına çıkarır")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help="Sonuçları JSON olarak yazar")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    indexer = load_corpus(args.index_dir)
+    embeddings = scale_corpus(np.ascontiguousarray(indexer._row_embeddings(), dtype='float32'),
+                              args.scale, rng)
+    queries = build_queries(indexer, embeddings, args.synthetic, rng)
+    k = min(args.k, len(embeddings))
+
+    # Doğruluk referansı: tam (exhaustive) Flat arama
+    exact_index = faiss.IndexFlatL2(embeddings.shape[1])
+    exact_index.add(embeddings)
+    _, exact = exact_index.search(queries, k)
+
+    logger.info(f"{len(embeddings)} vektör, {len(queries)} sorgu, k={k}")
+    results: List[Dict[str, Any]] = [measure(t, embeddings, queries, exact, k) for t in args.types]
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    columns = list(results[0].keys())
+    print(" | ".join(f"{c:>18}" for c in columns))
+    for row in results:
+        print(" | ".join(f"{str(row[c]):>18}" for c in columns))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
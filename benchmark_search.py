@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Arama Gecikmesi ve Kalitesi Karşılaştırması
+Arama yığınını uçtan uca ölçer ve sonuçları JSON olarak yazar (commit'ler arası
+karşılaştırma için):
+  - Soğuk başlangıç: faiss_search.py / ilkyardim_search.py'nin ayrı process olarak
+    çalıştırılma süresi (p50/p95/p99)
+  - Sıcak gecikme: yüklü index üzerinde sorgu başına gecikme (sonuç önbelleği kapalı
+    ve açık)
+  - Verim: farklı eşzamanlılık seviyelerinde sorgu/saniye
+  - Kalite: benchmark_queries.json'daki etiketli sorgular için recall@k, precision@k
+    ve MRR@k (etiketler ilçe/tür/ad koşullarıdır, alan id'lerine bağlı değildir)
+
+Kullanım:
+    python benchmark_search.py --output bench.json
+    python benchmark_search.py --target server --concurrency 1 4 16
+    python benchmark_search.py --baseline bench_onceki.json   # gerileme varsa çıkış kodu 1
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import platform
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from turkish_text import ascii_fold, turkish_lower
+
+logger = logging.getLogger(__name__)
+
+COLLECTIONS = ('toplanma', 'ilkyardim')
+
+# Soğuk başlangıçta çalıştırılan CLI script'leri
+CLI_SCRIPTS = {
+    'toplanma': 'faiss_search.py',
+    'ilkyardim': 'ilkyardim_search.py'
+}
+
+DEFAULT_QUERIES_FILE = Path(__file__).parent / "benchmark_queries.json"
+
+
+def _fold(text: Any) -> str:
+    return ascii_fold(turkish_lower(str(text or '')))
+
+
+def is_relevant(meta: Dict[str, Any], label: Dict[str, Any]) -> bool:
+    """Metadata etiketin tüm koşullarını sağlıyor mu (ilce, tur eşit; *_contains herhangi biri)"""
+    if 'ilce' in label and _fold(meta.get('ilce')) != _fold(label['ilce']):
+        return False
+    if 'tur' in label and _fold((meta.get('ozellikler') or {}).get('tur')) != _fold(label['tur']):
+        return False
+    if 'name_contains' in label:
+        name = _fold(meta.get('alan_adi'))
+        if not any(_fold(word) in name for word in label['name_contains']):
+            return False
+    if 'title_contains' in label:
+        title = _fold(meta.get('title'))
+        if not any(_fold(word) in title for word in label['title_contains']):
+            return False
+    return True
+
+
+def latency_summary(latencies_ms: List[float]) -> Dict[str, float]:
+    """Gecikme listesinden yüzdelikleri hesaplar"""
+    if not latencies_ms:
+        return {}
+    values = np.asarray(latencies_ms)
+    return {
+        'p50_ms': round(float(np.percentile(values, 50)), 3),
+        'p95_ms': round(float(np.percentile(values, 95)), 3),
+        'p99_ms': round(float(np.percentile(values, 99)), 3),
+        'mean_ms': round(float(values.mean()), 3),
+        'samples': len(latencies_ms)
+    }
+
+
+class LocalTarget:
+    """Index'leri bu process'te tek VectorStore ile yükler (tek model)"""
+
+    name = 'local'
+
+    def __init__(self, index_dir: str, data_dir: str, ilkyardim_file: str):
+        from vector_store import VectorStore
+        from faiss_indexer import ToplanmaAlanlariIndexer
+        from ilkyardim_indexer import IlkyardimIndexer
+        from faiss_search import search_toplanma_alanlari_batch
+        from ilkyardim_search import search_ilkyardim_batch
+
+        self.store = VectorStore(index_dir)
+        self.store.register(ToplanmaAlanlariIndexer(data_dir, index_dir))
+        self.store.register(IlkyardimIndexer(ilkyardim_file, index_dir))
+        self.store.load_all()
+        self._search = {
+            'toplanma': search_toplanma_alanlari_batch,
+            'ilkyardim': search_ilkyardim_batch
+        }
+
+    def available(self, collection: str) -> bool:
+        return self.store.is_loaded(collection)
+
+    def set_result_cache(self, enabled: bool):
+        from result_cache import ResultCache
+        for collection in self.store.collections.values():
+            collection.result_cache = ResultCache() if enabled else ResultCache(max_items=0)
+
+    def search(self, collection: str, queries: List[str], k: int) -> List[List[Dict[str, Any]]]:
+        return self._search[collection](self.store.get(collection), queries, k)
+
+    def metadata(self, collection: str):
+        return self.store.get(collection).metadata
+
+    def describe(self) -> Dict[str, Any]:
+        from embedding_model import model_id
+        from index_types import index_type_of
+
+        model = self.store.encoder.model
+        info: Dict[str, Any] = {'encoder': model_id(model) if model is not None else None, 'collections': {}}
+        for name, collection in self.store.collections.items():
+            if not self.store.is_loaded(name):
+                continue
+            info['collections'][name] = {
+                'vectors': int(collection.index.ntotal),
+                'dimension': int(collection.index.d),
+                'index_type': index_type_of(collection.index),
+                # Model yokken hash'lenmiş TF-IDF, o da yoksa BM25 kullanılır
+                'query_encoder': ('model' if model is not None
+                                  else 'hashing_tfidf' if collection.vectorizer is not None else 'bm25')
+            }
+        return info
+
+
+class ServerTarget:
+    """Çalışan search_server'a Unix socket üzerinden istek gönderir (sunucu önbelleği dahil)"""
+
+    name = 'server'
+
+    def __init__(self):
+        from search_client import query_server
+        self._query = query_server
+        response = query_server({'op': 'ping'})
+        if response is None or not response.get('ok'):
+            raise SystemExit("Arama sunucusuna ulaşılamadı ('python search_server.py --socket' çalışıyor mu?)")
+        self.collections = response.get('collections', {})
+
+    def available(self, collection: str) -> bool:
+        return bool(self.collections.get(collection))
+
+    def set_result_cache(self, enabled: bool):
+        # Sunucunun önbelleği istemciden kapatılamaz
+        pass
+
+    def search(self, collection: str, queries: List[str], k: int) -> List[List[Dict[str, Any]]]:
+        response = self._query({'op': 'search_batch', 'collection': collection, 'queries': queries, 'k': k},
+                               timeout=60.0)
+        if response is None or not response.get('ok'):
+            raise RuntimeError(f"Sunucu hatası: {response and response.get('error')}")
+        return response['results']
+
+    def metadata(self, collection: str):
+        # Tüm kayıtlar sunucudan alınamadığından recall hesaplanmaz (precision ve MRR raporlanır)
+        return None
+
+    def describe(self) -> Dict[str, Any]:
+        response = self._query({'op': 'stats'}) or {}
+        return {'collections': response.get('collections', {})}
+
+
+def measure_quality(target: Any, collection: str, labeled: List[Dict[str, Any]], k: int) -> Dict[str, Any]:
+    """Etiketli sorgular için recall@k, precision@k ve MRR@k hesaplar"""
+    metadata = target.metadata(collection)
+    results = target.search(collection, [item['query'] for item in labeled], k)
+
+    recalls, precisions, reciprocal_ranks, per_query = [], [], [], []
+    for item, query_results in zip(labeled, results):
+        hits = [is_relevant(result['metadata'], item['relevant']) for result in query_results[:k]]
+        first_hit = next((i for i, hit in enumerate(hits) if hit), None)
+        reciprocal_ranks.append(1.0 / (first_hit + 1) if first_hit is not None else 0.0)
+        precisions.append(sum(hits) / k)
+
+        row = {
+            'query': item['query'],
+            'hits': sum(hits),
+            'first_relevant_rank': first_hit + 1 if first_hit is not None else None
+        }
+
+        # recall@k: bulunan ilgili sonuç / min(k, koleksiyondaki ilgili kayıt sayısı)
+        if metadata is not None:
+            total_relevant = sum(1 for meta in metadata if is_relevant(meta, item['relevant']))
+            recall = sum(hits) / min(k, total_relevant) if total_relevant else 0.0
+            recalls.append(recall)
+            row['relevant_total'] = total_relevant
+            row[f'recall@{k}'] = round(recall, 4)
+
+        per_query.append(row)
+
+    quality: Dict[str, Any] = {'queries': len(labeled)}
+    if recalls:
+        quality[f'recall@{k}'] = round(float(np.mean(recalls)), 4)
+    quality[f'precision@{k}'] = round(float(np.mean(precisions)), 4) if precisions else 0.0
+    quality[f'mrr@{k}'] = round(float(np.mean(reciprocal_ranks)), 4) if reciprocal_ranks else 0.0
+    quality['per_query'] = per_query
+    return quality
+
+
+def measure_warm(target: Any, collection: str, queries: List[str], k: int, runs: int) -> Dict[str, Any]:
+    """Yüklü index üzerinde sorgu başına gecikme (ilk tur ısınma, ölçülmez)"""
+    target.search(collection, queries, k)
+
+    latencies = []
+    for _ in range(runs):
+        for query in queries:
+            start = time.perf_counter()
+            target.search(collection, [query], k)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latency_summary(latencies)
+
+
+def measure_throughput(target: Any, collection: str, queries: List[str], k: int,
+                       levels: List[int], requests: int) -> List[Dict[str, Any]]:
+    """Her eşzamanlılık seviyesinde tek sorguluk istekler gönderir, sorgu/saniye ölçer"""
+    rows = []
+    for level in levels:
+        def timed(i: int) -> float:
+            start = time.perf_counter()
+            target.search(collection, [queries[i % len(queries)]], k)
+            return (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=level) as pool:
+            latencies = list(pool.map(timed, range(requests)))
+        elapsed = time.perf_counter() - start
+
+        rows.append({
+            'concurrency': level,
+            'requests': requests,
+            'qps': round(requests / elapsed, 1),
+            **{key: value for key, value in latency_summary(latencies).items() if key != 'samples'}
+        })
+    return rows
+
+
+def measure_cold_spawn(collection: str, query: str, runs: int, use_server: bool) -> Dict[str, Any]:
+    """CLI script'ini ayrı process olarak çalıştırıp toplam süresini ölçer"""
+    env = dict(os.environ)
+    if not use_server:
+        # Var olmayan socket: script yerel indexer'a (model + index yükleme) düşer
+        env['REACH_SEARCH_SOCKET'] = os.devnull + ".absent.sock"
+
+    script = Path(__file__).parent / CLI_SCRIPTS[collection]
+    latencies, failures = [], 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, str(script), query], cwd=str(script.parent), env=env,
+                                   stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        latencies.append((time.perf_counter() - start) * 1000)
+        failures += completed.returncode != 0
+
+    summary = latency_summary(latencies)
+    summary['mode'] = 'server' if use_server else 'local'
+    summary['failures'] = failures
+    return summary
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=str(Path(__file__).parent),
+                              capture_output=True, text=True, check=True).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten_metrics(report: Dict[str, Any]) -> Dict[str, float]:
+    """Karşılaştırılabilir sayısal metrikleri 'koleksiyon.bölüm.metrik' anahtarlarıyla düzleştirir"""
+    metrics = {}
+    for collection, sections in report.get('collections', {}).items():
+        for section, values in sections.items():
+            if section == 'throughput':
+                for row in values:
+                    for key in ('qps', 'p50_ms', 'p99_ms'):
+                        metrics[f"{collection}.throughput.c{row['concurrency']}.{key}"] = row[key]
+            elif isinstance(values, dict):
+                for key, value in values.items():
+                    if isinstance(value, (int, float)) and not isinstance(value, bool) and (
+                            key.endswith('_ms') or key.startswith(('recall', 'precision', 'mrr'))):
+                        metrics[f"{collection}.{section}.{key}"] = value
+    return metrics
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any],
+                    tolerance: float) -> List[str]:
+    """Taban rapora göre gerilemeleri listeler (gecikme/verim: oransal, kalite: mutlak 0.01)"""
+    old, new = flatten_metrics(baseline), flatten_metrics(current)
+    regressions = []
+    for key in sorted(old.keys() & new.keys()):
+        before, after = old[key], new[key]
+        if key.endswith('_ms'):
+            worse = before > 0 and after > before * (1 + tolerance)
+        elif key.endswith('qps'):
+            worse = after < before * (1 - tolerance)
+        else:
+            worse = after < before - 0.01
+        if worse:
+            regressions.append(f"{key}: {before} -> {round(after, 4)}")
+    return regressions
+
+
+def main():
+    """Ana fonksiyon"""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--target', choices=('local', 'server'), default='local',
+                        help="local: index'ler bu process'te, server: çalışan search_server")
+    parser.add_argument('--index-dir', default="faiss_index")
+    parser.add_argument('--data-dir', default="new_datas")
+    parser.add_argument('--ilkyardim-file', default="Datas/ilkyardım.txt")
+    parser.add_argument('--queries', default=str(DEFAULT_QUERIES_FILE), help="Etiketli sorgu dosyası")
+    parser.add_argument('--collections', nargs='+', choices=COLLECTIONS, default=list(COLLECTIONS))
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--runs', type=int, default=5, help="Sıcak gecikme için sorgu seti tekrar sayısı")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--requests', type=int, default=200, help="Eşzamanlılık seviyesi başına istek")
+    parser.add_argument('--cold-runs', type=int, default=3, help="Soğuk başlangıç tekrar sayısı (0: atla)")
+    parser.add_argument('--output', help="JSON raporunun yazılacağı dosya (stdout'a da yazılır)")
+    parser.add_argument('--baseline', help="Karşılaştırılacak önceki JSON raporu")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Gecikme/verim için kabul edilen oransal gerileme")
+    args = parser.parse_args()
+
+    with open(args.queries, 'r', encoding='utf-8') as f:
+        labeled_queries = json.load(f)
+
+    target = LocalTarget(args.index_dir, args.data_dir, args.ilkyardim_file) if args.target == 'local' \
+        else ServerTarget()
+
+    report: Dict[str, Any] = {
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'target': target.name,
+        'k': args.k,
+        'setup': target.describe(),
+        'collections': {}
+    }
+
+    for collection in args.collections:
+        if not target.available(collection):
+            logger.warning(f"{collection} index'i yüklenemedi, atlanıyor")
+            continue
+
+        labeled = labeled_queries.get(collection, [])
+        queries = [item['query'] for item in labeled]
+        logger.info(f"{collection}: {len(queries)} etiketli sorgu")
+
+        # Kalite ve önbelleksiz ölçümler sonuç önbelleği kapalıyken yapılır
+        target.set_result_cache(False)
+        results: Dict[str, Any] = {
+            'quality': measure_quality(target, collection, labeled, args.k),
+            'warm': measure_warm(target, collection, queries, args.k, args.runs),
+        }
+        results['throughput'] = measure_throughput(target, collection, queries, args.k,
+                                                   args.concurrency, args.requests)
+
+        if target.name == 'local':
+            target.set_result_cache(True)
+            results['warm_cached'] = measure_warm(target, collection, queries, args.k, args.runs)
+
+        if args.cold_runs > 0 and queries:
+            results['cold_spawn'] = measure_cold_spawn(collection, queries[0], args.cold_runs,
+                                                       use_server=target.name == 'server')
+
+        report['collections'][collection] = results
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + '\n', encoding='utf-8')
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_reports(baseline, report, args.tolerance)
+        for line in regressions:
+            logger.warning(f"Gerileme: {line}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    sys.exit(main())
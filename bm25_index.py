@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+BM25 Ters Index
+create_document_text çıktıları üzerinde Türkçe'ye uygun tokenizasyonla BM25 index'i
+kurar, FAISS index'inin yanında kalıcı olarak saklar ve vektör sıralaması ile
+reciprocal-rank fusion (RRF) ile birleştirilir.
+"""
+
+import json
+import re
+import logging
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from turkish_text import ascii_fold, turkish_lower
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+(?:['’]\w+)?")
+
+# Türkçe için etkili basit kök bulma: kelimenin ilk 5 harfi (F5 stemming)
+STEM_LENGTH = 5
+
+
+def tokenize(text: str) -> List[str]:
+    """Metni BM25 terimlerine ayırır (küçük harf, kesme eki atma, ASCII, F5 kök)"""
+    tokens = []
+    for token in _TOKEN_RE.findall(turkish_lower(text)):
+        # Kadıköy'de -> kadıköy
+        token = re.split(r"['’]", token, maxsplit=1)[0]
+        token = ascii_fold(token)
+        if token:
+            tokens.append(token[:STEM_LENGTH])
+    return tokens
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[int]], k: int = 60) -> List[Tuple[int, float]]:
+    """Birden çok sıralamayı RRF ile tek listede birleştirir"""
+    scores: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking):
+            scores[row] = scores.get(row, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class BM25Index:
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.vocabulary: Dict[str, int] = {}
+        # Terim bazında posting listeleri (CSC benzeri düz diziler)
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.doc_ids = np.zeros(0, dtype=np.int32)
+        self.term_freqs = np.zeros(0, dtype=np.float32)
+        self.doc_lengths = np.zeros(0, dtype=np.float32)
+        self.idf = np.zeros(0, dtype=np.float32)
+        self.avg_length = 1.0
+
+    @property
+    def num_docs(self) -> int:
+        return len(self.doc_lengths)
+
+    def build(self, documents: Iterable[str]) -> "BM25Index":
+        """Dokümanlardan index kurar"""
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        doc_lengths = []
+
+        for doc_id, document in enumerate(documents):
+            tokens = tokenize(document)
+            doc_lengths.append(len(tokens))
+            for term, count in Counter(tokens).items():
+                postings.setdefault(term, []).append((doc_id, count))
+
+        terms = sorted(postings)
+        self.vocabulary = {term: i for i, term in enumerate(terms)}
+        lengths = [len(postings[term]) for term in terms]
+        self.indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        self.doc_ids = np.fromiter((d for term in terms for d, _ in postings[term]), dtype=np.int32)
+        self.term_freqs = np.fromiter((c for term in terms for _, c in postings[term]), dtype=np.float32)
+        self.doc_lengths = np.asarray(doc_lengths, dtype=np.float32)
+        self._compute_idf()
+
+        logger.info(f"BM25 index oluşturuldu: {self.num_docs} doküman, {len(terms)} terim")
+        return self
+
+    def _compute_idf(self):
+        doc_freq = np.diff(self.indptr).astype(np.float32)
+        self.idf = np.log(1.0 + (self.num_docs - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+        self.avg_length = float(self.doc_lengths.mean()) if self.num_docs else 1.0
+
+    def scores(self, query: str, allowed: Optional[np.ndarray] = None) -> np.ndarray:
+        """Sorgu için tüm dokümanların BM25 skorlarını döner (allowed: izinli satır maskesi)"""
+        scores = np.zeros(self.num_docs, dtype=np.float32)
+        if self.num_docs == 0:
+            return scores
+
+        for term in set(tokenize(query)):
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            docs = self.doc_ids[start:end]
+            tf = self.term_freqs[start:end]
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[docs] / (self.avg_length or 1.0))
+            scores[docs] += self.idf[term_id] * tf * (self.k1 + 1) / (tf + norm)
+
+        if allowed is not None:
+            scores[~allowed] = 0.0
+        return scores
+
+    def search(self, query: str, k: int = 10,
+               allowed: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """En yüksek skorlu k dokümanı (satır, skor) olarak döner"""
+        scores = self.scores(query, allowed)
+        matched = np.flatnonzero(scores > 0)
+        if len(matched) == 0:
+            return []
+
+        if len(matched) > k:
+            matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        matched = matched[np.argsort(-scores[matched], kind='stable')]
+        return [(int(row), float(scores[row])) for row in matched]
+
+    def save(self, path: Path):
+        """Index'i .npz dosyasına kaydeder"""
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        with open(path, 'wb') as f:
+            np.savez(f, indptr=self.indptr, doc_ids=self.doc_ids, term_freqs=self.term_freqs,
+                     doc_lengths=self.doc_lengths,
+                     params=np.asarray([self.k1, self.b], dtype=np.float32),
+                     terms=np.asarray(json.dumps(terms, ensure_ascii=False)))
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        """Kaydedilmiş index'i yükler"""
+        with np.load(path) as data:
+            k1, b = (float(x) for x in data['params'])
+            index = cls(k1=k1, b=b)
+            index.indptr = data['indptr']
+            index.doc_ids = data['doc_ids']
+            index.term_freqs = data['term_freqs']
+            index.doc_lengths = data['doc_lengths']
+            terms = json.loads(str(data['terms']))
+
+        index.vocabulary = {term: i for i, term in enumerate(terms)}
+        index._compute_idf()
+        return index
@@ -161,8 +161,14 @@ main() {
     echo "   Mode: $NODE_ENV"
     echo ""
     
-    # Start the Node.js application
+    # Start the warm search server (model + indices loaded once)
     cd /app
+    if [ -f "search_server.py" ]; then
+        echo "🔎 Starting search server on faiss_index/search.sock..."
+        python3 search_server.py --socket &
+    fi
+    
+    # Start the Node.js application
     exec node dist/index.js
 }
 
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Sorgu Embedding Önbelleği
+Normalize edilmiş sorgu metni ve model adına göre anahtarlanan, bellekte LRU ile
+sınırlanan ve faiss_index/ altında SQLite dosyasında kalıcı tutulan embedding önbelleği.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from turkish_text import normalize_query
+
+logger = logging.getLogger(__name__)
+
+KEY_VERSION = 'v2'
+
+
+class EmbeddingCache:
+    def __init__(self, cache_file: Path, model_id: str, max_memory_items: int = 10000,
+                 max_disk_items: int = 200000):
+        self.cache_file = Path(cache_file)
+        self.model_id = model_id
+        self.max_memory_items = max_memory_items
+        self.max_disk_items = max_disk_items
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Hit/miss sayaçları (önbellek boyutlandırması için)
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db = self._open_db()
+
+    def _open_db(self) -> Optional[sqlite3.Connection]:
+        """Disk önbelleğini açar, açılamazsa sadece bellek kullanılır"""
+        try:
+            db = sqlite3.connect(str(self.cache_file), timeout=5.0, check_same_thread=False)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+            )
+            db.commit()
+            return db
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding önbelleği diski açılamadı, sadece bellek kullanılacak: {e}")
+            return None
+
+    def make_key(self, normalized_query: str) -> str:
+        """Model adı ve normalize sorgudan anahtar üretir"""
+        # Anahtar sürümü: önceki sürüm küçük harfe çevrilmiş metnin embedding'ini saklıyordu
+        return hashlib.sha1(f"{KEY_VERSION}\x00{self.model_id}\x00{normalized_query}".encode('utf-8')).hexdigest()
+
+    def _memory_put(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        if self._db is None or not keys:
+            return {}
+        try:
+            placeholders = ','.join('?' * len(keys))
+            rows = self._db.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", keys
+            ).fetchall()
+            if rows:
+                self._db.executemany("UPDATE embeddings SET last_used = ? WHERE key = ?",
+                                     [(time.time(), key) for key, _ in rows])
+                self._db.commit()
+            return {key: np.frombuffer(blob, dtype='float32') for key, blob in rows}
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding önbelleği okuma hatası: {e}")
+            return {}
+
+    def _disk_put(self, items: Dict[str, np.ndarray]):
+        if self._db is None or not items:
+            return
+        try:
+            now = time.time()
+            self._db.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, vector, last_used) VALUES (?, ?, ?, ?)",
+                [(key, self.model_id, vector.astype('float32').tobytes(), now) for key, vector in items.items()]
+            )
+
+            # Disk sınırı aşılırsa en uzun süre kullanılmayanları sil
+            count = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            if count > self.max_disk_items:
+                self._db.execute(
+                    "DELETE FROM embeddings WHERE key IN "
+                    "(SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                    (count - self.max_disk_items,)
+                )
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding önbelleği yazma hatası: {e}")
+
+    def encode(self, queries: List[str], encode_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """Önbellekte olmayan sorguları tek çağrıda encode eder, sonuçları sırayla döner"""
+        normalized = [normalize_query(query) for query in queries]
+        keys = [self.make_key(text) for text in normalized]
+        vectors: Dict[str, np.ndarray] = {}
+
+        with self._lock:
+            # 1) Bellek
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    vectors[key] = self._memory[key]
+                    self.memory_hits += 1
+
+            # 2) Disk
+            missing = list(dict.fromkeys(key for key in keys if key not in vectors))
+            for key, vector in self._disk_get(missing).items():
+                vectors[key] = vector
+                self._memory_put(key, vector)
+                self.disk_hits += 1
+
+        # 3) Model - aynı sorgu bir kez encode edilir
+        # Anahtar normalize metinden üretilir ama model büyük/küçük harf duyarlıdır; index'teki
+        # dokümanlarla aynı biçimde kalması için her anahtarın ilk orijinal yazımı encode edilir
+        to_encode = {}
+        for key, query in zip(keys, queries):
+            if key not in vectors:
+                to_encode.setdefault(key, query)
+
+        if to_encode:
+            encoded = np.asarray(encode_fn(list(to_encode.values())), dtype='float32')
+            new_items = dict(zip(to_encode.keys(), encoded))
+            with self._lock:
+                self.misses += len(new_items)
+                for key, vector in new_items.items():
+                    self._memory_put(key, vector)
+                self._disk_put(new_items)
+            vectors.update(new_items)
+
+        return np.vstack([vectors[key] for key in keys])
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss sayaçlarını döner"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            'memory_items': len(self._memory),
+            'max_memory_items': self.max_memory_items
+        }
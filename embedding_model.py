@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Embedding Modeli
+Toplanma alanı ve ilkyardım indexer'larının ortak kullandığı model yükleyicisi.
+EMBEDDING_BACKEND ortam değişkeni ile PyTorch (torch, varsayılan) veya
+int8 quantize edilmiş ONNX (onnx) backend'i seçilir.
+"""
+
+import os
+import logging
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = 'paraphrase-multilingual-MiniLM-L12-v2'
+
+EMBEDDING_BACKENDS = ('torch', 'onnx')
+
+
+def load_torch_model(model_name: str = MODEL_NAME) -> Optional[Any]:
+    """SentenceTransformer modelini yükler, başarısız olursa None döner"""
+    try:
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+    except Exception as e:
+        # stdout JSON çıktısı için ayrıldığından uyarı log'a yazılır
+        logger.warning(f"Model yükleme hatası, basit embedding kullanılıyor: {e}")
+        return None
+
+
+def load_onnx_model() -> Optional[Any]:
+    """Aktarılmış ONNX modelini yükler, yoksa None döner"""
+    try:
+        from onnx_encoder import OnnxSentenceEncoder, onnx_model_exists
+        if not onnx_model_exists():
+            logger.warning("ONNX modeli bulunamadı ('python onnx_encoder.py --export' ile oluşturulur)")
+            return None
+        return OnnxSentenceEncoder()
+    except Exception as e:
+        logger.warning(f"ONNX modeli yüklenemedi: {e}")
+        return None
+
+
+def load_sentence_model(model_name: str = MODEL_NAME) -> Optional[Any]:
+    """Yapılandırılmış backend ile embedding modelini yükler, ONNX yoksa PyTorch'a düşer"""
+    backend = os.environ.get('EMBEDDING_BACKEND', 'torch').lower()
+
+    if backend == 'onnx':
+        model = load_onnx_model()
+        if model is not None:
+            return model
+        logger.warning("PyTorch backend'ine geçiliyor")
+    elif backend not in EMBEDDING_BACKENDS:
+        logger.warning(f"Bilinmeyen embedding backend'i: {backend}, torch kullanılıyor")
+
+    return load_torch_model(model_name)
+
+
+def model_id(model: Any) -> str:
+    """Embedding önbelleği anahtarı için model kimliği (backend'ler ayrı önbelleklenir)"""
+    return getattr(model, 'model_id', MODEL_NAME)
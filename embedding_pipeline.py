@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Akışlı Embedding Hattı
+Dokümanları bir generator'dan parça parça (chunk) okur, parçaları süreç havuzunda
+(her süreçte bir model kopyası) paralel encode eder ve sırasıyla döner. Bellekte
+aynı anda en fazla 2 * worker parça bulunur; ilerleme ve hız log'a yazılır.
+"""
+
+import os
+import time
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from embedding_model import MODEL_NAME, load_sentence_model, model_id
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 512
+
+# Worker süreçlerinde bir kez yüklenen model
+_worker_model = None
+
+
+def iter_chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Iterable'ı en fazla size elemanlı listelere böler"""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def default_workers(total: Optional[int], chunk_size: int) -> int:
+    """EMBED_WORKERS veya (çekirdek sayısı, parça sayısı) minimumu"""
+    workers = int(os.environ.get('EMBED_WORKERS', 0)) or (os.cpu_count() or 1)
+    if total is not None:
+        workers = min(workers, max(1, -(-total // chunk_size)))
+    return max(1, workers)
+
+
+def _init_worker(model_name: str, threads: int, expected_model_id: Optional[str] = None):
+    global _worker_model
+    try:
+        # Süreçler çekirdekleri paylaşır, her biri kendi payı kadar thread kullanır
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+    _worker_model = load_sentence_model(model_name)
+    if _worker_model is None:
+        raise RuntimeError("Worker sürecinde model yüklenemedi")
+    # Index'in geri kalanı ve sorgular ana süreçteki modelle encode edilir, farklı model karışmamalı
+    if expected_model_id is not None and model_id(_worker_model) != expected_model_id:
+        raise RuntimeError(f"Worker modeli ({model_id(_worker_model)}) ana modelle "
+                           f"({expected_model_id}) aynı değil")
+
+
+def _encode_chunk(chunk: List[str]) -> np.ndarray:
+    return np.asarray(_worker_model.encode(chunk, show_progress_bar=False), dtype='float32')
+
+
+class ThroughputMeter:
+    """Encode ilerlemesini ve doküman/saniye hızını raporlar"""
+
+    def __init__(self, total: Optional[int] = None):
+        self.total = total
+        self.done = 0
+        self.start = time.perf_counter()
+
+    @property
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.start
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def update(self, count: int):
+        self.done += count
+        rate = self.rate
+        if self.total:
+            eta = (self.total - self.done) / rate if rate > 0 else 0.0
+            logger.info(f"Embedding: {self.done}/{self.total} (%{100 * self.done / self.total:.1f}), "
+                        f"{rate:.1f} doküman/sn, kalan ~{eta:.0f} sn")
+        else:
+            logger.info(f"Embedding: {self.done} doküman, {rate:.1f} doküman/sn")
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.start
+        logger.info(f"Embedding tamamlandı: {self.done} doküman, {elapsed:.1f} sn, {self.rate:.1f} doküman/sn")
+
+
+def encode_stream(documents: Iterable[str], encode_fn: Optional[Callable[[List[str]], Any]] = None,
+                  model_name: str = MODEL_NAME, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  workers: int = 1, total: Optional[int] = None,
+                  expected_model_id: Optional[str] = None) -> Iterator[np.ndarray]:
+    """
+    Dokümanları sırasıyla parça parça encode eder (workers > 1 ise süreç havuzunda).
+    Worker'lar modeli model_name'den yükler; expected_model_id verilirse yüklenen modelin kimliği doğrulanır.
+    """
+    meter = ThroughputMeter(total)
+    chunks = iter_chunks(documents, chunk_size)
+
+    if workers <= 1:
+        if encode_fn is None:
+            model = load_sentence_model(model_name)
+            if model is None:
+                raise RuntimeError("Embedding modeli yüklenemedi")
+            encode_fn = lambda chunk: model.encode(chunk, show_progress_bar=False)
+
+        for chunk in chunks:
+            embeddings = np.asarray(encode_fn(chunk), dtype='float32')
+            meter.update(len(chunk))
+            yield embeddings
+        meter.summary()
+        return
+
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    logger.info(f"Embedding süreç havuzu: {workers} worker x {threads} thread, parça boyutu {chunk_size}")
+
+    # torch fork sonrası kilitlenebildiğinden spawn kullanılır
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(model_name, threads, expected_model_id)) as pool:
+        # Sıra korunur; bekleyen parça sayısı sınırlı tutularak bellek sabit kalır
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_encode_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                embeddings = pending.popleft().result()
+                meter.update(len(embeddings))
+                yield embeddings
+
+        while pending:
+            embeddings = pending.popleft().result()
+            meter.update(len(embeddings))
+            yield embeddings
+
+    meter.summary()
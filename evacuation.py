@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Kapasiteye Duyarlı Tahliye Ataması
+Nüfus noktalarını (mahalle merkezleri veya GPS kümeleri) hiçbir toplanma alanının
+kapasitesini aşmadan en yakın alanlara dağıtır. Bir noktanın kişileri birden çok
+alana bölünebilir; hiçbir aday alana sığmayan kişiler ilçe bazında taşma olarak
+raporlanır.
+
+Alan kapasitesi alan_bilgileri.kapasite'dir; kapasite girilmemişse kullanılabilir
+alan (o da yoksa toplam alan) EVACUATION_M2_PER_PERSON'a (varsayılan 1.5 m²/kişi)
+bölünür. Canlı durum katmanında kapalı alanların kapasitesi sıfırdır, doluluk
+sayacı kapasiteden düşülür. Koordinatı olmayan alanlara atama yapılmaz.
+
+Her nokta için en yakın K aday alan (EVACUATION_CANDIDATES, varsayılan 10)
+BallTree veya vektörize haversine mesafe matrisiyle bulunur. İki yöntem vardır:
+    greedy: yığından her seferinde en kısa (nokta, aday) kenarı alınır, alanda yer
+            varsa sığan kadar kişi atanır, kalanlar noktanın sıradaki adayına geçer
+            (100 bin nokta birkaç saniyede)
+    exact:  aynı aday kenarları üzerinde min-cost-flow (networkx); toplam kişi×metre
+            en azdır. Saf Python olduğundan mahalle ölçeğindeki girdiler içindir.
+
+Girdi: JSON listesi veya CSV; alanlar lat, lng, nufus (ya da count/people/population),
+isteğe bağlı id ve ilce (verilmezse en yakın alanın ilçesi).
+
+Kullanım:
+    python3 evacuation.py nufus.json --output plan.json
+    python3 evacuation.py nufus.csv --method exact --candidates 20 --max-distance-m 3000
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import heapq
+import argparse
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from geo_index import GeoIndex
+from availability import CLOSED, availability_keys
+
+logger = logging.getLogger(__name__)
+
+METHODS = ('greedy', 'exact')
+DEFAULT_CANDIDATES = 10
+DEFAULT_M2_PER_PERSON = 1.5
+
+# Nüfus sütunu için kabul edilen adlar (ilk bulunan kullanılır)
+PEOPLE_FIELDS = ('nufus', 'count', 'people', 'population')
+
+
+def area_capacities(metadata: Sequence[Dict[str, Any]], m2_per_person: Optional[float] = None) -> np.ndarray:
+    """Alanların kişi kapasitesi (kapasite yoksa alan / kişi başı m²)"""
+    if m2_per_person is None:
+        m2_per_person = float(os.environ.get('EVACUATION_M2_PER_PERSON', DEFAULT_M2_PER_PERSON))
+
+    capacities = np.zeros(len(metadata), dtype=np.int64)
+    for i, meta in enumerate(metadata):
+        bilgiler = meta.get('alan_bilgileri') or {}
+        try:
+            kapasite = float(bilgiler.get('kapasite', 0) or 0)
+            alan = float(bilgiler.get('kullanilabilir_alan', 0) or 0) or float(bilgiler.get('toplam_alan', 0) or 0)
+        except (TypeError, ValueError):
+            continue
+        capacities[i] = int(kapasite) if kapasite > 0 else int(alan / m2_per_person)
+    return capacities
+
+
+def load_demand_points(path: Path) -> List[Dict[str, Any]]:
+    """Nüfus noktalarını JSON listesinden veya CSV dosyasından okur"""
+    path = Path(path)
+    if path.suffix.lower() == '.csv':
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            return list(csv.DictReader(f))
+    with open(path, 'r', encoding='utf-8') as f:
+        points = json.load(f)
+    if not isinstance(points, list):
+        raise ValueError("Nüfus noktaları JSON listesi olmalı")
+    return points
+
+
+def demand_arrays(points: Sequence[Dict[str, Any]]) -> Tuple[List[str], np.ndarray, np.ndarray, List[str]]:
+    """Noktaları (id'ler, (n, 2) koordinat, kişi sayısı, ilçeler) dizilerine çevirir"""
+    ids, ilceler = [], []
+    coordinates = np.zeros((len(points), 2), dtype=np.float64)
+    people = np.zeros(len(points), dtype=np.int64)
+    for i, point in enumerate(points):
+        try:
+            coordinates[i] = (float(point.get('lat', 0) or 0), float(point.get('lng', 0) or 0))
+            count = next((point[field] for field in PEOPLE_FIELDS if point.get(field) not in (None, '')), 0)
+            people[i] = int(float(count))
+        except (TypeError, ValueError):
+            raise ValueError(f"Geçersiz nüfus noktası ({i}): {point}")
+        if people[i] < 0:
+            raise ValueError(f"Nüfus negatif olamaz ({i})")
+        ids.append(str(point.get('id', i)))
+        ilceler.append(str(point.get('ilce', '') or ''))
+    return ids, coordinates, people, ilceler
+
+
+def assign_greedy(candidate_rows: np.ndarray, candidate_distances: np.ndarray,
+                  demand: np.ndarray, capacity: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """
+    En yakın kenar önce açgözlü atama.
+    candidate_rows: (n, K) aday alan satırları (-1: aday yok), yakından uzağa
+    Döner: (nokta, alan satırı, kişi, metre) atama dizileri
+    """
+    remaining = capacity.astype(np.int64).tolist()
+    rows = candidate_rows.tolist()
+    distances = candidate_distances.tolist()
+    left = demand.astype(np.int64).tolist()
+
+    # Her noktanın yığında tek kenarı vardır: sıradaki adayı
+    heap = [(distances[i][0], i, 0) for i in range(len(left)) if left[i] > 0 and rows[i] and rows[i][0] >= 0]
+    heapq.heapify(heap)
+
+    assigned_points, assigned_rows, assigned_people, assigned_distances = [], [], [], []
+    while heap:
+        distance, i, position = heap[0]
+        candidate_rows_i = rows[i]
+        row = candidate_rows_i[position]
+        if remaining[row] > 0:
+            take = min(left[i], remaining[row])
+            remaining[row] -= take
+            left[i] -= take
+            assigned_points.append(i)
+            assigned_rows.append(row)
+            assigned_people.append(take)
+            assigned_distances.append(distance)
+
+        # Dolan alan bir daha yer açmaz, noktanın dolu adayları yığına girmeden atlanır
+        position += 1
+        while (left[i] > 0 and position < len(candidate_rows_i) and candidate_rows_i[position] >= 0
+               and remaining[candidate_rows_i[position]] == 0):
+            position += 1
+        if left[i] > 0 and position < len(candidate_rows_i) and candidate_rows_i[position] >= 0:
+            heapq.heapreplace(heap, (distances[i][position], i, position))
+        else:
+            heapq.heappop(heap)
+
+    return (np.asarray(assigned_points, dtype=np.int64), np.asarray(assigned_rows, dtype=np.int64),
+            np.asarray(assigned_people, dtype=np.int64), np.asarray(assigned_distances, dtype=np.float64))
+
+
+def assign_min_cost_flow(candidate_rows: np.ndarray, candidate_distances: np.ndarray,
+                         demand: np.ndarray, capacity: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """
+    Aday kenarları üzerinde toplam kişi×metreyi en aza indiren atama (networkx network simplex).
+    Sığmayan kişiler her kenardan pahalı taşma kenarıyla havuza akar, böylece problem her zaman çözülür.
+    """
+    import networkx as nx
+
+    # Taşma her gerçek kenardan pahalıdır, kapasite varken kimse taşmaya gönderilmez
+    overflow_cost = int(candidate_distances[candidate_rows >= 0].max(initial=0.0)) * 10 + 1
+    graph = nx.DiGraph()
+    graph.add_node('sink', demand=int(demand.sum()))
+    for i, count in enumerate(demand.tolist()):
+        if count <= 0:
+            continue
+        graph.add_node(('d', i), demand=-count)
+        graph.add_edge(('d', i), 'sink', weight=overflow_cost)
+        for row, distance in zip(candidate_rows[i].tolist(), candidate_distances[i].tolist()):
+            if row < 0:
+                continue
+            if not graph.has_edge(('a', row), 'sink'):
+                graph.add_edge(('a', row), 'sink', weight=0, capacity=int(capacity[row]))
+            graph.add_edge(('d', i), ('a', row), weight=int(round(distance)))
+
+    _, flows = nx.network_simplex(graph)
+
+    assigned_points, assigned_rows, assigned_people, assigned_distances = [], [], [], []
+    for i in range(len(demand)):
+        node_flows = flows.get(('d', i), {})
+        for row, distance in zip(candidate_rows[i].tolist(), candidate_distances[i].tolist()):
+            flow = node_flows.get(('a', row), 0) if row >= 0 else 0
+            if flow > 0:
+                assigned_points.append(i)
+                assigned_rows.append(row)
+                assigned_people.append(flow)
+                assigned_distances.append(distance)
+
+    return (np.asarray(assigned_points, dtype=np.int64), np.asarray(assigned_rows, dtype=np.int64),
+            np.asarray(assigned_people, dtype=np.int64), np.asarray(assigned_distances, dtype=np.float64))
+
+
+class EvacuationPlanner:
+    def __init__(self, metadata: Sequence[Dict[str, Any]], geo_index: GeoIndex, availability: Any = None):
+        self.geo_index = geo_index
+        self.availability = availability
+        self.capacities = area_capacities(metadata)
+        # Rapor alanları bir kez çıkarılır (metadata kayıt deposunda her erişim JSON çözer)
+        self.alan_ids = [meta.get('alan_id', '') for meta in metadata]
+        self.alan_adlari = [meta.get('alan_adi', '') for meta in metadata]
+        self.ilceler = [meta.get('ilce', '') for meta in metadata]
+        self.availability_keys = [availability_keys(meta) for meta in metadata]
+
+    def current_capacities(self) -> np.ndarray:
+        """Canlı durumla düzeltilmiş kalan kapasiteler (kapalı: 0, doluluk düşülür)"""
+        capacities = self.capacities.copy()
+        if self.availability is None or not len(self.availability):
+            return capacities
+
+        status, occupancy = self.availability.lookup_areas(self.availability_keys)
+        capacities[status == CLOSED] = 0
+        return np.maximum(capacities - occupancy.astype(np.int64), 0)
+
+    def plan(self, points: Sequence[Dict[str, Any]], method: str = 'greedy',
+             candidates: Optional[int] = None, max_distance_m: Optional[float] = None) -> Dict[str, Any]:
+        """Noktaları alanlara atar; atamalar, alan kullanımı ve ilçe bazında taşmayı döner"""
+        if method not in METHODS:
+            raise ValueError(f"Bilinmeyen yöntem: {method} (seçenekler: {', '.join(METHODS)})")
+        if candidates is None:
+            candidates = int(os.environ.get('EVACUATION_CANDIDATES', DEFAULT_CANDIDATES))
+
+        start = time.perf_counter()
+        ids, coordinates, people, ilceler = demand_arrays(points)
+        capacity = self.current_capacities()
+
+        # Koordinatı olmayan noktalar hiçbir alana atanamaz
+        located = (coordinates[:, 0] != 0) & (coordinates[:, 1] != 0)
+        candidate_rows = np.full((len(ids), max(0, min(candidates, len(self.geo_index)))), -1, dtype=np.int64)
+        candidate_distances = np.full(candidate_rows.shape, np.inf, dtype=np.float64)
+        if located.any() and candidate_rows.shape[1]:
+            rows, distances = self.geo_index.nearest_batch(coordinates[located], candidate_rows.shape[1])
+            candidate_rows[located], candidate_distances[located] = rows, distances
+
+        # İlçesi verilmeyen nokta en yakın alanın ilçesine sayılır (taşma raporu için)
+        if candidate_rows.shape[1]:
+            for i in np.flatnonzero(candidate_rows[:, 0] >= 0):
+                if not ilceler[i]:
+                    ilceler[i] = self.ilceler[candidate_rows[i, 0]]
+
+        # Yarıçap dışındaki ve kapasitesi olmayan adaylar elenir
+        usable = candidate_rows >= 0
+        usable &= capacity[np.where(usable, candidate_rows, 0)] > 0
+        if max_distance_m is not None:
+            usable &= candidate_distances <= max_distance_m
+        order = np.argsort(~usable, axis=1, kind='stable')
+        candidate_rows = np.where(np.take_along_axis(usable, order, axis=1),
+                                  np.take_along_axis(candidate_rows, order, axis=1), -1)
+        candidate_distances = np.take_along_axis(candidate_distances, order, axis=1)
+
+        if method == 'exact':
+            try:
+                assignment = assign_min_cost_flow(candidate_rows, candidate_distances, people, capacity)
+            except ImportError:
+                logger.warning("networkx bulunamadı, açgözlü atama kullanılacak")
+                method = 'greedy'
+        if method == 'greedy':
+            assignment = assign_greedy(candidate_rows, candidate_distances, people, capacity)
+
+        plan = self._report(assignment, ids, people, ilceler, capacity)
+        plan['method'] = method
+        plan['summary']['candidates'] = candidate_rows.shape[1]
+        plan['summary']['took_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        logger.info(f"Tahliye planı ({method}): {plan['summary']['assigned']}/{plan['summary']['people']} kişi "
+                    f"atandı, {plan['summary']['took_ms']} ms")
+        return plan
+
+    def _report(self, assignment: Tuple[np.ndarray, ...], ids: List[str], people: np.ndarray,
+                ilceler: List[str], capacity: np.ndarray) -> Dict[str, Any]:
+        points, rows, counts, distances = assignment
+        assigned = np.bincount(points, weights=counts, minlength=len(ids)).astype(np.int64)
+        unassigned = people - assigned
+
+        overflow: Dict[str, int] = {}
+        for i in np.flatnonzero(unassigned > 0):
+            overflow[ilceler[i]] = overflow.get(ilceler[i], 0) + int(unassigned[i])
+
+        area_load = np.bincount(rows, weights=counts, minlength=len(self.alan_ids)).astype(np.int64)
+        areas = []
+        for row in np.flatnonzero(area_load):
+            areas.append({
+                'alan_id': self.alan_ids[row],
+                'alan_adi': self.alan_adlari[row],
+                'ilce': self.ilceler[row],
+                'capacity': int(capacity[row]),
+                'assigned': int(area_load[row]),
+                'utilization': round(float(area_load[row] / capacity[row]), 4)
+            })
+
+        total_assigned = int(counts.sum())
+        return {
+            'summary': {
+                'demand_points': len(ids),
+                'people': int(people.sum()),
+                'assigned': total_assigned,
+                'unassigned': int(unassigned.sum()),
+                'areas_used': len(areas),
+                'mean_distance_m': round(float((distances * counts).sum() / total_assigned), 1) if total_assigned else None,
+                'max_distance_m': round(float(distances.max()), 1) if len(distances) else None
+            },
+            'assignments': [
+                {
+                    'demand_id': ids[i],
+                    'alan_id': self.alan_ids[row],
+                    'people': int(count),
+                    'distance_m': round(float(distance), 1)
+                }
+                for i, row, count, distance in zip(points.tolist(), rows.tolist(), counts.tolist(), distances.tolist())
+            ],
+            'areas': areas,
+            'overflow': dict(sorted(overflow.items(), key=lambda item: -item[1]))
+        }
+
+
+def main():
+    """Ana fonksiyon"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Kapasiteye duyarlı tahliye ataması")
+    parser.add_argument('points', help="Nüfus noktaları (JSON listesi veya CSV)")
+    parser.add_argument('--method', choices=METHODS, default='greedy')
+    parser.add_argument('--candidates', type=int)
+    parser.add_argument('--max-distance-m', type=float)
+    parser.add_argument('--index-dir', default="faiss_index")
+    parser.add_argument('--output', help="Planın yazılacağı dosya (verilmezse stdout)")
+    args = parser.parse_args()
+
+    from faiss_indexer import ToplanmaAlanlariIndexer
+
+    indexer = ToplanmaAlanlariIndexer(index_dir=args.index_dir)
+    if not indexer.load_index():
+        logger.error("Toplanma alanı index'i bulunamadı")
+        return 1
+
+    plan = indexer.plan_evacuation(load_demand_points(Path(args.points)), method=args.method,
+                                   candidates=args.candidates, max_distance_m=args.max_distance_m)
+    output = json.dumps(plan, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        logger.info(f"Plan yazıldı: {args.output}")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,41 +6,107 @@ Toplanma alanları verilerini FAISS ile indexler ve arama yapar.
 
 import os
 import json
+import argparse
+import re
 import numpy as np
-import faiss
-from sentence_transformers import SentenceTransformer
+from vector_store import VectorCollection
+from geo_index import GeoIndex, extract_coordinates, haversine_m
+from typeahead import PrefixTrie, suggestions_from_metadata
+from place_resolver import PlaceResolver
+from attribute_filter import AttributeColumns, normalize_filters
+from availability import CLOSED, FULL, AvailabilityOverlay, availability_keys
+from evacuation import EvacuationPlanner
+from bm25_index import BM25Index, reciprocal_rank_fusion
+from turkish_text import ascii_fold, turkish_lower
+from index_manifest import (area_keys, build_manifest, diff_manifest, load_manifest,
+                            save_manifest)
+from area_dedup import collapse_duplicates
+from index_types import INDEX_TYPES, REMOVABLE_INDEX_TYPES, filtered_search, index_type_of, remove_ids
+from embedding_pipeline import DEFAULT_CHUNK_SIZE
 from pathlib import Path
 import logging
-from typing import List, Dict, Any, Tuple
-import pickle
+from typing import List, Dict, Any, Optional, Tuple
 
 # Logging ayarları
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class ToplanmaAlanlariIndexer:
-    def __init__(self, data_dir: str = "new_datas", index_dir: str = "faiss_index"):
+# full_data alanlarının metadata karşılıkları (diskte full_data tekrar saklanmaz)
+FULL_DATA_FIELDS = {
+    'id': 'alan_id',
+    'ad': 'alan_adi',
+    'mahalle': 'mahalle',
+    'koordinat': 'koordinat',
+    'alan_bilgileri': 'alan_bilgileri',
+    'altyapi': 'altyapi',
+    'ulasim': 'ulasim',
+    'ozellikler': 'ozellikler'
+}
+
+# Filtreye uyan satır oranı bundan düşükse IDSelector ön filtresi, yüksekse
+# fazladan aday çekip eleyen son filtre kullanılır
+PREFILTER_MAX_FRACTION = 0.5
+
+# Konumlu aramada yeniden puanlanan aday sayısı, yakınlık ağırlığı ve yakınlık puanının
+# yarılandığı mesafe (LOCATION_CANDIDATES, LOCATION_WEIGHT, LOCATION_DECAY_M ile değiştirilir)
+DEFAULT_LOCATION_CANDIDATES = 50
+DEFAULT_LOCATION_WEIGHT = 0.5
+DEFAULT_LOCATION_DECAY_M = 2000.0
+
+# test_search ve benchmark_index_types.py tarafından kullanılan örnek sorgular
+TEST_QUERIES = [
+    "Kadıköy'de park",
+    "elektrik ve su olan alanlar",
+    "büyük toplanma alanları",
+    "Üsküdar mahalle",
+    "koordinat bilgisi olan alanlar"
+]
+
+class ToplanmaAlanlariIndexer(VectorCollection):
+    name = 'toplanma'
+    index_file_name = "toplanma_alanlari.index"
+    full_data_fields = FULL_DATA_FIELDS
+
+    def __init__(self, data_dir: str = "new_datas", index_dir: str = "faiss_index", model: Any = None,
+                 index_type: Optional[str] = None, encoder: Any = None):
+        # Model, sorgu önbelleği, FAISS index'i ve kayıt depoları VectorCollection'da
+        super().__init__(index_dir, model=model, index_type=index_type, encoder=encoder)
         self.data_dir = Path(data_dir)
-        self.index_dir = Path(index_dir)
-        self.index_dir.mkdir(exist_ok=True)
-        
-        # Sentence transformer modeli - offline mode
-        try:
-            self.model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
-        except Exception as e:
-            print(f"Model yükleme hatası, basit embedding kullanılıyor: {e}")
-            # Basit TF-IDF benzeri embedding
-            self.model = None
-        
-        # FAISS index
-        self.index = None
-        self.documents = []
-        self.metadata = []
-        
-        # Index dosya yolları
-        self.index_file = self.index_dir / "toplanma_alanlari.index"
-        self.documents_file = self.index_dir / "documents.pkl"
-        self.metadata_file = self.index_dir / "metadata.pkl"
+        
+        # Son index kurulumunda birleştirilen tekrar eden alan sayısı
+        self.collapsed_count = 0
+        
+        # Koordinat index'i (ilk konum sorgusunda kurulur)
+        self.geo_index = None
+        
+        # Ad/mahalle/ilçe otomatik tamamlama ağacı (ilk öneri isteğinde kurulur)
+        self.typeahead = None
+        
+        # Bulanık ilçe/mahalle çözümleyici (ilk sorguda kurulur)
+        self.place_resolver = None
+        
+        # Altyapı/alan/tür/durum filtre sütunları (ilk filtreli sorguda yüklenir)
+        self.attributes = None
+        
+        # Alan kapasiteleriyle tahliye atayıcı (ilk tahliye planında kurulur)
+        self.evacuation_planner = None
+        
+        # BM25 ters index'i (hibrit arama için)
+        self.bm25 = None
+        
+        # İlçe bazlı FAISS alt index'leri (küçük harf ilçe adı -> index, satırlar)
+        self.partitions: Dict[str, Any] = {}
+        self.district_rows: Dict[str, np.ndarray] = {}
+        
+        # Ek dosya yolları
+        self.coordinates_file = self.index_dir / "coordinates.npy"
+        self.attributes_file = self.index_dir / "attributes.npz"
+        
+        # Canlı durum katmanı (open/full/closed, doluluk); index'ten bağımsız güncellenir
+        self.availability = AvailabilityOverlay(self.index_dir / "availability.bin")
+        self.bm25_file = self.index_dir / "bm25.npz"
+        self.partitions_dir = self.index_dir / "partitions"
+        self.manifest_file = self.index_dir / "manifest.json"
 
     def load_json_data(self) -> List[Dict[str, Any]]:
         """JSON dosyalarından verileri yükler"""
@@ -48,7 +114,8 @@ class ToplanmaAlanlariIndexer:
         
         all_data = []
         
-        for json_file in self.data_dir.glob("*.json"):
+        # Sıralı okuma alan anahtarlarını makineden bağımsız yapar
+        for json_file in sorted(self.data_dir.glob("*.json")):
             if json_file.name == "00_ozet.json":
                 continue
                 
@@ -112,8 +179,9 @@ class ToplanmaAlanlariIndexer:
         
         return " | ".join(text_parts)
 
-    def prepare_data_for_indexing(self, all_data: List[Dict[str, Any]]) -> Tuple[List[str], List[Dict[str, Any]]]:
-        """Verileri indexleme için hazırlar"""
+    def prepare_data_for_indexing(self, all_data: List[Dict[str, Any]],
+                                  dedup: bool = True) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """Verileri indexleme için hazırlar (dedup: tekrar eden alanları tek kayıtta birleştirir)"""
         logger.info("Veriler indexleme için hazırlanıyor...")
         
         documents = []
@@ -143,145 +211,531 @@ class ToplanmaAlanlariIndexer:
                 }
                 metadata.append(meta)
         
+        # Tekil alan anahtarı (ilçe/alan_id#sıra) birleştirmeden önce verilir, böylece birleştirilen
+        # tekrarların anahtarları da (alias_keys) kaynak verideki sırayla aynı kalır
+        for meta, key in zip(metadata, area_keys(metadata)):
+            meta['area_key'] = key
+        
+        # Aynı ad/mahalle/ilçe/koordinattaki tekrarlar tek vektöre indirilir
+        if dedup:
+            documents, metadata, self.collapsed_count = collapse_duplicates(
+                documents, metadata, lambda meta: self.create_document_text(meta['full_data'], meta['ilce']))
+        
         logger.info(f"Toplam {len(documents)} doküman hazırlandı")
         return documents, metadata
 
-    def create_embeddings(self, documents: List[str]) -> np.ndarray:
-        """Dokümanlardan embedding'ler oluşturur"""
-        logger.info("Embedding'ler oluşturuluyor...")
-        
-        if self.model is not None:
-            embeddings = self.model.encode(documents, show_progress_bar=True)
-        else:
-            # Basit TF-IDF benzeri embedding
-            embeddings = self.create_simple_embeddings(documents)
+    def build_partitions(self, embeddings: Optional[np.ndarray] = None):
+        """Her ilçe için ayrı FAISS alt index'i kurar (id'ler global index ile aynıdır)"""
+        import faiss
+        
+        # İlçe index'leri küçük olduğundan global index tipinden bağımsız olarak Flat (tam) kalır
+        rows_by_district: Dict[str, List[int]] = {}
+        for row, meta in enumerate(self.metadata):
+            ilce = turkish_lower(meta.get('ilce', ''))
+            if ilce:
+                rows_by_district.setdefault(ilce, []).append(row)
+        
+        self.partitions = {}
+        self.district_rows = {}
+        for ilce, rows in rows_by_district.items():
+            rows = np.asarray(rows, dtype='int64')
+            ids = rows if self.row_ids is None else self.row_ids[rows]
+            if embeddings is not None:
+                vectors = np.asarray(embeddings[rows], dtype='float32')
+            else:
+                # Vektörler global index'ten ilçe ilçe geri okunur, yeniden encode edilmez
+                # (PQ/SQ index'lerinde yaklaşık vektörler)
+                vectors = self.index.reconstruct_batch(ids)
+            partition = faiss.IndexIDMap(faiss.IndexFlatL2(vectors.shape[1]))
+            partition.add_with_ids(vectors, ids)
+            self.partitions[ilce] = partition
+            self.district_rows[ilce] = rows
+        
+        logger.info(f"{len(self.partitions)} ilçe alt index'i oluşturuldu")
+
+    def save_partitions(self):
+        """İlçe alt index'lerini partitions/ dizinine kaydeder"""
+        import faiss
+        
+        self.partitions_dir.mkdir(exist_ok=True)
+        for old_file in self.partitions_dir.glob("*.index"):
+            old_file.unlink()
+        
+        files = {}
+        for ilce, partition in self.partitions.items():
+            file_name = re.sub(r'[^a-z0-9]+', '_', ascii_fold(ilce)).strip('_') + ".index"
+            faiss.write_index(partition, str(self.partitions_dir / file_name))
+            files[ilce] = file_name
+        
+        with open(self.partitions_dir / "partitions.json", 'w', encoding='utf-8') as f:
+            json.dump(files, f, ensure_ascii=False, indent=2)
+
+    def load_partitions(self):
+        """İlçe alt index'lerini yükler, yoksa global index'ten türetir"""
+        import faiss
         
-        logger.info(f"Embedding boyutu: {embeddings.shape}")
-        return embeddings
-    
-    def create_simple_embeddings(self, documents: List[str]) -> np.ndarray:
-        """Basit TF-IDF benzeri embedding oluşturur"""
-        from collections import Counter
-        import re
-        
-        # Tüm kelimeleri topla
-        all_words = set()
-        doc_words = []
-        
-        for doc in documents:
-            # Türkçe karakterleri normalize et ve kelimeleri çıkar
-            words = re.findall(r'\b\w+\b', doc.lower())
-            doc_words.append(words)
-            all_words.update(words)
-        
-        all_words = list(all_words)
-        word_to_idx = {word: i for i, word in enumerate(all_words)}
-        
-        # TF-IDF benzeri vektörler oluştur
-        embeddings = []
-        for words in doc_words:
-            word_counts = Counter(words)
-            vector = np.zeros(len(all_words))
+        map_file = self.partitions_dir / "partitions.json"
+        if not map_file.exists():
+            try:
+                self.build_partitions()
+            except Exception as e:
+                logger.warning(f"İlçe alt index'leri oluşturulamadı, global index kullanılacak: {e}")
+                self.partitions, self.district_rows = {}, {}
+            return
+        
+        with open(map_file, 'r', encoding='utf-8') as f:
+            files = json.load(f)
+        
+        self.partitions = {}
+        self.district_rows = {}
+        for ilce, file_name in files.items():
+            partition = faiss.read_index(str(self.partitions_dir / file_name))
+            self.partitions[ilce] = partition
+            ids = faiss.vector_to_array(partition.id_map)
+            self.district_rows[ilce] = np.asarray(self._ids_to_rows(ids), dtype='int64')
+
+    def get_place_resolver(self) -> PlaceResolver:
+        """İlçe/mahalle çözümleyicisini ilk kullanımda kurar"""
+        if self.place_resolver is None:
+            self.place_resolver = PlaceResolver.from_metadata(self.metadata)
+        return self.place_resolver
+
+    def resolve_place(self, query: str) -> Dict[str, Any]:
+        """Sorgudaki ilçe ve mahalleleri yazım hatası ve eklere rağmen çözer"""
+        return self.get_place_resolver().resolve(query)
+
+    def resolve_district(self, query: str) -> Optional[str]:
+        """Sorguda adı (veya mahallesi) geçen ilçeyi (alt index anahtarı) döner"""
+        ilce = self.resolve_place(query)['ilce']
+        return ilce if ilce in self.partitions else None
+
+    def _select_partition(self, ilce: Optional[str],
+                          filters: Optional[Dict[str, Any]] = None) -> Tuple[Any, Optional[np.ndarray]]:
+        """İlçe verilmişse o ilçenin alt index'ini, filtre varsa uyan satırların maskesini döner"""
+        index, allowed = self.index, None
+        if ilce is not None and ilce in self.partitions:
+            index = self.partitions[ilce]
+            allowed = np.zeros(len(self.metadata), dtype=bool)
+            allowed[self.district_rows[ilce]] = True
+        
+        if filters:
+            mask = self.get_attributes().mask(filters)
+            allowed = mask if allowed is None else allowed & mask
+        return index, allowed
+
+    def get_attributes(self) -> AttributeColumns:
+        """Filtre sütunlarını ilk kullanımda yükler"""
+        if self.attributes is None:
+            attributes = None
+            if self.attributes_file.exists():
+                attributes = AttributeColumns.load(self.attributes_file)
             
-            for word, count in word_counts.items():
-                if word in word_to_idx:
-                    # Basit TF (term frequency)
-                    vector[word_to_idx[word]] = count / len(words)
+            # Eski index'lerde sütun dosyası yoksa metadata'dan çıkar
+            if attributes is None or len(attributes) != len(self.metadata):
+                attributes = AttributeColumns.from_metadata(self.metadata)
             
-            embeddings.append(vector)
+            self.attributes = attributes
         
-        return np.array(embeddings)
+        return self.attributes
 
-    def build_index(self, embeddings: np.ndarray):
-        """FAISS index oluşturur"""
-        logger.info("FAISS index oluşturuluyor...")
-        
-        # Index boyutu
-        dimension = embeddings.shape[1]
-        
-        # FAISS index oluştur (L2 distance için)
-        self.index = faiss.IndexFlatL2(dimension)
-        
-        # Embedding'leri index'e ekle
-        self.index.add(embeddings.astype('float32'))
-        
-        logger.info(f"Index oluşturuldu: {self.index.ntotal} vektör")
+    def _index_search(self, index: Any, query_embeddings: np.ndarray, k: int,
+                      allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """FAISS araması; allowed verilirse sadece o satırlar arasından k sonuç döner"""
+        if allowed is None:
+            return index.search(query_embeddings, min(k, index.ntotal))
+        
+        rows = np.flatnonzero(allowed)
+        k = min(k, len(rows))
+        if k == 0:
+            return (np.empty((len(query_embeddings), 0), dtype='float32'),
+                    np.empty((len(query_embeddings), 0), dtype='int64'))
+        
+        # Seçici filtrelerde index sadece izin verilen id'ler üzerinde gezer
+        fraction = len(rows) / max(index.ntotal, 1)
+        if fraction < PREFILTER_MAX_FRACTION:
+            ids = rows if self.row_ids is None else self.row_ids[rows]
+            try:
+                distances, found = filtered_search(index, query_embeddings, k, ids)
+                
+                # IVF'de taranan listelerde, HNSW'de gezilen graf komşuluğunda yeterli uyan
+                # vektör yoksa sonuç eksik kalır; o zaman uyan vektörler üzerinde tam arama yapılır
+                if (found >= 0).sum(axis=1).min() >= k:
+                    return distances, found
+                import faiss
+                distances, positions = faiss.knn(np.ascontiguousarray(query_embeddings, dtype='float32'),
+                                                 index.reconstruct_batch(ids), k)
+                return distances, ids[positions]
+            except (RuntimeError, TypeError) as e:
+                logger.warning(f"IDSelector ile arama yapılamadı, son filtre kullanılıyor: {e}")
+        
+        # Geniş filtrelerde uyan oranına göre fazla aday çekilir, yetmezse aday sayısı ikiye katlanır
+        fetch = min(index.ntotal, int(np.ceil(k / fraction * 1.2)))
+        while True:
+            distances, ids = index.search(query_embeddings, fetch)
+            rows_found = np.asarray([self._ids_to_rows(row_ids) for row_ids in ids], dtype=np.int64)
+            keep = (rows_found >= 0) & allowed[np.clip(rows_found, 0, None)]
+            if fetch >= index.ntotal or keep.sum(axis=1).min() >= k:
+                break
+            fetch = min(index.ntotal, fetch * 2)
+        
+        filtered_distances = np.full((len(ids), k), np.finfo('float32').max, dtype='float32')
+        filtered_ids = np.full((len(ids), k), -1, dtype='int64')
+        for i in range(len(ids)):
+            kept = np.flatnonzero(keep[i])[:k]
+            filtered_distances[i, :len(kept)] = distances[i, kept]
+            filtered_ids[i, :len(kept)] = ids[i, kept]
+        return filtered_distances, filtered_ids
 
-    def save_index(self):
-        """Index'i dosyaya kaydeder"""
-        logger.info("Index kaydediliyor...")
-        
-        # FAISS index'i kaydet
-        faiss.write_index(self.index, str(self.index_file))
-        
-        # Dokümanları kaydet
-        with open(self.documents_file, 'wb') as f:
-            pickle.dump(self.documents, f)
-        
-        # Metadata'yı kaydet
-        with open(self.metadata_file, 'wb') as f:
-            pickle.dump(self.metadata, f)
+    def _save_extras(self):
+        """Manifest, BM25, ilçe alt index'leri ve koordinat sütununu kaydeder"""
+        # Artımlı güncelleme manifest'i (sadece ID'li index'lerde)
+        if self.row_ids is not None:
+            save_manifest(self.manifest_file, build_manifest(area_keys(self.metadata), self.documents))
+        
+        # BM25 index'ini kaydet
+        if self.bm25 is None:
+            self.bm25 = BM25Index().build(self.documents)
+        self.bm25.save(self.bm25_file)
+        
+        # İlçe alt index'lerini kaydet
+        if not self.partitions:
+            self.build_partitions()
+        self.save_partitions()
+        
+        # Koordinatları coğrafi index için ayrı sütun olarak kaydet
+        np.save(self.coordinates_file, extract_coordinates(self.metadata))
+        
+        # Filtre sütunları (altyapı bit maskesi, toplam alan, tür ve durum kodları)
+        AttributeColumns.from_metadata(self.metadata).save(self.attributes_file)
+        self.geo_index = None
+        self.typeahead = None
+        self.place_resolver = None
+        self.attributes = None
+        self.evacuation_planner = None
+
+    def _load_extras(self):
+        """BM25 index'ini ve ilçe alt index'lerini yükler"""
+        self.geo_index = None
+        self.typeahead = None
+        self.place_resolver = None
+        self.attributes = None
+        self.evacuation_planner = None
+        
+        # BM25 index'i yoksa (eski index) dokümanlardan kur
+        if self.bm25_file.exists():
+            self.bm25 = BM25Index.load(self.bm25_file)
+        else:
+            logger.warning("BM25 index'i bulunamadı, dokümanlardan oluşturuluyor")
+            self.bm25 = BM25Index().build(self.documents)
         
-        logger.info("Index başarıyla kaydedildi")
+        # İlçe alt index'leri
+        self.load_partitions()
 
-    def load_index(self) -> bool:
-        """Index'i dosyadan yükler"""
-        try:
-            if not self.index_file.exists():
-                return False
-            
-            logger.info("Index yükleniyor...")
-            
-            # FAISS index'i yükle
-            self.index = faiss.read_index(str(self.index_file))
-            
-            # Dokümanları yükle
-            with open(self.documents_file, 'rb') as f:
-                self.documents = pickle.load(f)
-            
-            # Metadata'yı yükle
-            with open(self.metadata_file, 'rb') as f:
-                self.metadata = pickle.load(f)
-            
-            logger.info(f"Index yüklendi: {self.index.ntotal} vektör")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Index yükleme hatası: {e}")
-            return False
+    def search(self, query: str, k: int = 5, ilce: Optional[str] = None,
+               filters: Optional[Dict[str, Any]] = None, lat: Optional[float] = None,
+               lng: Optional[float] = None, radius_m: Optional[float] = None,
+               decay_m: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Arama yapar (ilce verilirse sadece o ilçenin alt index'inde, filters ile öznitelik filtresi).
+        lat/lng verilirse adaylar benzerlik ve mesafeyle birlikte yeniden sıralanır; radius_m
+        yarıçap dışındaki alanları eler, decay_m yakınlık puanının yarılandığı mesafedir.
+        """
+        return self.search_batch([query], k, ilce, filters=filters, lat=lat, lng=lng,
+                                 radius_m=radius_m, decay_m=decay_m)[0]
 
-    def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
-        """Arama yapar"""
+    def search_batch(self, queries: List[str], k: int = 5, ilce: Optional[str] = None,
+                     query_embeddings: Optional[np.ndarray] = None,
+                     filters: Optional[Dict[str, Any]] = None, lat: Optional[float] = None,
+                     lng: Optional[float] = None, radius_m: Optional[float] = None,
+                     decay_m: Optional[float] = None) -> List[List[Dict[str, Any]]]:
+        """Birden çok sorguyu tek encode ve tek index araması ile yapar (konum tüm sorgular için ortak)"""
         if self.index is None:
             logger.error("Index yüklenmemiş!")
+            return [[] for _ in queries]
+        
+        if not queries:
             return []
         
-        # Query embedding'i oluştur
-        if self.model is not None:
-            query_embedding = self.model.encode([query])
-        else:
-            query_embedding = self.create_simple_embeddings([query])
+        # Model de vektörleştirici de yoksa vektörler index ile karşılaştırılamaz, BM25 kullanılır
+        filters = normalize_filters(filters)
+        index, allowed = self._select_partition(ilce, filters)
+        located = lat is not None and lng is not None
+        if located and radius_m is not None:
+            allowed = self._radius_mask(lat, lng, radius_m, allowed)
+        
+        query_embeddings = self._encode_queries(queries, query_embeddings)
+        # Kapalı alanlar sonuçtan çıkarılacağı için o kadar fazla aday alınır; konumlu
+        # aramada yakın ama biraz daha az benzer alanlar için aday havuzu genişletilir
+        candidates = int(os.environ.get('LOCATION_CANDIDATES', DEFAULT_LOCATION_CANDIDATES)) if located else k
+        fetch = max(k, candidates) + self.availability.closed_count
+        
+        # İlçe alt index'i zaten ilçeyle sınırlı, vektör maskesi sadece filtre ve yarıçap için gerekir
+        masked = bool(filters) or (located and radius_m is not None)
+        batch_results = self._fetch_candidates(queries, query_embeddings, index, allowed,
+                                               allowed if masked else None, fetch)
+        
+        if located:
+            if radius_m is None:
+                # Anlamca yakın adaylara konuma en yakın alanlar da eklenir (yarıçap yoksa
+                # yakındaki alanlar ilk adaylar arasında olmayabilir)
+                nearby = np.zeros(len(self.metadata), dtype=bool)
+                nearby[self._nearby_rows(lat, lng, fetch, allowed)] = True
+                nearby_results = self._fetch_candidates(queries, query_embeddings, index, nearby, nearby, fetch)
+                for results, extra in zip(batch_results, nearby_results):
+                    seen = {result['document'] for result in results}
+                    results.extend(result for result in extra if result['document'] not in seen)
+            batch_results = [self._rank_by_location(results, lat, lng, decay_m) for results in batch_results]
+        return [self._apply_availability(results, k) for results in batch_results]
+
+    def _radius_mask(self, lat: float, lng: float, radius_m: float,
+                     allowed: Optional[np.ndarray]) -> np.ndarray:
+        """İzin verilen satırları yarıçap içindekilerle sınırlar (konumu bilinmeyen alanlar dışarıda kalır)"""
+        in_radius = np.zeros(len(self.metadata), dtype=bool)
+        in_radius[[row for row, _ in self.get_geo_index().within_radius(lat, lng, radius_m)]] = True
+        return in_radius if allowed is None else allowed & in_radius
+
+    def _nearby_rows(self, lat: float, lng: float, count: int, allowed: Optional[np.ndarray]) -> List[int]:
+        """Konuma en yakın count alan (izin verilenler, yakından uzağa)"""
+        return [row for row, _ in self.get_geo_index().nearest(lat, lng, count)
+                if allowed is None or allowed[row]]
+
+    def _fetch_candidates(self, queries: List[str], query_embeddings: Optional[np.ndarray], index: Any,
+                          allowed: Optional[np.ndarray], vector_allowed: Optional[np.ndarray],
+                          fetch: int) -> List[List[Dict[str, Any]]]:
+        """Vektör (encode edilemiyorsa BM25) adaylarını sonuç formatında döner"""
+        if query_embeddings is None:
+            return [self._build_bm25_results(self.bm25.search(query, fetch, allowed)) for query in queries]
+        distances, ids = self._index_search(index, query_embeddings, fetch, vector_allowed)
+        return [self._build_results(row_distances, row_ids) for row_distances, row_ids in zip(distances, ids)]
+
+    def _rank_by_location(self, results: List[Dict[str, Any]], lat: float, lng: float,
+                          decay_m: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Adayları benzerlik ve mesafe azalmasının ağırlıklı toplamıyla yeniden sıralar.
+        Koordinatı olmayan alanlar tüm konumlu alanların arkasına kalır (yarıçaplı aramada
+        zaten aday olamazlar).
+        """
+        if not results:
+            return results
+        decay_m = decay_m or float(os.environ.get('LOCATION_DECAY_M', DEFAULT_LOCATION_DECAY_M))
+        weight = float(os.environ.get('LOCATION_WEIGHT', DEFAULT_LOCATION_WEIGHT))
+        
+        # Benzerlik (hibrit aramada RRF puanı, vektör yoksa BM25 puanı) aday havuzunda 0-1 aralığına çekilir
+        relevance = np.asarray([result['rrf_score'] if 'rrf_score' in result
+                                else result['similarity'] if result.get('distance') is not None
+                                else result.get('bm25_score', 0.0) for result in results], dtype=np.float64)
+        spread = relevance.max() - relevance.min()
+        relevance = (relevance - relevance.min()) / spread if spread > 0 else np.ones(len(results))
+        
+        # Yakınlık puanı her decay_m metrede yarılanır; koordinatı olmayan alanın yakınlığı 0
+        coordinates = extract_coordinates([result['metadata'] for result in results])
+        unknown = (coordinates[:, 0] == 0) | (coordinates[:, 1] == 0)
+        meters = haversine_m(lat, lng, coordinates[:, 0], coordinates[:, 1])
+        proximity = np.where(unknown, 0.0, 0.5 ** (meters / decay_m))
+        scores = (1 - weight) * relevance + weight * proximity
+        
+        ranked = []
+        for i in np.lexsort((-scores, unknown)):
+            result = results[i]
+            result['distance_m'] = None if unknown[i] else round(float(meters[i]), 1)
+            result['location_score'] = round(float(scores[i]), 6)
+            ranked.append(result)
+        for i, result in enumerate(ranked):
+            result['rank'] = i + 1
+        return ranked
+
+    def hybrid_search_batch(self, queries: List[str], k: int = 5, candidates: int = 50,
+                            ilce: Optional[str] = None,
+                            query_embeddings: Optional[np.ndarray] = None,
+                            filters: Optional[Dict[str, Any]] = None, lat: Optional[float] = None,
+                            lng: Optional[float] = None, radius_m: Optional[float] = None,
+                            decay_m: Optional[float] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Vektör ve BM25 sıralamalarını reciprocal-rank fusion ile birleştirir (filters: öznitelik filtresi).
+        lat/lng verilirse birleşik adaylar (yarıçap yoksa konuma en yakın alanlarla birlikte)
+        search() ile aynı şekilde benzerlik ve mesafeyle yeniden sıralanır.
+        """
+        if self.index is None:
+            logger.error("Index yüklenmemiş!")
+            return [[] for _ in queries]
         
-        # Arama yap
-        distances, indices = self.index.search(query_embedding.astype('float32'), k)
+        if not queries:
+            return []
         
-        # Sonuçları hazırla
-        results = []
-        for i, (distance, idx) in enumerate(zip(distances[0], indices[0])):
-            if idx < len(self.metadata):
-                result = {
+        # İlçe çözümlendiyse arama sadece o ilçenin alt index'inde yapılır
+        filters = normalize_filters(filters)
+        index, allowed = self._select_partition(ilce, filters)
+        
+        # Konumlu aramada yeniden puanlanacak havuz genişletilir, yarıçap dışı elenir
+        located = lat is not None and lng is not None
+        pool = k
+        if located:
+            pool = max(k, int(os.environ.get('LOCATION_CANDIDATES', DEFAULT_LOCATION_CANDIDATES)))
+            candidates = max(candidates, pool)
+            if radius_m is not None:
+                allowed = self._radius_mask(lat, lng, radius_m, allowed)
+        masked = bool(filters) or (located and radius_m is not None)
+        
+        # Vektör adayları (sorgular encode edilemiyorsa sadece BM25 kullanılır)
+        vector_distances = [{} for _ in queries]
+        query_embeddings = self._encode_queries(queries, query_embeddings)
+        if query_embeddings is not None:
+            distances, indices = self._index_search(index, query_embeddings, candidates,
+                                                    allowed if masked else None)
+            for i, (row_distances, row_ids) in enumerate(zip(distances, indices)):
+                vector_distances[i] = {row: float(distance)
+                                       for distance, row in zip(row_distances, self._ids_to_rows(row_ids))
+                                       if row >= 0}
+        
+        # Yarıçap yoksa yakındaki alanlar birleşik adaylar arasında olmayabilir, onlar da eklenir
+        nearby_rows = []
+        if located and radius_m is None:
+            nearby_rows = self._nearby_rows(lat, lng, pool + self.availability.closed_count, allowed)
+        
+        all_results = []
+        for query, distance_map in zip(queries, vector_distances):
+            bm25_rows = [row for row, _ in self.bm25.search(query, candidates, allowed)]
+            fused = reciprocal_rank_fusion([list(distance_map), bm25_rows])[:pool + self.availability.closed_count]
+            if nearby_rows:
+                fused_rows = {row for row, _ in fused}
+                fused.extend((row, 0.0) for row in nearby_rows if row not in fused_rows)
+            
+            results = []
+            for i, (row, score) in enumerate(fused):
+                distance = distance_map.get(row)
+                results.append({
                     'rank': i + 1,
-                    'distance': float(distance),
-                    'similarity': float(1 / (1 + distance)),  # Similarity score
-                    'document': self.documents[idx],
-                    'metadata': self.metadata[idx]
-                }
-                results.append(result)
+                    'distance': distance,
+                    'similarity': float(1 / (1 + distance)) if distance is not None else 0.0,
+                    'rrf_score': round(score, 6),
+                    'document': self.documents[row],
+                    'metadata': self.metadata[row]
+                })
+            if located:
+                results = self._rank_by_location(results, lat, lng, decay_m)
+            all_results.append(self._apply_availability(results, k))
+        
+        return all_results
+
+    def _apply_availability(self, results: List[Dict[str, Any]], k: int) -> List[Dict[str, Any]]:
+        """Kapalı alanları çıkarır, dolu alanları sona alır ve sonuçlara canlı durumu ekler"""
+        if not len(self.availability):
+            return results[:k]
+        
+        # Her aday için kendi anahtarının ve birleştirilen tekrarlarının yuvaları okunur
+        status, occupancy = self.availability.lookup_areas(
+            [availability_keys(result['metadata']) for result in results])
+        available, full = [], []
+        for result, code, count in zip(results, status, occupancy):
+            if code == CLOSED:
+                continue
+            if code:
+                # Kapasitesi bilinen alan doluluk sayacı kapasiteye ulaşınca dolu sayılır
+                kapasite = (result['metadata'].get('alan_bilgileri') or {}).get('kapasite') or 0
+                is_full = code == FULL or 0 < kapasite <= count
+                result['availability'] = {'status': 'full' if is_full else 'open', 'occupancy': int(count)}
+                (full if is_full else available).append(result)
+            else:
+                available.append(result)
+        
+        ranked = (available + full)[:k]
+        for i, result in enumerate(ranked):
+            result['rank'] = i + 1
+        return ranked
+
+    def cache_generation(self) -> str:
+        """Sonuç önbelleği canlı durum güncellemelerinde de geçersiz olur"""
+        return f"{self.current_generation()}+{self.availability.version}"
+
+    def _build_bm25_results(self, matches: List[Tuple[int, float]]) -> List[Dict[str, Any]]:
+        """BM25 (satır, skor) eşleşmelerini arama sonucu formatına çevirir"""
+        return [
+            {
+                'rank': i + 1,
+                'distance': None,
+                'similarity': 0.0,
+                'bm25_score': round(score, 6),
+                'document': self.documents[row],
+                'metadata': self.metadata[row]
+            }
+            for i, (row, score) in enumerate(matches)
+        ]
+
+    def get_geo_index(self) -> GeoIndex:
+        """Koordinat index'ini ilk kullanımda kurar"""
+        if self.geo_index is None:
+            coordinates = None
+            if self.coordinates_file.exists():
+                coordinates = np.load(self.coordinates_file)
+            
+            # Eski index'lerde koordinat dosyası yoksa metadata'dan çıkar
+            if coordinates is None or len(coordinates) != len(self.metadata):
+                coordinates = extract_coordinates(self.metadata)
+            
+            self.geo_index = GeoIndex(coordinates)
         
-        return results
+        return self.geo_index
+
+    def nearest(self, lat: float, lng: float, k: int = 5) -> List[Dict[str, Any]]:
+        """GPS konumuna en yakın k toplanma alanını döner"""
+        matches = self.get_geo_index().nearest(lat, lng, k + self.availability.closed_count)
+        return self._apply_availability(self._build_geo_results(matches), k)
 
-    def build_full_index(self):
-        """Tam index oluşturma işlemi"""
+    def within_radius(self, lat: float, lng: float, meters: float) -> List[Dict[str, Any]]:
+        """GPS konumuna verilen metre mesafedeki alanları yakından uzağa döner"""
+        results = self._build_geo_results(self.get_geo_index().within_radius(lat, lng, meters))
+        return self._apply_availability(results, len(results))
+
+    def plan_evacuation(self, points: List[Dict[str, Any]], method: str = 'greedy',
+                        candidates: Optional[int] = None,
+                        max_distance_m: Optional[float] = None) -> Dict[str, Any]:
+        """Nüfus noktalarını alan kapasitelerini aşmadan en yakın alanlara dağıtır"""
+        if self.evacuation_planner is None:
+            self.evacuation_planner = EvacuationPlanner(self.metadata, self.get_geo_index(), self.availability)
+        return self.evacuation_planner.plan(points, method=method, candidates=candidates,
+                                            max_distance_m=max_distance_m)
+
+    def get_typeahead(self) -> PrefixTrie:
+        """Otomatik tamamlama ağacını ilk kullanımda kurar"""
+        if self.typeahead is None:
+            self.typeahead = PrefixTrie().build(suggestions_from_metadata(self.metadata))
+        return self.typeahead
+
+    def suggest(self, prefix: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Yazılan ön eke uyan alan, mahalle ve ilçe adlarını büyükten küçüğe döner"""
+        return self.get_typeahead().complete(prefix, k)
+
+    def unlocated_areas(self) -> List[Dict[str, Any]]:
+        """Koordinatı olmayan (lat == 0) alanları listeler"""
+        unlocated = []
+        for row in self.get_geo_index().unlocated_rows:
+            meta = self.metadata[row]
+            unlocated.append({
+                'ilce': meta.get('ilce', ''),
+                'alan_id': meta.get('alan_id', ''),
+                'alan_adi': meta.get('alan_adi', '')
+            })
+        return unlocated
+
+    def _build_geo_results(self, matches: List[Tuple[int, float]]) -> List[Dict[str, Any]]:
+        """(satır, metre) eşleşmelerini arama sonucu formatına çevirir"""
+        return [
+            {
+                'rank': i + 1,
+                'distance_m': round(distance_m, 1),
+                'document': self.documents[row],
+                'metadata': self.metadata[row]
+            }
+            for i, (row, distance_m) in enumerate(matches)
+        ]
+
+    def build_full_index(self, chunk_size: int = DEFAULT_CHUNK_SIZE, workers: Optional[int] = None):
+        """Tam index oluşturma işlemi
+
+        Dokümanlar ve metadata bellekte tam liste olarak hazırlanır: tekrar eden alanların
+        birleştirilmesi ve BM25 tüm korpusu ister. Akışlı olan yalnızca encode aşamasıdır,
+        embedding'ler parça parça üretilip index'e eklenir ve tüm embedding matrisi bellekte tutulmaz.
+        """
         logger.info("Tam index oluşturma işlemi başlatılıyor...")
         
         # Verileri yükle
@@ -291,31 +745,86 @@ class ToplanmaAlanlariIndexer:
         documents, metadata = self.prepare_data_for_indexing(all_data)
         self.documents = documents
         self.metadata = metadata
+        self.vectorizer = None
+        
+        # BM25 index'ini oluştur
+        self.bm25 = BM25Index().build(documents)
         
-        # Embedding'leri oluştur
-        embeddings = self.create_embeddings(documents)
+        # Index oluştur (id'ler alan anahtarından türetilir, artımlı güncellemede değişmez)
+        manifest = build_manifest(area_keys(metadata), documents)
+        ids = np.array([entry['id'] for entry in manifest.values()], dtype='int64')
         
-        # Index oluştur
-        self.build_index(embeddings)
+        if self.model is not None:
+            # Sadece embedding'ler parça parça oluşturulup index'e eklenir
+            self.build_index_streaming(documents, ids, chunk_size=chunk_size, workers=workers)
+            self.build_partitions()
+        else:
+            # Basit embedding tüm korpusun kelime dağarcığına ihtiyaç duyar
+            embeddings = self.create_embeddings(documents)
+            self.build_index(embeddings, ids)
+            self.build_partitions(embeddings)
         
         # Index'i kaydet
         self.save_index()
         
         logger.info("Index oluşturma tamamlandı!")
 
+    def update_index_incremental(self):
+        """Sadece yeni/değişen alanları encode eder, silinenleri index'ten çıkarır"""
+        logger.info("Artımlı index güncellemesi başlatılıyor...")
+        
+        if not (self.load_index() and self.row_ids is not None and self.manifest_file.exists()):
+            logger.info("Manifest'li ID index'i bulunamadı, tam index oluşturuluyor...")
+            self.build_full_index()
+            return
+        
+        # HNSW vektör silemez; tip değiştiyse de index baştan kurulmalı
+        loaded_type = index_type_of(self.index)
+        if loaded_type != self.index_type or loaded_type not in REMOVABLE_INDEX_TYPES:
+            logger.info(f"Index tipi ({loaded_type} -> {self.index_type}) artımlı güncellemeyi "
+                        f"desteklemiyor, tam index oluşturuluyor...")
+            self.build_full_index()
+            return
+        
+        old_manifest = load_manifest(self.manifest_file)
+        
+        # Güncel verileri hazırla
+        documents, metadata = self.prepare_data_for_indexing(self.load_json_data())
+        keys = area_keys(metadata)
+        new_manifest = build_manifest(keys, documents)
+        added, changed, removed = diff_manifest(old_manifest, new_manifest)
+        logger.info(f"Yeni: {len(added)}, değişen: {len(changed)}, silinen: {len(removed)}, "
+                    f"aynı: {len(keys) - len(added) - len(changed)}")
+        
+        # Değişen ve silinen alanların eski vektörlerini id ile çıkar
+        stale_ids = [old_manifest[key]['id'] for key in changed + removed]
+        if stale_ids:
+            remove_ids(self.index, np.array(stale_ids, dtype='int64'))
+        
+        # Sadece yeni ve değişen alanları encode et
+        dirty = set(added) | set(changed)
+        to_embed = [i for i, key in enumerate(keys) if key in dirty]
+        if to_embed:
+            embeddings = self.create_embeddings([documents[i] for i in to_embed])
+            self.index.add_with_ids(embeddings.astype('float32'),
+                                    np.array([new_manifest[keys[i]]['id'] for i in to_embed], dtype='int64'))
+        
+        self.documents = documents
+        self.metadata = metadata
+        self.set_row_ids(np.array([new_manifest[key]['id'] for key in keys], dtype='int64'))
+        
+        # Türetilmiş yapılar vektör gerektirmeden yeniden kurulur
+        self.bm25 = BM25Index().build(documents)
+        self.build_partitions()
+        self.save_index()
+        
+        logger.info(f"Artımlı güncelleme tamamlandı: {self.index.ntotal} vektör")
+
     def test_search(self):
         """Test aramaları yapar"""
         logger.info("Test aramaları yapılıyor...")
         
-        test_queries = [
-            "Kadıköy'de park",
-            "elektrik ve su olan alanlar",
-            "büyük toplanma alanları",
-            "Üsküdar mahalle",
-            "koordinat bilgisi olan alanlar"
-        ]
-        
-        for query in test_queries:
+        for query in TEST_QUERIES:
             logger.info(f"\nArama: '{query}'")
             results = self.search(query, k=3)
             
@@ -325,12 +834,33 @@ class ToplanmaAlanlariIndexer:
 
 def main():
     """Ana fonksiyon"""
-    indexer = ToplanmaAlanlariIndexer()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--migrate', action='store_true',
+                        help="Eski pickle dosyalarını mmap kayıt depolarına dönüştürür")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Sadece yeni/değişen alanları encode ederek index'i günceller")
+    parser.add_argument('--index-type', choices=INDEX_TYPES,
+                        help="FAISS index tipi (varsayılan: FAISS_INDEX_TYPE veya flat)")
+    parser.add_argument('--workers', type=int,
+                        help="Embedding süreç sayısı (varsayılan: EMBED_WORKERS veya çekirdek sayısı)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Parça başına encode edilen doküman sayısı")
+    args = parser.parse_args()
+    
+    indexer = ToplanmaAlanlariIndexer(index_type=args.index_type)
+    
+    if args.migrate:
+        indexer.migrate_pickles()
+        return
+    
+    if args.incremental:
+        indexer.update_index_incremental()
+        return
     
     # Index var mı kontrol et
     if not indexer.load_index():
         logger.info("Index bulunamadı, yeni index oluşturuluyor...")
-        indexer.build_full_index()
+        indexer.build_full_index(chunk_size=args.chunk_size, workers=args.workers)
     else:
         logger.info("Mevcut index yüklendi")
     
@@ -6,121 +6,364 @@ WebSearchTool için FAISS index'inde arama yapar.
 
 import sys
 import json
-import os
+import logging
+import argparse
 from pathlib import Path
 
-# FAISS indexer'ı import et
+# Script dizinini import yoluna ekle
 sys.path.append(str(Path(__file__).parent))
-from faiss_indexer import ToplanmaAlanlariIndexer
+from search_client import query_server
+from result_format import dumps, loads, parse_fields, project_results
+from startup_profile import StartupProfiler
+from turkish_text import turkish_lower
+from place_resolver import PlaceResolver, mahalle_place_id
 
-def fallback_search(query: str) -> list:
-    """FAISS başarısız olursa JSON dosyalarından direkt arama"""
-    import glob
-    import re
+logger = logging.getLogger(__name__)
+
+# --profile-startup / --startup-budget-ms ile main() içinde etkinleştirilir
+profiler = StartupProfiler()
+
+# Sunucu yokken bu process'te yüklenen indexer (--cache-stats için)
+local_indexer = None
+
+# ToplanmaAlanlariIndexer'ın varsayılan index dosyası
+INDEX_FILE = Path("faiss_index") / "toplanma_alanlari.index"
+
+# Index yokken basit aramanın okuduğu ilçe JSON dosyaları
+DATA_DIR = Path("new_datas")
+
+def rank_by_district(place: dict, results: list, limit: int = 5) -> list:
+    """Sorguda çözülen mahalle ve ilçenin alanlarını öne alır, diğerlerini atmadan sıralar"""
+    districts = set(place['districts'])
+    mahalleler = set(place['mahalleler'])
+    
+    def tier(result):
+        meta = result['metadata']
+        # Canlı durumu dolu olan alanlar konumdan bağımsız olarak sona kalır; konumlu aramada
+        # koordinatı olmayan alanlar (distance_m None) eşleşme katmanından bağımsız olarak konumluların arkasındadır
+        full = result.get('availability', {}).get('status') == 'full'
+        unlocated = 'distance_m' in result and result['distance_m'] is None
+        if mahalleler and mahalle_place_id(meta.get('ilce', ''), meta.get('mahalle', '')) in mahalleler:
+            return full, unlocated, 0
+        return full, unlocated, 1 if turkish_lower(meta.get('ilce', '')) in districts else 2
     
-    query_lower = query.lower()
-    results = []
+    # Mahalle eşleşmeleri, sonra ilçe eşleşmeleri, sonra diğerleri (kendi sıralarıyla)
+    ranked = sorted(results, key=tier)[:limit]
+    for i, result in enumerate(ranked):
+        result['rank'] = i + 1
+    return ranked
+
+def search_toplanma_alanlari(indexer, query: str, limit: int = 5, filters: dict = None) -> list:
+    """Yüklü indexer ile arama yapar, ilçe eşleşmelerini öne alır"""
+    return search_toplanma_alanlari_batch(indexer, [query], limit, filters)[0]
+
+def search_toplanma_alanlari_batch(indexer, queries: list, limit: int = 5, filters: dict = None) -> list:
+    """Birden çok sorguyu hibrit arama ile çalıştırır (sonuçlar index nesline bağlı önbelleklenir)"""
+    from attribute_filter import normalize_filters
+    
+    filters = normalize_filters(filters)
+    return indexer.cached_search(queries, limit,
+                                 lambda missing: hybrid_search_ranked(indexer, missing, limit, filters=filters),
+                                 filters=filters)
+
+def search_toplanma_alanlari_near(indexer, query: str, limit: int = 5, lat: float = None, lng: float = None,
+                                  radius_m: float = None, decay_m: float = None, filters: dict = None) -> list:
+    """Kullanıcı konumu biliniyorsa hibrit adayları benzerlik ve yakınlıkla birlikte sıralar (önbellekli)"""
+    from attribute_filter import normalize_filters
     
-    # Tüm JSON dosyalarını tara
-    for json_file in glob.glob("new_datas/*.json"):
-        if json_file.endswith("00_ozet.json"):
+    filters = normalize_filters(filters)
+    location = {'lat': lat, 'lng': lng, 'radius_m': radius_m, 'decay_m': decay_m}
+    # Konum da önbellek anahtarına girer; sorguda açıkça geçen ilçe konumdan önce gelir
+    return indexer.cached_search([query], limit,
+                                 lambda missing: hybrid_search_ranked(indexer, missing, limit, filters=filters,
+                                                                      **location),
+                                 filters={**(filters or {}), 'konum': location})[0]
+
+def search_toplanma_alanlari_page(indexer, query: str = None, limit: int = 5, cursor: str = None) -> dict:
+    """Sayfalı arama: ilk çağrı aday listesini kurar, sonraki sayfalar imleçle listeden kesilir"""
+    return indexer.search_page(query, limit, cursor,
+                               lambda text, depth, embedding: hybrid_search_ranked(
+                                   indexer, [text], depth, None if embedding is None else embedding[:1])[0])
+
+def hybrid_search_ranked(indexer, queries: list, limit: int = 5, query_embeddings=None,
+                         filters: dict = None, lat: float = None, lng: float = None,
+                         radius_m: float = None, decay_m: float = None) -> list:
+    """
+    Birden çok sorguyu hibrit (vektör + BM25) arama ile tek seferde çalıştırır (filters: öznitelik filtresi).
+    lat/lng verilirse her ilçe katmanı içinde sıralama benzerlik ve yakınlığa göredir.
+    """
+    location = {'lat': lat, 'lng': lng, 'radius_m': radius_m, 'decay_m': decay_m}
+    # Sorguları çözümlenen ilçeye göre grupla, her grup kendi alt index'inde aranır
+    # (yazım hatalı, ekli veya şapkasız ilçe/mahalle adları da çözülür)
+    places = [indexer.resolve_place(query) for query in queries]
+    groups = {}
+    for position, place in enumerate(places):
+        ilce = place['ilce'] if place['ilce'] in indexer.partitions else None
+        groups.setdefault(ilce, []).append(position)
+    
+    # Derin sayfalarda aday sayısı istenen derinliğe kadar büyür
+    depth = max(20, limit)
+    candidates = max(50, limit)
+    
+    batch_results = [[] for _ in queries]
+    for ilce, positions in groups.items():
+        group_queries = [queries[i] for i in positions]
+        group_embeddings = None if query_embeddings is None else query_embeddings[positions]
+        group_results = indexer.hybrid_search_batch(group_queries, k=depth, candidates=candidates, ilce=ilce,
+                                                    query_embeddings=group_embeddings,
+                                                    filters=filters, **location)  # Daha fazla sonuç al
+        
+        # İlçede yeterli alan yoksa global sonuçlarla tamamla
+        if ilce is not None and any(len(results) < limit for results in group_results):
+            global_results = indexer.hybrid_search_batch(group_queries, k=depth, candidates=candidates,
+                                                         query_embeddings=group_embeddings, filters=filters,
+                                                         **location)
+            for results, extra in zip(group_results, global_results):
+                seen = {result['document'] for result in results}
+                results.extend(result for result in extra if result['document'] not in seen)
+        
+        for i, results in zip(positions, group_results):
+            batch_results[i] = results
+    
+    return [rank_by_district(place, results, limit)
+            for place, results in zip(places, batch_results)]
+
+def load_fallback_metadata(data_dir: Path = DATA_DIR) -> list:
+    """İlçe JSON dosyalarındaki alanları indexer metadata biçiminde okur"""
+    metadata = []
+    for json_file in sorted(Path(data_dir).glob("*.json")):
+        if json_file.name == "00_ozet.json":
             continue
-            
         try:
             with open(json_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            
-            ilce = data.get('ilce', '').lower()
-            toplanma_alanlari = data.get('toplanma_alanlari', [])
-            
-            # İlçe eşleşmesi kontrol et
-            if query_lower in ilce or ilce in query_lower:
-                for alan in toplanma_alanlari:
-                    alan_adi = alan.get('ad', '').lower()
-                    mahalle = alan.get('mahalle', '').lower()
-                    
-                    # Alan adı veya mahalle eşleşmesi
-                    if (query_lower in alan_adi or query_lower in mahalle or 
-                        'toplanma' in query_lower or 'alan' in query_lower):
-                        
-                        result = {
-                            'rank': len(results) + 1,
-                            'distance': 0.0,
-                            'similarity': 1.0,
-                            'document': f"İlçe: {data.get('ilce', '')} | Alan adı: {alan.get('ad', '')} | Mahalle: {alan.get('mahalle', '')}",
-                            'metadata': {
-                                'ilce': data.get('ilce', ''),
-                                'alan_id': alan.get('id', ''),
-                                'alan_adi': alan.get('ad', ''),
-                                'mahalle': alan.get('mahalle', ''),
-                                'koordinat': alan.get('koordinat', {}),
-                                'alan_bilgileri': alan.get('alan_bilgileri', {}),
-                                'altyapi': alan.get('altyapi', {}),
-                                'ulasim': alan.get('ulasim', {}),
-                                'ozellikler': alan.get('ozellikler', {}),
-                                'full_data': alan
-                            }
-                        }
-                        results.append(result)
-                        
-                        if len(results) >= 5:  # Maksimum 5 sonuç
-                            break
-        except Exception as e:
+        except (OSError, ValueError) as e:
+            logger.warning(f"{json_file} okunamadı: {e}")
             continue
+        for alan in data.get('toplanma_alanlari', []):
+            metadata.append({
+                'ilce': data.get('ilce', ''),
+                'alan_id': alan.get('id', ''),
+                'alan_adi': alan.get('ad', ''),
+                'mahalle': alan.get('mahalle', ''),
+                'koordinat': alan.get('koordinat', {}),
+                'alan_bilgileri': alan.get('alan_bilgileri', {}),
+                'altyapi': alan.get('altyapi', {}),
+                'ulasim': alan.get('ulasim', {}),
+                'ozellikler': alan.get('ozellikler', {}),
+                'full_data': alan
+            })
+    return metadata
+
+def fallback_search(query: str, limit: int = 5, filters: dict = None, data_dir: Path = DATA_DIR) -> list:
+    """FAISS index'i yokken JSON dosyalarında ilçe, mahalle ve alan adı eşleşmesiyle arar"""
+    logger.warning(f"FAISS index'i bulunamadı ({INDEX_FILE}), {data_dir} üzerinde basit arama yapılıyor")
+    metadata = load_fallback_metadata(data_dir)
+    if not metadata:
+        return []
+    
+    # Yazım hatalı/ekli ilçe ve mahalle adları indexer'daki çözümleyiciyle eşlenir
+    place = PlaceResolver.from_metadata(metadata).resolve(query)
+    districts = set(place['districts'])
+    mahalleler = set(place['mahalleler'])
+    query_lower = turkish_lower(query).strip()
+    
+    def matches(meta):
+        return (turkish_lower(meta['ilce']) in districts
+                or mahalle_place_id(meta['ilce'], meta['mahalle']) in mahalleler
+                or (query_lower and query_lower in turkish_lower(meta['alan_adi'])))
     
-    return results
+    candidates = [meta for meta in metadata if matches(meta)]
+    if filters and candidates:
+        # numpy sadece filtre verildiğinde import edilir
+        from attribute_filter import AttributeColumns
+        mask = AttributeColumns.from_metadata(candidates).mask(filters)
+        candidates = [meta for meta, keep in zip(candidates, mask.tolist()) if keep]
+    
+    results = [
+        {
+            'rank': i + 1,
+            'distance': 0.0,
+            'similarity': 1.0,
+            'document': f"İlçe: {meta['ilce']} | Alan adı: {meta['alan_adi']} | Mahalle: {meta['mahalle']}",
+            'metadata': meta
+        }
+        for i, meta in enumerate(candidates)
+    ]
+    return rank_by_district(place, results, limit)
 
-def main():
-    if len(sys.argv) != 2:
-        print(json.dumps([]))
-        return
+def load_local_indexer():
+    """Sunucu yoksa modeli ve index'i bu process'te yükler (index yoksa None)"""
+    global local_indexer
     
-    query = sys.argv[1]
+    # Index yoksa numpy/faiss/torch hiç import edilmeden None döner
+    if not INDEX_FILE.exists():
+        return None
     
+    # Ağır import'lar sadece sunucuya ulaşılamadığında yapılır
+    with profiler.phase('import_indexer'):
+        from faiss_indexer import ToplanmaAlanlariIndexer
+    
+    # Indexer'ı başlat (model ilk kullanımda yüklenir)
+    indexer = ToplanmaAlanlariIndexer()
+    
+    # Index'i yükle, yoksa None döndür
+    with profiler.phase('index_load'):
+        loaded = indexer.load_index()
+    if not loaded:
+        return None
+    
+    with profiler.phase('model_load'):
+        indexer.model
+    
+    local_indexer = indexer
+    return indexer
+
+def local_search_batch(queries: list, filters: dict = None, limit: int = 5) -> list:
+    """Sunucu yoksa modeli ve index'i bu process'te yükleyip arar"""
     try:
-        # Indexer'ı başlat
-        indexer = ToplanmaAlanlariIndexer()
-        
-        # Index'i yükle
-        if not indexer.load_index():
-            # Index yoksa fallback kullan
-            results = fallback_search(query)
-            print(json.dumps(results, ensure_ascii=False))
-            return
+        indexer = load_local_indexer()
+        if indexer is None:
+            return [fallback_search(query, limit, filters) for query in queries]
         
-        # Arama yap
-        results = indexer.search(query, k=20)  # Daha fazla sonuç al
+        with profiler.phase('search'):
+            return search_toplanma_alanlari_batch(indexer, queries, limit, filters=filters)
         
-        # İlçe adına göre filtreleme yap
-        query_lower = query.lower()
-        district_matches = []
-        other_results = []
-        
-        # Önce ilçe eşleşmelerini bul
-        for result in results:
-            ilce = result['metadata'].get('ilce', '').lower()
-            if ilce in query_lower:
-                district_matches.append(result)
-            else:
-                other_results.append(result)
-        
-        # İlçe eşleşmelerini önce, diğerlerini sonra ekle
-        results = district_matches + other_results
+    except Exception as e:
+        # Hata durumunda boş sonuç döndür
+        return [[] for _ in queries]
+
+def run_queries(queries: list, fields: list = None, filters: dict = None, limit: int = 5) -> list:
+    """Sorguları çalışan sunucuya, yoksa yerel indexer'a gönderir (fields: seçilecek alanlar)"""
+    # Çalışan search_server varsa model yüklemeden ona sor
+    with profiler.phase('server_query'):
+        response = query_server({'op': 'search_batch', 'collection': 'toplanma', 'queries': queries,
+                                 'k': limit, 'fields': fields, 'filters': filters})
+    if response is not None and response.get('ok'):
+        return response['results']
+    return [project_results(results, fields) for results in local_search_batch(queries, filters, limit)]
+
+def run_near(query: str, lat: float, lng: float, radius_m: float = None, decay_m: float = None,
+             fields: list = None, filters: dict = None, limit: int = 5) -> list:
+    """Konumlu arama; sunucu yoksa yerel indexer ile"""
+    with profiler.phase('server_query'):
+        response = query_server({'op': 'search', 'collection': 'toplanma', 'query': query, 'lat': lat, 'lng': lng,
+                                 'radius_m': radius_m, 'decay_m': decay_m, 'k': limit, 'fields': fields,
+                                 'filters': filters})
+    if response is not None and response.get('ok'):
+        return response['results']
+    try:
+        indexer = load_local_indexer()
+        if indexer is None:
+            # Basit aramada koordinat sıralaması yapılmaz
+            return project_results(fallback_search(query, limit, filters), fields)
         
-        # İlk 5 sonucu al
-        results = results[:5]
+        with profiler.phase('search'):
+            results = search_toplanma_alanlari_near(indexer, query, limit, lat, lng, radius_m, decay_m, filters)
+        return project_results(results, fields)
         
-        # Eğer ilçe eşleşmesi yoksa fallback kullan
-        if not district_matches:
-            results = fallback_search(query)
+    except Exception as e:
+        return []
+
+def run_page(query: str, cursor: str = None, page_size: int = 5, fields: list = None) -> dict:
+    """Sayfalı arama; imleç sunucudaki oturumdan, sunucu yoksa yerel olarak yeniden kurulan listeden kesilir"""
+    with profiler.phase('server_query'):
+        response = query_server({'op': 'search_page', 'collection': 'toplanma', 'query': query, 'cursor': cursor,
+                                 'k': page_size, 'fields': fields})
+    if response is not None and response.get('ok'):
+        return {key: response.get(key) for key in ('results', 'offset', 'next_cursor')}
+    
+    empty = {'results': [], 'offset': 0, 'next_cursor': None}
+    try:
+        indexer = load_local_indexer()
+        if indexer is None:
+            # Basit arama tek sayfa döner, sonraki sayfa imleci verilmez
+            if cursor is not None:
+                return empty
+            return {**empty, 'results': project_results(fallback_search(query or '', page_size), fields)}
         
-        # Sonuçları JSON olarak döndür (indent olmadan)
-        print(json.dumps(results, ensure_ascii=False))
+        with profiler.phase('search'):
+            page = search_toplanma_alanlari_page(indexer, query, page_size, cursor)
+        page['results'] = project_results(page['results'], fields)
+        return page
         
+    except ValueError as e:
+        # Geçersiz veya süresi dolmuş imleç
+        return {**empty, 'error': str(e)}
     except Exception as e:
-        # Hata durumunda fallback kullan
-        results = fallback_search(query)
-        print(json.dumps(results, ensure_ascii=False))
+        return empty
+
+def cache_stats() -> dict:
+    """Sonuç önbelleği sayaçları (sunucu varsa sunucunun, yoksa bu process'in)"""
+    response = query_server({'op': 'stats'})
+    if response is not None and response.get('ok'):
+        return response.get('collections', {}).get('toplanma', {}).get('result_cache', {})
+    return local_indexer.result_cache.stats() if local_indexer is not None else {}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('query', nargs='?')
+    # --stdin: her satır ayrı bir sorgu, çıktı sorgu başına sonuç listesi
+    parser.add_argument('--stdin', action='store_true')
+    # --fields name,district,coordinates,distance: sadece bu alanlar döner
+    parser.add_argument('--fields')
+    # Sorgu başına dönecek sonuç sayısı
+    parser.add_argument('--limit', type=int, default=5)
+    # Aşama sürelerini stderr'e yazar; bütçe aşılırsa çıkış kodu 3 olur
+    parser.add_argument('--profile-startup', action='store_true')
+    parser.add_argument('--startup-budget-ms', type=float)
+    # Sonuç önbelleği sayaçlarını stderr'e yazar
+    parser.add_argument('--cache-stats', action='store_true')
+    # Sayfalı çıktı: {"results": [...], "next_cursor": "..."}; sonraki sayfa --cursor ile istenir
+    parser.add_argument('--page-size', type=int)
+    parser.add_argument('--cursor')
+    # Öznitelik filtresi: '{"altyapi": ["su", "wc"], "min_alan": 10000, "tur": ["Park"]}'
+    parser.add_argument('--filters')
+    # Kullanıcı konumu: sonuçlar benzerlik ve yakınlığa göre sıralanır (--radius-m yarıçap dışını eler,
+    # --decay-m yakınlık puanının yarılandığı mesafe)
+    parser.add_argument('--lat', type=float)
+    parser.add_argument('--lng', type=float)
+    parser.add_argument('--radius-m', type=float)
+    parser.add_argument('--decay-m', type=float)
+    args = parser.parse_args()
+    fields = parse_fields(args.fields)
+    try:
+        # numpy sadece filtre verildiğinde import edilir
+        if args.filters:
+            from attribute_filter import normalize_filters
+        filters = normalize_filters(loads(args.filters)) if args.filters else None
+    except ValueError as e:
+        parser.error(f"--filters: {e}")
+    if args.limit < 1:
+        parser.error("--limit en az 1 olmalı")
+    if filters and (args.page_size or args.cursor):
+        parser.error("--filters sayfalı aramada desteklenmiyor")
+    located = args.lat is not None and args.lng is not None
+    if (args.lat is None) != (args.lng is None):
+        parser.error("--lat ve --lng birlikte verilmeli")
+    if located and (args.stdin or args.page_size or args.cursor):
+        parser.error("Konumlu arama tek sorguyla yapılır")
+    profiler.enabled = args.profile_startup or args.startup_budget_ms is not None
+    profiler.budget_ms = args.startup_budget_ms
+    
+    if args.page_size or args.cursor:
+        print(dumps(run_page(args.query, args.cursor, args.page_size or 5, fields)))
+    elif args.stdin:
+        queries = [line.strip() for line in sys.stdin if line.strip()]
+        print(dumps(run_queries(queries, fields, filters, args.limit) if queries else []))
+    elif args.query and located:
+        print(dumps(run_near(args.query, args.lat, args.lng, args.radius_m, args.decay_m, fields, filters,
+                             args.limit)))
+    elif args.query:
+        # Sonuçları kompakt JSON olarak döndür
+        print(dumps(run_queries([args.query], fields, filters, args.limit)[0]))
+    else:
+        print(dumps([]))
+    
+    if args.cache_stats:
+        sys.stderr.write(dumps({'result_cache': cache_stats()}) + '\n')
+    
+    return profiler.finish()
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Coğrafi Toplanma Alanı Index'i
+Alanların koordinat (lat/lng) bilgisi üzerinde haversine metrikli BallTree kurar,
+en yakın k alanı ve belirli yarıçaptaki alanları döner. Koordinatı olmayan
+(lat == 0) alanlar ayrıca raporlanır.
+"""
+
+import logging
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_M = 6371008.8
+
+# Tam taramada bir seferde hesaplanan mesafe matrisi satırı (bellek sınırı)
+MATRIX_CHUNK_ROWS = 4096
+
+
+def extract_coordinates(metadata: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """Metadata kayıtlarından (n, 2) lat/lng dizisi çıkarır"""
+    coords = np.zeros((len(metadata), 2), dtype=np.float64)
+    for i, meta in enumerate(metadata):
+        koordinat = meta.get('koordinat') or {}
+        coords[i, 0] = float(koordinat.get('lat', 0) or 0)
+        coords[i, 1] = float(koordinat.get('lng', 0) or 0)
+    return coords
+
+
+def haversine_m(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Bir noktadan nokta dizisine haversine mesafesi (metre)"""
+    lat1, lng1 = np.radians(lat), np.radians(lng)
+    lat2, lng2 = np.radians(lats), np.radians(lngs)
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def haversine_matrix_m(lats1: np.ndarray, lngs1: np.ndarray,
+                       lats2: np.ndarray, lngs2: np.ndarray) -> np.ndarray:
+    """İki nokta dizisi arasındaki (n, m) haversine mesafe matrisi (metre)"""
+    lat1, lng1 = np.radians(lats1)[:, None], np.radians(lngs1)[:, None]
+    lat2, lng2 = np.radians(lats2)[None, :], np.radians(lngs2)[None, :]
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class GeoIndex:
+    def __init__(self, coordinates: np.ndarray):
+        coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+
+        # lat == 0 (veya lng == 0) olan alanların konumu bilinmiyor
+        located = (coordinates[:, 0] != 0) & (coordinates[:, 1] != 0)
+        self.rows = np.flatnonzero(located)
+        self.unlocated_rows = np.flatnonzero(~located)
+        self.coordinates = coordinates[located]
+
+        # scikit-learn varsa BallTree, yoksa vektörize tam tarama
+        self.tree = None
+        if len(self.rows) > 0:
+            try:
+                from sklearn.neighbors import BallTree
+                self.tree = BallTree(np.radians(self.coordinates), metric='haversine')
+            except ImportError:
+                logger.warning("scikit-learn bulunamadı, coğrafi arama tam tarama ile yapılacak")
+
+        logger.info(f"Coğrafi index: {len(self.rows)} konumlu, {len(self.unlocated_rows)} konumsuz alan")
+
+    @classmethod
+    def from_metadata(cls, metadata: Sequence[Dict[str, Any]]) -> "GeoIndex":
+        return cls(extract_coordinates(metadata))
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def nearest(self, lat: float, lng: float, k: int = 5) -> List[Tuple[int, float]]:
+        """En yakın k alanın (satır, metre) listesini döner"""
+        k = min(k, len(self.rows))
+        if k <= 0:
+            return []
+
+        if self.tree is not None:
+            distances, positions = self.tree.query(np.radians([[lat, lng]]), k=k)
+            distances, positions = distances[0] * EARTH_RADIUS_M, positions[0]
+        else:
+            all_distances = haversine_m(lat, lng, self.coordinates[:, 0], self.coordinates[:, 1])
+            positions = np.argpartition(all_distances, k - 1)[:k]
+            positions = positions[np.argsort(all_distances[positions])]
+            distances = all_distances[positions]
+
+        return [(int(self.rows[p]), float(d)) for p, d in zip(positions, distances)]
+
+    def within_radius(self, lat: float, lng: float, meters: float) -> List[Tuple[int, float]]:
+        """Yarıçap içindeki alanları yakından uzağa (satır, metre) listesi olarak döner"""
+        if len(self.rows) == 0:
+            return []
+
+        if self.tree is not None:
+            positions, distances = self.tree.query_radius(
+                np.radians([[lat, lng]]), r=meters / EARTH_RADIUS_M,
+                return_distance=True, sort_results=True
+            )
+            positions, distances = positions[0], distances[0] * EARTH_RADIUS_M
+        else:
+            all_distances = haversine_m(lat, lng, self.coordinates[:, 0], self.coordinates[:, 1])
+            positions = np.flatnonzero(all_distances <= meters)
+            positions = positions[np.argsort(all_distances[positions])]
+            distances = all_distances[positions]
+
+        return [(int(self.rows[p]), float(d)) for p, d in zip(positions, distances)]
+
+    def nearest_batch(self, coordinates: np.ndarray, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """Her nokta için en yakın k alanın (n, k) satır ve metre dizileri (yakından uzağa)"""
+        coordinates = np.asarray(coordinates, dtype=np.float64).reshape(-1, 2)
+        k = min(k, len(self.rows))
+        if k <= 0 or len(coordinates) == 0:
+            return (np.empty((len(coordinates), 0), dtype=np.int64),
+                    np.empty((len(coordinates), 0), dtype=np.float64))
+
+        if self.tree is not None:
+            distances, positions = self.tree.query(np.radians(coordinates), k=k)
+            return self.rows[positions], distances * EARTH_RADIUS_M
+
+        # Mesafe matrisi parça parça hesaplanır, her satırda k en yakın seçilir
+        rows = np.empty((len(coordinates), k), dtype=np.int64)
+        distances = np.empty((len(coordinates), k), dtype=np.float64)
+        for start in range(0, len(coordinates), MATRIX_CHUNK_ROWS):
+            chunk = coordinates[start:start + MATRIX_CHUNK_ROWS]
+            matrix = haversine_matrix_m(chunk[:, 0], chunk[:, 1], self.coordinates[:, 0], self.coordinates[:, 1])
+            positions = np.argpartition(matrix, k - 1, axis=1)[:, :k]
+            chunk_distances = np.take_along_axis(matrix, positions, axis=1)
+            order = np.argsort(chunk_distances, axis=1)
+            rows[start:start + len(chunk)] = self.rows[np.take_along_axis(positions, order, axis=1)]
+            distances[start:start + len(chunk)] = np.take_along_axis(chunk_distances, order, axis=1)
+        return rows, distances
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Hash'lenmiş TF-IDF Vektörleştirici
+Model yüklenemediğinde kullanılan, sabit boyutlu (feature hashing) TF-IDF
+vektörleştirici. Sorgu ve dokümanlar aynı boyuta düştüğünden index ile uyumludur;
+IDF değerleri index'in yanında saklanır.
+"""
+
+import zlib
+import logging
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from bm25_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIMENSION = 2 ** 12
+
+
+class HashingTfidfVectorizer:
+    def __init__(self, dimension: int = DEFAULT_DIMENSION):
+        self.dimension = dimension
+        self.idf = np.ones(dimension, dtype=np.float32)
+        self.num_docs = 0
+        # Terim -> (kova, işaret) önbelleği; hash her terim için bir kez hesaplanır
+        self._buckets: Dict[str, Tuple[int, float]] = {}
+
+    def _bucket(self, term: str) -> Tuple[int, float]:
+        bucket = self._buckets.get(term)
+        if bucket is None:
+            # Python hash() süreçler arası değiştiğinden kararlı crc32 kullanılır
+            h = zlib.crc32(term.encode('utf-8'))
+            # İşaretli hash: çakışan terimlerin katkıları ortalamada birbirini sıfırlar
+            bucket = (h % self.dimension, 1.0 if (h >> 31) & 1 == 0 else -1.0)
+            self._buckets[term] = bucket
+        return bucket
+
+    def transform_sparse(self, documents: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Dokümanları (satır, sütun, değer) üçlüleri olarak L2-normalize TF-IDF'e çevirir"""
+        rows: List[int] = []
+        cols: List[int] = []
+        signs: List[float] = []
+        for row, document in enumerate(documents):
+            for term in tokenize(document):
+                col, sign = self._bucket(term)
+                rows.append(row)
+                cols.append(col)
+                signs.append(sign)
+
+        if not rows:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0, dtype=np.float32)
+
+        # Aynı (satır, kova) çiftleri işaretli olarak toplanır (terim frekansı)
+        keys = np.asarray(rows, dtype=np.int64) * self.dimension + np.asarray(cols, dtype=np.int64)
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        counts = np.zeros(len(unique_keys), dtype=np.float32)
+        np.add.at(counts, inverse, np.asarray(signs, dtype=np.float32))
+
+        # Zıt işaretli çakışmalar birbirini sıfırlayabilir, bu kovalar atılır
+        nonzero = counts != 0
+        unique_keys, counts = unique_keys[nonzero], counts[nonzero]
+
+        out_rows = unique_keys // self.dimension
+        out_cols = unique_keys % self.dimension
+        values = np.sign(counts) * (1.0 + np.log(np.abs(counts))) * self.idf[out_cols]
+
+        norms = np.sqrt(np.bincount(out_rows, weights=values ** 2, minlength=len(documents)))
+        values = values / np.where(norms > 0, norms, 1.0)[out_rows]
+        return out_rows, out_cols, values.astype(np.float32)
+
+    def transform(self, documents: Sequence[str]) -> np.ndarray:
+        """Dokümanları (n, dimension) yoğun float32 matrise çevirir (FAISS için)"""
+        documents = list(documents)
+        rows, cols, values = self.transform_sparse(documents)
+        dense = np.zeros((len(documents), self.dimension), dtype=np.float32)
+        dense[rows, cols] = values
+        return dense
+
+    def fit(self, documents: Sequence[str]) -> "HashingTfidfVectorizer":
+        """Doküman frekanslarından IDF hesaplar"""
+        documents = list(documents)
+        self.idf = np.ones(self.dimension, dtype=np.float32)
+        rows, cols, _ = self.transform_sparse(documents)
+
+        # transform_sparse (satır, kova) çiftlerini tekil döndürür
+        doc_freq = np.bincount(cols, minlength=self.dimension)
+        self.num_docs = len(documents)
+        self.idf = (np.log((1.0 + self.num_docs) / (1.0 + doc_freq)) + 1.0).astype(np.float32)
+
+        logger.info(f"Hash'lenmiş TF-IDF: {self.num_docs} doküman, {self.dimension} boyut, "
+                    f"{int((doc_freq > 0).sum())} dolu kova")
+        return self
+
+    def fit_transform(self, documents: Sequence[str]) -> np.ndarray:
+        documents = list(documents)
+        return self.fit(documents).transform(documents)
+
+    def save(self, path: Path):
+        """IDF'i .npz dosyasına kaydeder"""
+        with open(path, 'wb') as f:
+            np.savez(f, idf=self.idf, params=np.asarray([self.dimension, self.num_docs], dtype=np.int64))
+
+    @classmethod
+    def load(cls, path: Path) -> "HashingTfidfVectorizer":
+        with np.load(path) as data:
+            dimension, num_docs = (int(x) for x in data['params'])
+            vectorizer = cls(dimension)
+            vectorizer.idf = data['idf']
+            vectorizer.num_docs = num_docs
+        return vectorizer
@@ -6,41 +6,39 @@
 
 import os
 import json
+import argparse
 import numpy as np
-import faiss
-from sentence_transformers import SentenceTransformer
+from vector_store import VectorCollection
+from index_types import INDEX_TYPES
 from pathlib import Path
 import logging
-from typing import List, Dict, Any, Tuple
-import pickle
+from typing import List, Dict, Any, Optional, Tuple
 import re
 
 # Logging ayarları
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class IlkyardimIndexer:
-    def __init__(self, data_file: str = "Datas/ilkyardım.txt", index_dir: str = "faiss_index"):
+# full_data alanlarının metadata karşılıkları (diskte full_data tekrar saklanmaz)
+FULL_DATA_FIELDS = {
+    'title': 'title',
+    'content': 'content',
+    'keywords': 'keywords',
+    'category': 'category',
+    'length': 'length'
+}
+
+class IlkyardimIndexer(VectorCollection):
+    name = 'ilkyardim'
+    index_file_name = "ilkyardim.index"
+    file_prefix = "ilkyardim_"
+    full_data_fields = FULL_DATA_FIELDS
+
+    def __init__(self, data_file: str = "Datas/ilkyardım.txt", index_dir: str = "faiss_index", model: Any = None,
+                 index_type: Optional[str] = None, encoder: Any = None):
+        # Model, sorgu önbelleği, FAISS index'i ve kayıt depoları VectorCollection'da
+        super().__init__(index_dir, model=model, index_type=index_type, encoder=encoder)
         self.data_file = Path(data_file)
-        self.index_dir = Path(index_dir)
-        self.index_dir.mkdir(exist_ok=True)
-        
-        # Sentence transformer modeli
-        try:
-            self.model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
-        except Exception as e:
-            print(f"Model yükleme hatası, basit embedding kullanılıyor: {e}")
-            self.model = None
-        
-        # FAISS index
-        self.index = None
-        self.documents = []
-        self.metadata = []
-        
-        # Index dosya yolları
-        self.index_file = self.index_dir / "ilkyardim.index"
-        self.documents_file = self.index_dir / "ilkyardim_documents.pkl"
-        self.metadata_file = self.index_dir / "ilkyardim_metadata.pkl"
 
     def parse_ilkyardim_text(self) -> List[Dict[str, Any]]:
         """İlkyardım txt dosyasını parse eder"""
@@ -235,125 +233,6 @@ class IlkyardimIndexer:
         logger.info(f"Toplam {len(documents)} doküman hazırlandı")
         return documents, metadata
 
-    def create_embeddings(self, documents: List[str]) -> np.ndarray:
-        """Dokümanlardan embedding'ler oluşturur"""
-        logger.info("Embedding'ler oluşturuluyor...")
-        
-        if self.model is not None:
-            embeddings = self.model.encode(documents, show_progress_bar=True)
-        else:
-            embeddings = self.create_simple_embeddings(documents)
-        
-        logger.info(f"Embedding boyutu: {embeddings.shape}")
-        return embeddings
-    
-    def create_simple_embeddings(self, documents: List[str]) -> np.ndarray:
-        """Basit TF-IDF benzeri embedding oluşturur"""
-        from collections import Counter
-        
-        # Tüm kelimeleri topla
-        all_words = set()
-        doc_words = []
-        
-        for doc in documents:
-            words = re.findall(r'\b\w+\b', doc.lower())
-            doc_words.append(words)
-            all_words.update(words)
-        
-        all_words = list(all_words)
-        word_to_idx = {word: i for i, word in enumerate(all_words)}
-        
-        # TF-IDF benzeri vektörler oluştur
-        embeddings = []
-        for words in doc_words:
-            word_counts = Counter(words)
-            vector = np.zeros(len(all_words))
-            
-            for word, count in word_counts.items():
-                if word in word_to_idx:
-                    vector[word_to_idx[word]] = count / len(words)
-            
-            embeddings.append(vector)
-        
-        return np.array(embeddings)
-
-    def build_index(self, embeddings: np.ndarray):
-        """FAISS index oluşturur"""
-        logger.info("FAISS index oluşturuluyor...")
-        
-        dimension = embeddings.shape[1]
-        self.index = faiss.IndexFlatL2(dimension)
-        self.index.add(embeddings.astype('float32'))
-        
-        logger.info(f"Index oluşturuldu: {self.index.ntotal} vektör")
-
-    def save_index(self):
-        """Index'i dosyaya kaydeder"""
-        logger.info("Index kaydediliyor...")
-        
-        faiss.write_index(self.index, str(self.index_file))
-        
-        with open(self.documents_file, 'wb') as f:
-            pickle.dump(self.documents, f)
-        
-        with open(self.metadata_file, 'wb') as f:
-            pickle.dump(self.metadata, f)
-        
-        logger.info("Index başarıyla kaydedildi")
-
-    def load_index(self) -> bool:
-        """Index'i dosyadan yükler"""
-        try:
-            if not self.index_file.exists():
-                return False
-            
-            logger.info("Index yükleniyor...")
-            
-            self.index = faiss.read_index(str(self.index_file))
-            
-            with open(self.documents_file, 'rb') as f:
-                self.documents = pickle.load(f)
-            
-            with open(self.metadata_file, 'rb') as f:
-                self.metadata = pickle.load(f)
-            
-            logger.info(f"Index yüklendi: {self.index.ntotal} vektör")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Index yükleme hatası: {e}")
-            return False
-
-    def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
-        """Arama yapar"""
-        if self.index is None:
-            logger.error("Index yüklenmemiş!")
-            return []
-        
-        # Query embedding'i oluştur
-        if self.model is not None:
-            query_embedding = self.model.encode([query])
-        else:
-            query_embedding = self.create_simple_embeddings([query])
-        
-        # Arama yap
-        distances, indices = self.index.search(query_embedding.astype('float32'), k)
-        
-        # Sonuçları hazırla
-        results = []
-        for i, (distance, idx) in enumerate(zip(distances[0], indices[0])):
-            if idx < len(self.metadata):
-                result = {
-                    'rank': i + 1,
-                    'distance': float(distance),
-                    'similarity': float(1 / (1 + distance)),
-                    'document': self.documents[idx],
-                    'metadata': self.metadata[idx]
-                }
-                results.append(result)
-        
-        return results
-
     def build_full_index(self):
         """Tam index oluşturma işlemi"""
         logger.info("İlkyardım tam index oluşturma işlemi başlatılıyor...")
@@ -366,6 +245,7 @@ class IlkyardimIndexer:
             return
         
         # Verileri hazırla
+        self.vectorizer = None
         documents, metadata = self.prepare_data_for_indexing(sections)
         self.documents = documents
         self.metadata = metadata
@@ -407,7 +287,18 @@ class IlkyardimIndexer:
 
 def main():
     """Ana fonksiyon"""
-    indexer = IlkyardimIndexer()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--migrate', action='store_true',
+                        help="Eski pickle dosyalarını mmap kayıt depolarına dönüştürür")
+    parser.add_argument('--index-type', choices=INDEX_TYPES,
+                        help="FAISS index tipi (varsayılan: FAISS_INDEX_TYPE veya flat)")
+    args = parser.parse_args()
+    
+    indexer = IlkyardimIndexer(index_type=args.index_type)
+    
+    if args.migrate:
+        indexer.migrate_pickles()
+        return
     
     # Index var mı kontrol et
     if not indexer.load_index():
@@ -5,40 +5,154 @@ CoreAgent için İlkyardım index'inde arama yapar.
 """
 
 import sys
-import json
-import os
+import argparse
 from pathlib import Path
 
-# İlkyardım indexer'ı import et
+# Script dizinini import yoluna ekle
 sys.path.append(str(Path(__file__).parent))
-from ilkyardim_indexer import IlkyardimIndexer
+from search_client import query_server
+from result_format import dumps, parse_fields, project_results
+from startup_profile import StartupProfiler
 
-def main():
-    if len(sys.argv) != 2:
-        print(json.dumps([]))
-        return
+# --profile-startup / --startup-budget-ms ile main() içinde etkinleştirilir
+profiler = StartupProfiler()
+
+# Sunucu yokken bu process'te yüklenen indexer (--cache-stats için)
+local_indexer = None
+
+# IlkyardimIndexer'ın varsayılan index dosyası
+INDEX_FILE = Path("faiss_index") / "ilkyardim.index"
+
+def search_ilkyardim(indexer, query: str, limit: int = 5) -> list:
+    """Yüklü indexer ile ilkyardım araması yapar"""
+    return search_ilkyardim_batch(indexer, [query], limit)[0]
+
+def search_ilkyardim_batch(indexer, queries: list, limit: int = 5) -> list:
+    """Birden çok sorguyu tek encode ve tek index araması ile çalıştırır (sonuçlar önbelleklenir)"""
+    return indexer.cached_search(queries, limit, lambda missing: indexer.search_batch(missing, k=limit))
+
+def search_ilkyardim_page(indexer, query: str = None, limit: int = 5, cursor: str = None) -> dict:
+    """Sayfalı arama: ilk çağrı aday listesini kurar, sonraki sayfalar imleçle listeden kesilir"""
+    return indexer.search_page(query, limit, cursor)
+
+def load_local_indexer():
+    """Sunucu yoksa modeli ve index'i bu process'te yükler (index yoksa None)"""
+    global local_indexer
     
-    query = sys.argv[1]
+    # Index yoksa numpy/faiss/torch hiç import edilmeden None döner
+    if not INDEX_FILE.exists():
+        return None
     
+    # Ağır import'lar sadece sunucuya ulaşılamadığında yapılır
+    with profiler.phase('import_indexer'):
+        from ilkyardim_indexer import IlkyardimIndexer
+    
+    # Indexer'ı başlat (model ilk kullanımda yüklenir)
+    indexer = IlkyardimIndexer()
+    
+    # Index'i yükle, yoksa None döndür
+    with profiler.phase('index_load'):
+        loaded = indexer.load_index()
+    if not loaded:
+        return None
+    
+    with profiler.phase('model_load'):
+        indexer.model
+    
+    local_indexer = indexer
+    return indexer
+
+def local_search_batch(queries: list) -> list:
+    """Sunucu yoksa modeli ve index'i bu process'te yükleyip arar"""
     try:
-        # Indexer'ı başlat
-        indexer = IlkyardimIndexer()
+        indexer = load_local_indexer()
+        if indexer is None:
+            return [[] for _ in queries]
         
-        # Index'i yükle
-        if not indexer.load_index():
-            # Index yoksa boş sonuç döndür
-            print(json.dumps([]))
-            return
+        with profiler.phase('search'):
+            return search_ilkyardim_batch(indexer, queries)
         
-        # Arama yap
-        results = indexer.search(query, k=5)
+    except Exception as e:
+        # Hata durumunda boş sonuç döndür
+        return [[] for _ in queries]
+
+def run_queries(queries: list, fields: list = None) -> list:
+    """Sorguları çalışan sunucuya, yoksa yerel indexer'a gönderir (fields: seçilecek alanlar)"""
+    # Çalışan search_server varsa model yüklemeden ona sor
+    with profiler.phase('server_query'):
+        response = query_server({'op': 'search_batch', 'collection': 'ilkyardim', 'queries': queries,
+                                 'fields': fields})
+    if response is not None and response.get('ok'):
+        return response['results']
+    return [project_results(results, fields) for results in local_search_batch(queries)]
+
+def run_page(query: str, cursor: str = None, page_size: int = 5, fields: list = None) -> dict:
+    """Sayfalı arama; imleç sunucudaki oturumdan, sunucu yoksa yerel olarak yeniden kurulan listeden kesilir"""
+    with profiler.phase('server_query'):
+        response = query_server({'op': 'search_page', 'collection': 'ilkyardim', 'query': query, 'cursor': cursor,
+                                 'k': page_size, 'fields': fields})
+    if response is not None and response.get('ok'):
+        return {key: response.get(key) for key in ('results', 'offset', 'next_cursor')}
+    
+    empty = {'results': [], 'offset': 0, 'next_cursor': None}
+    try:
+        indexer = load_local_indexer()
+        if indexer is None:
+            return empty
         
-        # Sonuçları JSON olarak döndür (indent olmadan)
-        print(json.dumps(results, ensure_ascii=False))
+        with profiler.phase('search'):
+            page = search_ilkyardim_page(indexer, query, page_size, cursor)
+        page['results'] = project_results(page['results'], fields)
+        return page
         
+    except ValueError as e:
+        # Geçersiz veya süresi dolmuş imleç
+        return {**empty, 'error': str(e)}
     except Exception as e:
-        # Hata durumunda boş sonuç döndür
-        print(json.dumps([]))
+        return empty
+
+def cache_stats() -> dict:
+    """Sonuç önbelleği sayaçları (sunucu varsa sunucunun, yoksa bu process'in)"""
+    response = query_server({'op': 'stats'})
+    if response is not None and response.get('ok'):
+        return response.get('collections', {}).get('ilkyardim', {}).get('result_cache', {})
+    return local_indexer.result_cache.stats() if local_indexer is not None else {}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('query', nargs='?')
+    # --stdin: her satır ayrı bir sorgu, çıktı sorgu başına sonuç listesi
+    parser.add_argument('--stdin', action='store_true')
+    # --fields title,category: sadece bu alanlar döner
+    parser.add_argument('--fields')
+    # Aşama sürelerini stderr'e yazar; bütçe aşılırsa çıkış kodu 3 olur
+    parser.add_argument('--profile-startup', action='store_true')
+    parser.add_argument('--startup-budget-ms', type=float)
+    # Sonuç önbelleği sayaçlarını stderr'e yazar
+    parser.add_argument('--cache-stats', action='store_true')
+    # Sayfalı çıktı: {"results": [...], "next_cursor": "..."}; sonraki sayfa --cursor ile istenir
+    parser.add_argument('--page-size', type=int)
+    parser.add_argument('--cursor')
+    args = parser.parse_args()
+    fields = parse_fields(args.fields)
+    profiler.enabled = args.profile_startup or args.startup_budget_ms is not None
+    profiler.budget_ms = args.startup_budget_ms
+    
+    if args.page_size or args.cursor:
+        print(dumps(run_page(args.query, args.cursor, args.page_size or 5, fields)))
+    elif args.stdin:
+        queries = [line.strip() for line in sys.stdin if line.strip()]
+        print(dumps(run_queries(queries, fields) if queries else []))
+    elif args.query:
+        # Sonuçları kompakt JSON olarak döndür
+        print(dumps(run_queries([args.query], fields)[0]))
+    else:
+        print(dumps([]))
+    
+    if args.cache_stats:
+        sys.stderr.write(dumps({'result_cache': cache_stats()}) + '\n')
+    
+    return profiler.finish()
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Index Manifest'i
+Her toplanma alanı için kararlı bir anahtar, FAISS id'si ve doküman içeriği hash'i tutar.
+Artımlı güncellemede sadece yeni veya değişen alanlar yeniden encode edilir,
+silinen alanlar id ile index'ten çıkarılır.
+"""
+
+import json
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+from turkish_text import turkish_lower
+
+
+def area_key(ilce: str, alan_id: str, occurrence: int = 0) -> str:
+    """Tek alanın ilçe/alan_id#sıra anahtarı"""
+    return f"{turkish_lower(ilce or '')}/{alan_id}#{int(occurrence)}"
+
+
+def area_keys(metadata: Sequence[Dict[str, Any]]) -> List[str]:
+    """ilçe/alan_id#sıra biçiminde kararlı alan anahtarları üretir (kayıtta area_key varsa o kullanılır)"""
+    # Aynı ilçede tekrar eden alan_id'ler (ör. tuzla_12) sıra numarasıyla ayrılır
+    seen: Dict[Tuple[str, str], int] = {}
+    keys = []
+    for meta in metadata:
+        base = (turkish_lower(meta.get('ilce', '') or ''), meta.get('alan_id', ''))
+        occurrence = seen.get(base, 0)
+        seen[base] = occurrence + 1
+        # Birleştirmeden sonra sıra numaraları kayabilir, kaynak veride verilen anahtar korunur
+        keys.append(meta.get('area_key') or area_key(*base, occurrence))
+    return keys
+
+
+def content_hash(document: str) -> str:
+    """Embedding'e giren doküman metninin hash'i"""
+    return hashlib.sha1(document.encode('utf-8')).hexdigest()
+
+
+def stable_id(key: str) -> int:
+    """Alan anahtarından kararlı, pozitif int64 FAISS id'si üretir"""
+    return int.from_bytes(hashlib.sha1(key.encode('utf-8')).digest()[:8], 'big') & 0x7FFFFFFFFFFFFFFF
+
+
+def build_manifest(keys: Sequence[str], documents: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+    """Anahtar -> {id, hash} manifest'i oluşturur"""
+    return {
+        key: {'id': stable_id(key), 'hash': content_hash(document)}
+        for key, document in zip(keys, documents)
+    }
+
+
+def diff_manifest(old: Dict[str, Dict[str, Any]],
+                  new: Dict[str, Dict[str, Any]]) -> Tuple[List[str], List[str], List[str]]:
+    """(yeni, değişen, silinen) anahtar listelerini döner"""
+    added = [key for key in new if key not in old]
+    changed = [key for key in new if key in old and old[key]['hash'] != new[key]['hash']]
+    removed = [key for key in old if key not in new]
+    return added, changed, removed
+
+
+def load_manifest(path: Path) -> Dict[str, Dict[str, Any]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(path: Path, manifest: Dict[str, Dict[str, Any]]):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
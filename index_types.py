@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+FAISS Index Tipleri
+Flat, IVF-Flat, IVF-PQ, HNSW ve scalar-quantized (SQ8) index'lerini tek yerden kurar,
+eğitir ve arama parametrelerini ayarlar. Tip FAISS_INDEX_TYPE ortam değişkeni veya
+indexer'ın index_type parametresi ile seçilir.
+"""
+
+import os
+import math
+import logging
+from typing import Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_TYPE = 'flat'
+INDEX_TYPES = ('flat', 'ivf_flat', 'ivf_pq', 'hnsw', 'sq8')
+
+# HNSW vektör silmeyi desteklemez, artımlı güncellemede tam yeniden kurulum gerekir
+REMOVABLE_INDEX_TYPES = ('flat', 'ivf_flat', 'ivf_pq', 'sq8')
+
+
+def get_index_type(index_type: Optional[str] = None) -> str:
+    """Parametre, ortam değişkeni veya varsayılandan index tipini seçer"""
+    index_type = (index_type or os.environ.get('FAISS_INDEX_TYPE') or DEFAULT_INDEX_TYPE).lower()
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Bilinmeyen index tipi: {index_type} (seçenekler: {', '.join(INDEX_TYPES)})")
+    return index_type
+
+
+def _nlist(num_vectors: int) -> int:
+    # Her IVF listesine eğitim için ~39 vektör düşmeli
+    return max(1, min(int(4 * math.sqrt(max(num_vectors, 1))), num_vectors // 39))
+
+
+def factory_string(index_type: str, dimension: int, num_vectors: int) -> str:
+    """Index tipi ve veri boyutundan faiss.index_factory tanımı üretir"""
+    nlist = _nlist(num_vectors)
+
+    if index_type == 'flat':
+        return "Flat"
+    if index_type == 'ivf_flat':
+        return f"IVF{nlist},Flat"
+    if index_type == 'ivf_pq':
+        # Alt vektör başına ~8 boyut; 256 merkezli kod kitabı ~10k eğitim vektörü ister,
+        # daha küçük veri setinde 4 bit kod (16 merkez) kullanılır
+        m = next(m for m in (48, 32, 24, 16, 12, 8, 4, 2, 1) if dimension % m == 0)
+        nbits = 8 if num_vectors >= 256 * 39 else 4
+        return f"IVF{nlist},PQ{m}x{nbits}"
+    if index_type == 'hnsw':
+        return "HNSW32"
+    if index_type == 'sq8':
+        return "SQ8"
+    raise ValueError(f"Bilinmeyen index tipi: {index_type}")
+
+
+def create_index(index_type: str, dimension: int, num_vectors: int, id_map: bool = True) -> Any:
+    """Boş (gerekiyorsa eğitilmemiş) FAISS index'i oluşturur"""
+    import faiss
+
+    description = factory_string(index_type, dimension, num_vectors)
+    # IVF index'leri id'leri kendisi tutar; IDMap altındaki IVF'den silme satırları kaydırır
+    if id_map and not index_type.startswith('ivf'):
+        description = "IDMap2," + description
+
+    logger.info(f"Index tipi: {index_type} ({description})")
+    return faiss.index_factory(dimension, description, faiss.METRIC_L2)
+
+
+def training_size(index_type: str, num_vectors: int) -> int:
+    """Eğitim için gereken örnek vektör sayısı (eğitim istemeyen tiplerde 0)"""
+    if index_type in ('flat', 'hnsw'):
+        return 0
+    # IVF merkezleri ve 256'lık PQ/SQ kod kitapları için yeterli örnek, tüm veri değil
+    return min(num_vectors, max(_nlist(num_vectors), 256) * 39)
+
+
+def train_index(index: Any, embeddings: np.ndarray):
+    """IVF/PQ/SQ gibi eğitim isteyen index'leri eğitir"""
+    if not index.is_trained:
+        logger.info(f"Index eğitiliyor: {len(embeddings)} vektör")
+        index.train(np.ascontiguousarray(embeddings, dtype='float32'))
+
+
+def configure_search(index: Any, nprobe: Optional[int] = None, ef_search: Optional[int] = None):
+    """Arama zamanı parametrelerini (IVF nprobe, HNSW efSearch) ayarlar"""
+    import faiss
+
+    nprobe = nprobe or int(os.environ.get('FAISS_NPROBE', 16))
+    ef_search = ef_search or int(os.environ.get('FAISS_EF_SEARCH', 64))
+    params = faiss.ParameterSpace()
+
+    for name, value in (('nprobe', nprobe), ('efSearch', ef_search)):
+        try:
+            params.set_index_parameter(index, name, value)
+        except RuntimeError:
+            # Bu index tipinde parametre yok (ör. Flat için nprobe)
+            pass
+
+
+def enable_reconstruct(index: Any):
+    """IVF index'lerinde id ile vektör geri okumayı açar"""
+    import faiss
+
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None and ivf.direct_map.type == faiss.DirectMap.NoMap:
+        ivf.set_direct_map_type(faiss.DirectMap.Hashtable)
+
+
+def remove_ids(index: Any, ids: np.ndarray) -> int:
+    """Vektörleri id ile siler"""
+    import faiss
+
+    ids = np.ascontiguousarray(ids, dtype='int64')
+    # Hashtable direct map'li IVF sadece IDSelectorArray ile silebilir
+    return index.remove_ids(faiss.IDSelectorArray(len(ids), faiss.swig_ptr(ids)))
+
+
+def index_type_of(index: Any) -> str:
+    """Yüklenmiş bir FAISS index'inin tipini döner"""
+    import faiss
+
+    inner = faiss.downcast_index(index)
+    if isinstance(inner, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        inner = faiss.downcast_index(inner.index)
+
+    if isinstance(inner, faiss.IndexIVFPQ):
+        return 'ivf_pq'
+    if isinstance(inner, faiss.IndexIVFFlat):
+        return 'ivf_flat'
+    if isinstance(inner, faiss.IndexHNSW):
+        return 'hnsw'
+    if isinstance(inner, faiss.IndexScalarQuantizer):
+        return 'sq8'
+    return 'flat'
+
+
+def filtered_search(index: Any, query_embeddings: np.ndarray, k: int, ids: np.ndarray):
+    """Sadece verilen id'ler arasında arar (IDSelector ön filtresi, index'in arama ayarlarıyla)"""
+    import faiss
+
+    ids = np.ascontiguousarray(ids, dtype='int64')
+    selector = faiss.IDSelectorBatch(len(ids), faiss.swig_ptr(ids))
+
+    inner = faiss.downcast_index(index)
+    if isinstance(inner, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        inner = faiss.downcast_index(inner.index)
+
+    # Parametre tipi iç index'e uymalı; nprobe/efSearch configure_search ile ayarlanan değerde kalır
+    if isinstance(inner, faiss.IndexIVF):
+        params = faiss.SearchParametersIVF(sel=selector, nprobe=inner.nprobe)
+    elif isinstance(inner, faiss.IndexHNSW):
+        params = faiss.SearchParametersHNSW(sel=selector, efSearch=inner.hnsw.efSearch)
+    else:
+        params = faiss.SearchParameters(sel=selector)
+
+    return index.search(query_embeddings, k, params=params)
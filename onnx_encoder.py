@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+ONNX Embedding Backend'i
+MiniLM modelini ONNX grafiğine aktarır, dinamik int8 quantization uygular ve
+sorguları PyTorch olmadan onnxruntime ile encode eder. EMBEDDING_BACKEND=onnx
+ile seçilir; SentenceTransformer.encode ile aynı arayüzü sunar.
+
+Kullanım:
+    python onnx_encoder.py --export
+    python onnx_encoder.py --check
+"""
+
+import sys
+import json
+import time
+import argparse
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ONNX_DIR = Path(__file__).parent / "faiss_index" / "onnx"
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_QUANTIZED_FILE = "model.int8.onnx"
+ONNX_CONFIG_FILE = "onnx_config.json"
+
+# PyTorch ile ortalama kosinüs uyumu bunun altındaysa backend kullanılmamalı
+PARITY_THRESHOLD = 0.99
+
+
+def export_onnx_model(model_name: str, output_dir: Path = ONNX_DIR, quantize: bool = True) -> Path:
+    """SentenceTransformer'ın transformer katmanını ONNX'e aktarır, isteğe bağlı int8 quantize eder"""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    model = SentenceTransformer(model_name, device='cpu')
+    transformer = model[0]
+    # sentence-transformers sürümüne göre 'pooling_mode' veya 'pooling_mode_mean_tokens'
+    pooling = model[1].get_config_dict()
+    if not (pooling.get('pooling_mode') == 'mean' or pooling.get('pooling_mode_mean_tokens')):
+        raise ValueError(f"Sadece mean pooling destekleniyor: {pooling}")
+
+    auto_model = transformer.auto_model.eval()
+    tokenizer = transformer.tokenizer
+    sample = tokenizer(["örnek sorgu"], return_tensors='pt')
+
+    class HiddenStates(torch.nn.Module):
+        """Girdileri isimle geçirir (transformers sürümleri arasında sıra değişebiliyor)"""
+
+        def __init__(self, encoder):
+            super().__init__()
+            self.encoder = encoder
+
+        def forward(self, input_ids, attention_mask):
+            return self.encoder(input_ids=input_ids, attention_mask=attention_mask)[0]
+
+    model_file = output_dir / ONNX_MODEL_FILE
+    with torch.no_grad():
+        torch.onnx.export(
+            HiddenStates(auto_model),
+            (sample['input_ids'], sample['attention_mask']),
+            str(model_file),
+            input_names=['input_ids', 'attention_mask'],
+            output_names=['last_hidden_state'],
+            dynamic_axes={
+                'input_ids': {0: 'batch', 1: 'sequence'},
+                'attention_mask': {0: 'batch', 1: 'sequence'},
+                'last_hidden_state': {0: 'batch', 1: 'sequence'}
+            },
+            opset_version=17,
+            dynamo=False
+        )
+    tokenizer.save_pretrained(str(output_dir))
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(str(model_file), str(output_dir / ONNX_QUANTIZED_FILE), weight_type=QuantType.QInt8)
+
+    config = {
+        'model_name': model_name,
+        'max_seq_length': transformer.max_seq_length,
+        'normalize': any(type(module).__name__ == 'Normalize' for module in model),
+        'quantized': quantize
+    }
+    with open(output_dir / ONNX_CONFIG_FILE, 'w', encoding='utf-8') as f:
+        json.dump(config, f, ensure_ascii=False, indent=2)
+
+    logger.info(f"ONNX modeli aktarıldı: {output_dir}")
+    return output_dir
+
+
+def onnx_model_exists(model_dir: Path = ONNX_DIR) -> bool:
+    return (Path(model_dir) / ONNX_CONFIG_FILE).exists()
+
+
+class OnnxSentenceEncoder:
+    """SentenceTransformer.encode ile uyumlu onnxruntime encoder'ı"""
+
+    def __init__(self, model_dir: Path = ONNX_DIR, quantized: bool = True, threads: Optional[int] = None):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_dir = Path(model_dir)
+        with open(model_dir / ONNX_CONFIG_FILE, 'r', encoding='utf-8') as f:
+            self.config: Dict[str, Any] = json.load(f)
+
+        quantized = quantized and self.config.get('quantized', False)
+        model_file = model_dir / (ONNX_QUANTIZED_FILE if quantized else ONNX_MODEL_FILE)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+
+        self.session = ort.InferenceSession(str(model_file), options, providers=['CPUExecutionProvider'])
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_dir))
+        self.max_seq_length = self.config.get('max_seq_length', 128)
+
+        # Önbellek anahtarı PyTorch embedding'lerinden ayrı tutulur
+        self.model_id = f"{self.config['model_name']}:onnx{'-int8' if quantized else ''}"
+
+    def encode(self, sentences: Sequence[str], batch_size: int = 32,
+               show_progress_bar: bool = False, **kwargs) -> np.ndarray:
+        """Metinleri (n, d) float32 embedding matrisine çevirir"""
+        sentences = list(sentences)
+        outputs: List[np.ndarray] = []
+
+        # Benzer uzunluktaki metinler aynı batch'e düşer, padding azalır
+        order = np.argsort([-len(s) for s in sentences], kind='stable')
+        for start in range(0, len(sentences), batch_size):
+            batch = [sentences[i] for i in order[start:start + batch_size]]
+            encoded = self.tokenizer(batch, padding=True, truncation=True,
+                                     max_length=self.max_seq_length, return_tensors='np')
+            mask = encoded['attention_mask'].astype('int64')
+            hidden = self.session.run(None, {
+                'input_ids': encoded['input_ids'].astype('int64'),
+                'attention_mask': mask
+            })[0]
+
+            # Mean pooling (padding token'ları hariç)
+            weights = mask[:, :, None].astype('float32')
+            pooled = (hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+            outputs.append(pooled.astype('float32'))
+
+        if not outputs:
+            return np.zeros((0, 0), dtype='float32')
+
+        embeddings = np.empty((len(sentences), outputs[0].shape[1]), dtype='float32')
+        embeddings[order] = np.vstack(outputs)
+
+        if self.config.get('normalize'):
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings
+
+
+def cosine_agreement(reference: np.ndarray, candidate: np.ndarray) -> np.ndarray:
+    """Satır bazında kosinüs benzerliği"""
+    reference = reference / np.clip(np.linalg.norm(reference, axis=1, keepdims=True), 1e-12, None)
+    candidate = candidate / np.clip(np.linalg.norm(candidate, axis=1, keepdims=True), 1e-12, None)
+    return (reference * candidate).sum(axis=1)
+
+
+def _latency_ms(encode, queries: Sequence[str], repeat: int) -> Dict[str, float]:
+    """Tek sorgu encode gecikmesini ölçer (sunucudaki gibi sorgu sorgu)"""
+    encode(list(queries[:1]), show_progress_bar=False)  # ısınma
+    latencies = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            encode([query], show_progress_bar=False)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return {
+        'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 2)
+    }
+
+
+def check_parity(model_dir: Path = ONNX_DIR, repeat: int = 5) -> Dict[str, Any]:
+    """ONNX (fp32 ve int8) embedding'lerini PyTorch ile karşılaştırır ve gecikmeleri ölçer"""
+    from faiss_indexer import TEST_QUERIES
+    from embedding_model import load_torch_model
+
+    with open(Path(model_dir) / ONNX_CONFIG_FILE, 'r', encoding='utf-8') as f:
+        model_name = json.load(f)['model_name']
+
+    torch_model = load_torch_model(model_name)
+    if torch_model is None:
+        raise RuntimeError("PyTorch modeli yüklenemedi, karşılaştırma yapılamıyor")
+
+    queries = list(TEST_QUERIES) + [
+        "Beşiktaş'ta elektrik olan park",
+        "Şile toplanma alanı",
+        "İstanbul Ümraniye büyük alan",
+        "yanık nasıl tedavi edilir",
+        "kalp masajı nasıl yapılır"
+    ]
+    reference = torch_model.encode(queries, show_progress_bar=False)
+    report: Dict[str, Any] = {'queries': len(queries), 'torch': _latency_ms(torch_model.encode, queries, repeat)}
+
+    variants = [('onnx_fp32', False)]
+    if onnx_model_exists(model_dir) and (Path(model_dir) / ONNX_QUANTIZED_FILE).exists():
+        variants.append(('onnx_int8', True))
+
+    for name, quantized in variants:
+        encoder = OnnxSentenceEncoder(model_dir, quantized=quantized)
+        agreement = cosine_agreement(reference, encoder.encode(queries))
+        report[name] = {
+            'cosine_mean': round(float(agreement.mean()), 5),
+            'cosine_min': round(float(agreement.min()), 5),
+            **_latency_ms(encoder.encode, queries, repeat)
+        }
+    return report
+
+
+def main():
+    """Ana fonksiyon"""
+    from embedding_model import MODEL_NAME
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--export', action='store_true', help="Modeli ONNX'e aktarır ve int8 quantize eder")
+    parser.add_argument('--check', action='store_true',
+                        help="PyTorch ile kosinüs uyumunu ve gecikmeyi karşılaştırır")
+    parser.add_argument('--model-dir', default=str(ONNX_DIR))
+    parser.add_argument('--model-name', default=MODEL_NAME)
+    parser.add_argument('--no-quantize', action='store_true')
+    args = parser.parse_args()
+
+    if args.export:
+        export_onnx_model(args.model_name, Path(args.model_dir), quantize=not args.no_quantize)
+
+    if args.check:
+        report = check_parity(Path(args.model_dir))
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+
+        # Uyum eşiğin altındaysa hata kodu döner (CI/derleme adımında kullanılabilir)
+        worst = min(v['cosine_mean'] for k, v in report.items() if k.startswith('onnx'))
+        if worst < PARITY_THRESHOLD:
+            logger.error(f"ONNX kosinüs uyumu eşiğin altında: {worst} < {PARITY_THRESHOLD}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
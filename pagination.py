@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+İmleç Tabanlı Sayfalama
+İlk sayfa isteği sorguyu bir kez encode eder, sıralanmış aday listesini ve sorgu
+vektörünü oturumda saklar; sonraki sayfalar imleçteki konumdan listeden kesilir
+(yeniden encode/arama yapılmaz). Sayfa listenin sonunu aşarsa aynı sorgu vektörüyle
+daha derin arama yapılır ve sadece yeni sonuçlar listeye eklenir, böylece önceki
+sayfalar değişmez.
+
+İmleç (sorgu, konum, index nesli) bilgisini taşır; oturum bellekten düşmüşse veya
+başka bir process'te açılmışsa liste yeniden kurulur. Index yeniden yazıldıysa (veya
+sıralamayı etkileyen canlı alan durumu değiştiyse) imleç geçersizdir. İmleçler
+PAGINATION_SECRET ile imzalanır, değiştirilmiş imleç reddedilir. PAGINATION_SESSIONS
+(varsayılan 256) ve PAGINATION_TTL (saniye, varsayılan 600) ile ayarlanır.
+"""
+
+import os
+import hmac
+import json
+import time
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from turkish_text import normalize_query
+
+DEFAULT_MAX_SESSIONS = 256
+DEFAULT_TTL_SECONDS = 600.0
+
+# İmleç imzası için varsayılan anahtar (üretimde PAGINATION_SECRET ayarlanmalı)
+DEFAULT_SECRET = 'reach-pagination'
+SIGNATURE_BYTES = 12
+
+# İlk aramada en az bu kadar aday sıralanır
+INITIAL_DEPTH = 20
+
+# rank_fn(sorgu, derinlik, sorgu vektörü) -> sıralanmış sonuçlar
+RankFn = Callable[[str, int, Any], List[Dict[str, Any]]]
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode((text + '=' * (-len(text) % 4)).encode('ascii'))
+
+
+def _signature(payload: str) -> str:
+    """İmleç içeriğinin HMAC imzası (PAGINATION_SECRET ile; process'ler arası geçerli)"""
+    secret = os.environ.get('PAGINATION_SECRET', DEFAULT_SECRET).encode('utf-8')
+    return _b64encode(hmac.new(secret, payload.encode('ascii'), hashlib.sha256).digest()[:SIGNATURE_BYTES])
+
+
+def encode_cursor(query: str, offset: int, generation: str) -> str:
+    """Sorgu, konum ve index neslini imzalı, URL-güvenli imlece çevirir"""
+    raw = json.dumps({'q': query, 'o': offset, 'g': generation}, ensure_ascii=False, separators=(',', ':'))
+    payload = _b64encode(raw.encode('utf-8'))
+    return f"{payload}.{_signature(payload)}"
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int, str]:
+    """İmleci çözer; imzası tutmayan (değiştirilmiş) veya bozuk imleçte ValueError"""
+    try:
+        payload, signature = str(cursor).rsplit('.', 1)
+        if not hmac.compare_digest(signature, _signature(payload)):
+            raise ValueError("imza")
+        data = json.loads(_b64decode(payload).decode('utf-8'))
+        offset = int(data['o'])
+        if offset < 0:
+            raise ValueError("konum")
+        return str(data['q']), offset, str(data['g'])
+    except (ValueError, KeyError, TypeError, UnicodeError):
+        raise ValueError("Geçersiz sayfalama imleci")
+
+
+def result_key(result: Dict[str, Any]) -> str:
+    """Derinleştirmede aynı sonucu iki kez eklememek için anahtar"""
+    return result.get('document') or json.dumps(result.get('metadata'), sort_keys=True, default=str)
+
+
+class _Session:
+    def __init__(self, query: str, embedding: Any):
+        self.query = query
+        self.embedding = embedding
+        self.results: List[Dict[str, Any]] = []
+        self.seen = set()
+        self.depth = 0
+        self.exhausted = False
+        self.expires = 0.0
+
+
+class CursorPager:
+    def __init__(self, max_sessions: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_sessions = max_sessions if max_sessions is not None else int(
+            os.environ.get('PAGINATION_SESSIONS', DEFAULT_MAX_SESSIONS))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(
+            os.environ.get('PAGINATION_TTL', DEFAULT_TTL_SECONDS))
+
+        # (normalize sorgu, nesil) -> oturum
+        self._sessions: "OrderedDict[Tuple[str, str], _Session]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Sayaçlar
+        self.pages = 0
+        self.cached_pages = 0
+        self.sessions_created = 0
+        self.extensions = 0
+
+    def _session(self, query: str, generation: str, encode_fn: Callable[[str], Any]) -> _Session:
+        key = (normalize_query(query), generation)
+        now = time.monotonic()
+        session = self._sessions.get(key)
+        if session is None or session.expires < now:
+            # Sorgu oturum başına bir kez encode edilir
+            session = _Session(query, encode_fn(query))
+            self._sessions[key] = session
+            self.sessions_created += 1
+            while len(self._sessions) > max(1, self.max_sessions):
+                self._sessions.popitem(last=False)
+        self._sessions.move_to_end(key)
+        session.expires = now + self.ttl_seconds
+        return session
+
+    def _extend(self, session: _Session, needed: int, rank_fn: RankFn, total: int):
+        """Liste needed uzunluğa ulaşana veya index tükenene kadar derinleştirir"""
+        while len(session.results) < needed and not session.exhausted:
+            depth = min(max(INITIAL_DEPTH, session.depth * 2, needed * 2), total)
+            ranked = rank_fn(session.query, depth, session.embedding)
+            for result in ranked:
+                key = result_key(result)
+                if key not in session.seen:
+                    session.seen.add(key)
+                    session.results.append(result)
+
+            if session.depth:
+                self.extensions += 1
+            # Index'teki tüm kayıtlar sıralandıysa veya arama daha az sonuç döndüyse liste tamamdır
+            session.exhausted = depth >= total or len(ranked) < depth or depth <= session.depth
+            session.depth = depth
+
+    def page(self, query: Optional[str], page_size: int, cursor: Optional[str], generation: str,
+             rank_fn: RankFn, encode_fn: Callable[[str], Any], total: int) -> Dict[str, Any]:
+        """İlk sayfayı (cursor yok) veya imlecin gösterdiği sayfayı döner"""
+        offset = 0
+        if cursor:
+            query, offset, cursor_generation = decode_cursor(cursor)
+            if cursor_generation != generation:
+                raise ValueError("Sayfalama imlecinin süresi doldu (index veya alan durumları değişti), "
+                                 "arama baştan yapılmalı")
+        if not query:
+            raise ValueError("İlk sayfa için sorgu gerekli")
+
+        page_size = max(1, int(page_size))
+        with self._lock:
+            session = self._session(query, generation, encode_fn)
+            self.pages += 1
+            if len(session.results) >= offset + page_size or session.exhausted:
+                self.cached_pages += 1
+            else:
+                self._extend(session, offset + page_size, rank_fn, total)
+
+            # Sıra numaraları listedeki genel konumu gösterir
+            results = [{**result, 'rank': offset + i + 1}
+                       for i, result in enumerate(session.results[offset:offset + page_size])]
+            next_offset = offset + len(results)
+            has_more = next_offset < len(session.results) or not session.exhausted
+
+        return {
+            'results': results,
+            'offset': offset,
+            'next_cursor': encode_cursor(query, next_offset, generation) if has_more and results else None
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'pages': self.pages,
+            'cached_pages': self.cached_pages,
+            'sessions_created': self.sessions_created,
+            'extensions': self.extensions,
+            'sessions': len(self._sessions),
+            'max_sessions': self.max_sessions,
+            'ttl_seconds': self.ttl_seconds
+        }
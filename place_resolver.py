@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Bulanık İlçe ve Mahalle Çözümleyici
+Sorgudaki kelimeleri ilçe ve mahalle adlarına eşler. Yazım hataları ("kadkoy"),
+şapkasız yazım ("uskudar", "beyoglu"), ekli biçimler ("Kadıköy'de", "uskudardan")
+ve İ/ı büyük-küçük harf farkları tolere edilir.
+
+Eşleme SymSpell yöntemiyle yapılır: kurulumda her yer adının en fazla
+MAX_EDIT_DISTANCE karakter silinmiş biçimleri sözlüğe yazılır, sorguda da sadece
+kelimenin silinmiş biçimlerine bakılır. Böylece tüm adlarla karşılaştırma yapmadan
+aday adlar bulunur; adaylar gerçek düzenleme mesafesiyle doğrulanır.
+
+İzin verilen mesafe kelime uzunluğuna göre artar (4 harfe kadar tam eşleşme),
+"park", "alan" gibi genel kelimeler hiçbir yer adına eşlenmez.
+"""
+
+import re
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from turkish_text import ascii_fold, turkish_lower
+
+logger = logging.getLogger(__name__)
+
+MAX_EDIT_DISTANCE = 2
+
+# Mahalle adlarının sonundaki tür ekleri ("Fetih Mh." -> "fetih")
+_MAHALLE_SUFFIX = re.compile(r'\s+(mahallesi|mahalle|mah\.?|mh\.?)$')
+
+# Yer adlarına eklenen hal ekleri (ASCII biçiminde, uzundan kısaya)
+_CASE_SUFFIXES = ('daki', 'deki', 'taki', 'teki', 'dan', 'den', 'tan', 'ten', 'nin', 'nun',
+                  'da', 'de', 'ta', 'te', 'ya', 'ye', 'yi', 'yu', 'in', 'un', 'a', 'e', 'i', 'u')
+
+# Tek başına yer adı sayılmayan genel kelimeler (ASCII biçiminde)
+GENERIC_WORDS = frozenset({
+    'toplanma', 'alan', 'alani', 'alanlari', 'alanlar', 'park', 'parki', 'parklar', 'mahalle',
+    'mahallesi', 'mah', 'mh', 'ilce', 'ilcesi', 'ilcede', 'yakin', 'yakinda', 'nerede', 'en',
+    'bos', 'buyuk', 'okul', 'okulu', 'cami', 'bahce', 'bahcesi', 'saha', 'sahasi', 'spor',
+    'yesil', 'su', 'elektrik', 'var', 'olan', 'hangi', 've', 'ile', 'icin', 'afet', 'deprem'
+})
+
+# Sorguda birleştirilerek denenen en uzun kelime dizisi ("hacı ahmet" -> "haciahmet")
+MAX_NGRAM = 3
+
+# Çözülmüş sorgu kelimesi önbelleğinin üst sınırı (dolunca temizlenir)
+TOKEN_CACHE_SIZE = 50000
+
+
+def fold_place_name(name: str) -> str:
+    """Yer adını eşleme anahtarına çevirir (küçük harf, ASCII, boşluksuz)"""
+    return re.sub(r'[^a-z0-9]', '', ascii_fold(turkish_lower(name)))
+
+
+def mahalle_place_id(ilce: str, mahalle: str) -> Optional[str]:
+    """Alan kaydındaki ilçe ve mahalleden yer kimliği üretir ("Fetih Mh." -> "mahalle:fatih/fetih")"""
+    mahalle = _MAHALLE_SUFFIX.sub('', turkish_lower(' '.join((mahalle or '').split())))
+    if not mahalle or fold_place_name(mahalle) in GENERIC_WORDS:
+        return None
+    return f"mahalle:{turkish_lower(ilce or '').strip()}/{mahalle}"
+
+
+def max_distance_for(term: str) -> int:
+    """Kısa kelimelerde yanlış eşleşmeyi önlemek için izin verilen mesafe"""
+    if len(term) <= 4:
+        return 0
+    if len(term) <= 8:
+        return 1
+    return MAX_EDIT_DISTANCE
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Komşu harf yer değiştirmeli düzenleme mesafesi (limit aşılırsa limit + 1)"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def _deletes(term: str, distance: int) -> Set[str]:
+    """Terimden en fazla distance karakter silinerek elde edilen biçimler"""
+    results = {term}
+    frontier = {term}
+    for _ in range(distance):
+        next_frontier = set()
+        for word in frontier:
+            for i in range(len(word)):
+                next_frontier.add(word[:i] + word[i + 1:])
+        results |= next_frontier
+        frontier = next_frontier
+    return results
+
+
+class PlaceResolver:
+    def __init__(self):
+        # Yer kimliği -> {'id', 'type', 'name', 'ilce'}
+        self.places: Dict[str, Dict[str, Any]] = {}
+        # Eşleme anahtarı -> yer kimlikleri
+        self.terms: Dict[str, List[str]] = {}
+        # Silinmiş biçim -> eşleme anahtarları
+        self.deletes: Dict[str, Set[str]] = {}
+        # Kelime -> (yerler, mesafe); sorgu kelimeleri çok tekrar ettiğinden saklanır
+        self._token_cache: Dict[str, Tuple[List[str], int]] = {}
+
+    def add_place(self, place_type: str, name: str, ilce: str) -> Optional[str]:
+        """ilce: alt index anahtarı (turkish_lower ilçe adı); mahalle adlarındaki "Mh." eki atılır"""
+        if place_type == 'ilce':
+            place_id = f"ilce:{ilce}"
+            term = fold_place_name(name)
+        else:
+            place_id = mahalle_place_id(ilce, name)
+            if place_id is None:
+                return None
+            term = fold_place_name(place_id.split('/', 1)[1])
+        if len(term) < 2:
+            return None
+
+        if place_id not in self.places:
+            self.places[place_id] = {'id': place_id, 'type': place_type, 'name': ' '.join(name.split()),
+                                     'ilce': ilce}
+
+        ids = self.terms.setdefault(term, [])
+        if place_id not in ids:
+            ids.append(place_id)
+            self._token_cache.clear()
+            for variant in _deletes(term, max_distance_for(term)):
+                self.deletes.setdefault(variant, set()).add(term)
+        return place_id
+
+    @classmethod
+    def from_metadata(cls, metadata: Iterable[Dict[str, Any]]) -> "PlaceResolver":
+        """Alan kayıtlarındaki ilçe ve mahalle adlarından sözlüğü kurar"""
+        resolver = cls()
+        for meta in metadata:
+            ilce = turkish_lower(meta.get('ilce', '') or '').strip()
+            if not ilce:
+                continue
+            resolver.add_place('ilce', ilce, ilce)
+            if meta.get('mahalle'):
+                resolver.add_place('mahalle', meta['mahalle'], ilce)
+
+        logger.info(f"Yer çözümleyici: {len(resolver.places)} yer, {len(resolver.terms)} anahtar, "
+                    f"{len(resolver.deletes)} silinmiş biçim")
+        return resolver
+
+    def lookup(self, term: str) -> Tuple[List[str], int]:
+        """Eşleme anahtarına en yakın yerleri ve mesafeyi döner (yoksa boş liste)"""
+        if term in self.terms:
+            return self.terms[term], 0
+
+        limit = max_distance_for(term)
+        if limit == 0:
+            return [], 0
+
+        best: List[str] = []
+        best_distance = limit + 1
+        candidates = set()
+        for variant in _deletes(term, limit):
+            candidates.update(self.deletes.get(variant, ()))
+        for candidate in candidates:
+            candidate_limit = min(limit, max_distance_for(candidate))
+            distance = edit_distance(term, candidate, candidate_limit)
+            if distance > candidate_limit:
+                continue
+            if distance < best_distance:
+                best, best_distance = list(self.terms[candidate]), distance
+            elif distance == best_distance:
+                best.extend(place for place in self.terms[candidate] if place not in best)
+        return (best, best_distance) if best else ([], 0)
+
+    def _lookup_token(self, term: str) -> Tuple[List[str], int]:
+        cached = self._token_cache.get(term)
+        if cached is None:
+            if len(self._token_cache) >= TOKEN_CACHE_SIZE:
+                self._token_cache.clear()
+            cached = self._token_cache[term] = self._match_token(term)
+        return cached
+
+    def _match_token(self, term: str) -> Tuple[List[str], int]:
+        """Kelimeyi olduğu gibi, sonra hal ekleri atılmış biçimleriyle dener"""
+        stems = [term[:-len(suffix)] for suffix in _CASE_SUFFIXES
+                 if term.endswith(suffix) and len(term) - len(suffix) >= 4]
+
+        # Önce tam eşleşmeler (ek atılmış biçimler dahil), sonra bulanık eşleşmeler
+        for candidate in [term] + stems:
+            if candidate in self.terms:
+                return self.terms[candidate], 0
+        for candidate in [term] + stems:
+            places, distance = self.lookup(candidate)
+            if places:
+                return places, distance
+        return [], 0
+
+    def resolve(self, query: str) -> Dict[str, Any]:
+        """Sorgudaki ilçe ve mahalleleri çözer; 'ilce' sorgunun yönlendirileceği alt index'tir"""
+        # Kesme işaretinden sonraki ek atılır ("Kadıköy'de" -> "kadıköy")
+        pairs = [(word, fold_place_name(word))
+                 for word in re.sub(r"['’`][^\s]*", ' ', turkish_lower(query)).split()]
+        words = [word for word, token in pairs if token]
+        tokens = [token for _, token in pairs if token]
+
+        matches = []
+        used = [False] * len(tokens)
+        for size in range(min(MAX_NGRAM, len(tokens)), 0, -1):
+            for start in range(len(tokens) - size + 1):
+                if any(used[start:start + size]):
+                    continue
+                term = ''.join(tokens[start:start + size])
+                if size == 1 and term in GENERIC_WORDS:
+                    continue
+                places, distance = self._lookup_token(term) if size == 1 else (self.terms.get(term, []), 0)
+                if places:
+                    used[start:start + size] = [True] * size
+                    matches.append({'token': ' '.join(words[start:start + size]), 'places': places,
+                                    'distance': distance})
+
+        districts: List[str] = []
+        mahalleler: List[str] = []
+        for match in matches:
+            for place_id in match['places']:
+                place = self.places[place_id]
+                if place['type'] == 'ilce':
+                    districts.append(place['ilce'])
+                else:
+                    mahalleler.append(place_id)
+        districts = list(dict.fromkeys(districts))
+
+        # Aynı adlı mahalleler birden çok ilçede olabilir, ilçe verilmişse ona daraltılır
+        if districts:
+            mahalleler = [place_id for place_id in mahalleler if self.places[place_id]['ilce'] in districts]
+        mahalleler = list(dict.fromkeys(mahalleler))
+
+        # Açık ilçe adı öncelikli; yoksa tek bir ilçeye ait mahalleler ilçeyi belirler
+        ilce = districts[0] if districts else None
+        if ilce is None and mahalleler:
+            implied = {self.places[place_id]['ilce'] for place_id in mahalleler}
+            if len(implied) == 1:
+                ilce = implied.pop()
+
+        return {'ilce': ilce, 'districts': districts, 'mahalleler': mahalleler, 'matches': matches}
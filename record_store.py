@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Memory-Mapped Kayıt Deposu
+documents.pkl / metadata.pkl yerine kullanılan, offset indeksli kayıt dosyaları.
+Her sütun (dokümanlar, metadata) ayrı bir depodur: <ad>.records dosyası art arda
+yazılmış UTF-8 JSON kayıtlarını, <ad>.offsets.npy dosyası kayıt sınırlarını tutar.
+Dosyalar mmap ile açılır, sadece aramanın döndürdüğü satırlar materialize edilir.
+"""
+
+import os
+import json
+import mmap
+import pickle
+import logging
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def store_paths(prefix: Path):
+    """Depo önekinden veri ve offset dosya yollarını döner"""
+    prefix = Path(prefix)
+    return prefix.with_name(prefix.name + ".records"), prefix.with_name(prefix.name + ".offsets.npy")
+
+
+def store_exists(prefix: Path) -> bool:
+    """Depo dosyalarının ikisi de var mı kontrol eder"""
+    return all(path.exists() for path in store_paths(prefix))
+
+
+def compact_record(meta: Dict[str, Any], field_map: Dict[str, str]) -> Dict[str, Any]:
+    """full_data kopyasını çıkarır, sadece metadata'da olmayan alanları saklar"""
+    compact = {key: value for key, value in meta.items() if key != 'full_data'}
+    full_data = meta.get('full_data')
+
+    if isinstance(full_data, dict):
+        extra = {
+            key: value for key, value in full_data.items()
+            if key not in field_map or meta.get(field_map[key]) != value
+        }
+        if extra:
+            compact['_full_extra'] = extra
+
+    return compact
+
+
+def expand_record(record: Dict[str, Any], field_map: Dict[str, str]) -> Dict[str, Any]:
+    """Kompakt kayıttan full_data alanını yeniden kurar"""
+    extra = record.pop('_full_extra', {})
+    full_data = {key: record[meta_key] for key, meta_key in field_map.items() if meta_key in record}
+    full_data.update(extra)
+    record['full_data'] = full_data
+    return record
+
+
+class RecordStore(Sequence):
+    """Salt okunur, mmap ile açılmış kayıt dizisi"""
+
+    def __init__(self, prefix: Path, decode: Optional[Callable[[Any], Any]] = None):
+        self.prefix = Path(prefix)
+        self.decode = decode
+        data_file, offsets_file = store_paths(self.prefix)
+
+        # Offset'ler de mmap ile okunur, kopya oluşmaz
+        self.offsets = np.load(offsets_file, mmap_mode='r')
+        self._file = open(data_file, 'rb')
+        self._mmap = None
+        if int(self.offsets[-1]) > 0:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @staticmethod
+    def write(prefix: Path, records: Iterable[Any]):
+        """Kayıtları depoya yazar (geçici dosya + atomik rename)"""
+        data_file, offsets_file = store_paths(prefix)
+        tmp_data = data_file.with_name(data_file.name + ".tmp")
+        tmp_offsets = offsets_file.with_name(offsets_file.name + ".tmp")
+
+        offsets = [0]
+        with open(tmp_data, 'wb') as f:
+            for record in records:
+                encoded = json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+                f.write(encoded)
+                offsets.append(offsets[-1] + len(encoded))
+
+        with open(tmp_offsets, 'wb') as f:
+            np.save(f, np.asarray(offsets, dtype=np.uint64))
+
+        os.replace(tmp_data, data_file)
+        os.replace(tmp_offsets, offsets_file)
+
+    def raw(self, i: int) -> bytes:
+        """i. kaydın ham JSON baytlarını döner"""
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        return self._mmap[start:end] if self._mmap is not None else b''
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+
+        i = int(i)
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+
+        record = json.loads(self.raw(i))
+        return self.decode(record) if self.decode else record
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+
+def migrate_pickle(pickle_file: Path, prefix: Path,
+                   transform: Optional[Callable[[Any], Any]] = None) -> int:
+    """Eski pickle listesini kayıt deposuna dönüştürür, kayıt sayısını döner"""
+    with open(pickle_file, 'rb') as f:
+        records: List[Any] = pickle.load(f)
+
+    if transform is not None:
+        records = [transform(record) for record in records]
+
+    RecordStore.write(prefix, records)
+    logger.info(f"Dönüştürüldü: {Path(pickle_file).name} -> {Path(prefix).name} ({len(records)} kayıt)")
+    return len(records)
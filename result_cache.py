@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Arama Sonucu Önbelleği
+Popüler sorguların sıralanmış sonuç listelerini (normalize sorgu, k, filtreler, index
+nesli) anahtarıyla bellekte tutar. Girdiler TTL ile eskir, boyut sınırı aşıldığında en
+uzun süre kullanılmayan atılır. save_index() yeni bir nesil yazdığında anahtarlar
+değiştiğinden eski sonuçlar bir daha dönmez ve önbellek boşaltılır.
+
+RESULT_CACHE_SIZE (varsayılan 1024, 0: kapalı) ve RESULT_CACHE_TTL (saniye, varsayılan
+300) ortam değişkenleri ile ayarlanır.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from turkish_text import normalize_query
+
+DEFAULT_MAX_ITEMS = 1024
+DEFAULT_TTL_SECONDS = 300.0
+
+
+class ResultCache:
+    def __init__(self, max_items: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_items = max_items if max_items is not None else int(
+            os.environ.get('RESULT_CACHE_SIZE', DEFAULT_MAX_ITEMS))
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else float(
+            os.environ.get('RESULT_CACHE_TTL', DEFAULT_TTL_SECONDS))
+
+        # anahtar -> (son geçerlilik zamanı, sonuçlar)
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.generation: Optional[str] = None
+
+        # Sayaçlar
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_items > 0 and self.ttl_seconds > 0
+
+    @staticmethod
+    def make_key(query: str, k: int, filters: Optional[Dict[str, Any]], generation: str) -> str:
+        """Normalize sorgu, k, filtreler ve index neslinden anahtar üretir"""
+        filter_text = json.dumps(filters or {}, sort_keys=True, ensure_ascii=False, default=str)
+        raw = f"{generation}\x00{k}\x00{filter_text}\x00{normalize_query(query)}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _set_generation(self, generation: str):
+        # Yeni nesilde eski girdiler erişilemez olur, bellek hemen geri kazanılır
+        if generation != self.generation:
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self.generation = generation
+
+    def _get(self, key: str, now: float) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < now:
+            del self._entries[key]
+            self.expired += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put(self, key: str, value: Any, now: float):
+        self._entries[key] = (now + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_items:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def cached_batch(self, queries: List[str], k: int, search_fn: Callable[[List[str]], List[Any]],
+                     generation: str, filters: Optional[Dict[str, Any]] = None) -> List[Any]:
+        """Önbellekte olmayan sorguları tek search_fn çağrısıyla hesaplar, sonuçları sırayla döner
+
+        Dönen sonuç listeleri önbellekle paylaşılır, çağıran değiştirmemelidir.
+        """
+        if not self.enabled:
+            return search_fn(list(queries))
+
+        keys = [self.make_key(query, k, filters, generation) for query in queries]
+        results: Dict[str, Any] = {}
+
+        with self._lock:
+            self._set_generation(generation)
+            now = time.monotonic()
+            for key in keys:
+                if key not in results:
+                    value = self._get(key, now)
+                    if value is not None:
+                        results[key] = value
+                        self.hits += 1
+
+        # Aynı sorgu batch içinde tekrar ediyorsa bir kez aranır
+        missing: Dict[str, str] = {}
+        for key, query in zip(keys, queries):
+            if key not in results:
+                missing.setdefault(key, query)
+
+        if missing:
+            computed = search_fn(list(missing.values()))
+            with self._lock:
+                self.misses += len(missing)
+                # Arama sırasında yeni nesil yazıldıysa sonuçlar önbelleğe alınmaz
+                store = self.generation == generation
+                now = time.monotonic()
+                for key, value in zip(missing, computed):
+                    results[key] = value
+                    if store:
+                        self._put(key, value, now)
+
+        return [results[key] for key in keys]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss sayaçlarını döner"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'expired': self.expired,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'items': len(self._entries),
+            'max_items': self.max_items,
+            'ttl_seconds': self.ttl_seconds,
+            'generation': self.generation
+        }
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Arama Sonucu Biçimlendirme
+Sonuçlardan sadece istenen alanları (fields) seçer ve boşluksuz, hızlı JSON
+üretir (orjson varsa orjson, yoksa kompakt stdlib json). Alan seçimi iç içe
+yapıyı korur; 'metadata.alan_adi' sonucu {"metadata": {"alan_adi": ...}} olur.
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Kısa alan adları -> sonuç içindeki yol
+FIELD_ALIASES = {
+    'name': 'metadata.alan_adi',
+    'district': 'metadata.ilce',
+    'neighborhood': 'metadata.mahalle',
+    'coordinates': 'metadata.koordinat',
+    'area': 'metadata.alan_bilgileri',
+    'infrastructure': 'metadata.altyapi',
+    'id': 'metadata.alan_id',
+    'title': 'metadata.title',
+    'category': 'metadata.category',
+    'content': 'metadata.content',
+}
+
+# Alan seçimi yapılmadığında çıkarılan alanlar (full_data metadata'nın tekrarıdır)
+DEFAULT_EXCLUDE = ('full_data',)
+
+
+def parse_fields(value: Optional[Any]) -> Optional[List[str]]:
+    """'name,district' veya liste biçimindeki alan seçimini yol listesine çevirir"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    return [FIELD_ALIASES.get(field.strip(), field.strip()) for field in value if field.strip()]
+
+
+def project(result: Dict[str, Any], fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+    """Tek sonuçtan istenen yolları iç içe yapıyı koruyarak seçer"""
+    if fields is None:
+        metadata = result.get('metadata')
+        if isinstance(metadata, dict) and any(key in metadata for key in DEFAULT_EXCLUDE):
+            result = {**result, 'metadata': {k: v for k, v in metadata.items() if k not in DEFAULT_EXCLUDE}}
+        return result
+
+    projected: Dict[str, Any] = {}
+    for path in fields:
+        parts = path.split('.')
+        value: Any = result
+        for part in parts:
+            if not isinstance(value, dict) or part not in value:
+                break
+            value = value[part]
+        else:
+            target = projected
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = value
+    return projected
+
+
+def project_results(results: Iterable[Dict[str, Any]], fields: Optional[Sequence[str]]) -> List[Dict[str, Any]]:
+    return [project(result, fields) for result in results]
+
+
+def dumps(obj: Any) -> str:
+    """Boşluksuz JSON metni üretir (Türkçe karakterler kaçışsız)"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+
+def loads(data: Any) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Arama Sunucusu İstemcisi
+faiss_search.py ve ilkyardim_search.py'nin çalışan search_server'a bağlanmasını sağlar.
+Sunucu yoksa None döner ve script'ler eski tek seferlik aramaya düşer.
+"""
+
+import os
+import socket
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from result_format import dumps, loads
+
+DEFAULT_SOCKET_PATH = Path(__file__).parent / "faiss_index" / "search.sock"
+
+
+def get_socket_path() -> Path:
+    """Socket yolunu döner (REACH_SEARCH_SOCKET ile değiştirilebilir)"""
+    return Path(os.environ.get('REACH_SEARCH_SOCKET', str(DEFAULT_SOCKET_PATH)))
+
+
+def query_server(request: Dict[str, Any], socket_path: Optional[str] = None,
+                 timeout: float = 5.0) -> Optional[Dict[str, Any]]:
+    """İsteği JSON satırı olarak sunucuya gönderir, cevabı döner"""
+    path = Path(socket_path) if socket_path else get_socket_path()
+
+    if not hasattr(socket, 'AF_UNIX') or not path.exists():
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(path))
+            sock.sendall(dumps(request).encode('utf-8') + b'\n')
+
+            with sock.makefile('rb') as reader:
+                line = reader.readline()
+
+        return loads(line) if line else None
+
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Kalıcı Arama Sunucusu
+SentenceTransformer modelini bir kez yükler, toplanma alanı ve ilkyardım index'lerini
+bellekte tutar ve JSON satırları (stdin/stdout veya Unix socket) üzerinden arama yapar.
+
+Kullanım:
+    python3 search_server.py                 # stdin/stdout JSON-lines
+    python3 search_server.py --socket        # faiss_index/search.sock üzerinden
+    python3 search_server.py --socket /tmp/reach.sock
+
+İstek:  {"id": 1, "op": "search", "collection": "toplanma", "query": "Kadıköy toplanma alanı"}
+Cevap:  {"id": 1, "ok": true, "results": [...]}
+
+Toplu arama: {"op": "search_batch", "collection": "ilkyardim", "queries": ["kanama", "yanık"]}
+Konum:       {"op": "nearest", "lat": 40.99, "lng": 29.03, "k": 5}
+             {"op": "within_radius", "lat": 40.99, "lng": 29.03, "meters": 1000}
+Alan seçimi: {"op": "search", "query": "...", "fields": ["name", "district", "coordinates", "distance"]}
+Filtre:      {"op": "search", "query": "...", "filters": {"altyapi": ["su", "wc"], "min_alan": 10000}}
+Konumlu:     {"op": "search", "query": "...", "lat": 40.99, "lng": 29.03, "radius_m": 3000, "decay_m": 1000}
+             (benzerlik ve mesafe azalması tek sıralamada; sonuçlarda distance_m ve location_score)
+Sayfalama:   {"op": "search_page", "collection": "toplanma", "query": "...", "k": 5}
+             {"op": "search_page", "collection": "toplanma", "cursor": "<önceki cevaptaki next_cursor>", "k": 5}
+Tahliye:     {"op": "evacuation", "points": [{"id": "m1", "lat": 40.99, "lng": 29.03, "nufus": 1200}], "method": "greedy"}
+             (kapasiteyi aşmadan atama; cevapta summary, assignments, areas ve ilçe bazında overflow)
+Tamamlama:   {"op": "suggest", "prefix": "kadı", "k": 8}  (alan, mahalle ve ilçe adları, büyük alan önce)
+Canlı durum: {"op": "set_availability", "ilce": "Kadıköy", "alan_id": "kadıköy_pdf_1", "status": "full", "occupancy": 850}
+             {"op": "availability", "area_key": "tuzla/tuzla_12#1"}  (status: open/full/closed;
+             alan sonuçların metadata.area_key'i veya ilçe + alan_id (+ occurrence) ile seçilir)
+İstatistik: {"op": "stats"}  (koleksiyon başına sonuç önbelleği ve paylaşılan embedding önbelleği)
+"""
+
+import os
+import sys
+import argparse
+import logging
+import socketserver
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.append(str(Path(__file__).parent))
+from embedding_model import load_sentence_model
+from vector_store import VectorStore
+from faiss_indexer import ToplanmaAlanlariIndexer
+from availability import normalize_area_key
+from ilkyardim_indexer import IlkyardimIndexer
+from faiss_search import (search_toplanma_alanlari_batch, search_toplanma_alanlari_near,
+                          search_toplanma_alanlari_page)
+from ilkyardim_search import search_ilkyardim_batch, search_ilkyardim_page
+from search_client import get_socket_path
+from result_format import dumps, loads, parse_fields, project_results
+
+logger = logging.getLogger(__name__)
+
+
+class SearchServer:
+    def __init__(self, data_dir: str = "new_datas", ilkyardim_file: str = "Datas/ilkyardım.txt",
+                 index_dir: str = "faiss_index"):
+        start = time.perf_counter()
+
+        # Tek model ve sorgu önbelleği tüm koleksiyonlar arasında paylaşılır
+        self.store = VectorStore(index_dir, model=load_sentence_model())
+        self.toplanma = self.store.register(ToplanmaAlanlariIndexer(data_dir, index_dir))
+        self.ilkyardim = self.store.register(IlkyardimIndexer(ilkyardim_file, index_dir))
+
+        self.store.load_all()
+        self.toplanma_loaded = self.store.is_loaded('toplanma')
+        self.ilkyardim_loaded = self.store.is_loaded('ilkyardim')
+
+        # Konum ve tamamlama istekleri ilk seferde beklemesin diye index'ler önceden kurulur
+        if self.toplanma_loaded:
+            self.toplanma.get_geo_index()
+            self.toplanma.get_typeahead()
+            self.toplanma.get_place_resolver()
+
+        # Model ve index'ler thread'ler arasında sırayla kullanılır
+        self._lock = threading.Lock()
+
+        logger.info(f"Arama sunucusu hazır ({time.perf_counter() - start:.2f} sn) - "
+                    f"toplanma: {self.toplanma_loaded}, ilkyardım: {self.ilkyardim_loaded}")
+
+    def search_batch(self, collection: str, queries: List[str], limit: int = 5,
+                     filters: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
+        """İlgili koleksiyonda tek seferlik CLI ile aynı sonuçları üretir"""
+        indexer = self.store.get(collection)
+        if filters and collection != 'toplanma':
+            raise ValueError("Öznitelik filtresi sadece toplanma koleksiyonunda destekleniyor")
+        if not self.store.is_loaded(collection):
+            return [[] for _ in queries]
+
+        if collection == 'toplanma':
+            return search_toplanma_alanlari_batch(indexer, queries, limit, filters)
+        if collection == 'ilkyardim':
+            return search_ilkyardim_batch(indexer, queries, limit)
+
+        # Yeni koleksiyonlar doğrudan vektör aramasıyla sorgulanır
+        return indexer.cached_search(queries, limit, lambda missing: indexer.search_batch(missing, limit))
+
+    def search_page(self, collection: str, query: str = None, limit: int = 5,
+                    cursor: str = None) -> Dict[str, Any]:
+        """İlk sayfayı veya imlecin gösterdiği sayfayı döner (aday listesi oturumda tutulur)"""
+        indexer = self.store.get(collection)
+        if not self.store.is_loaded(collection):
+            return {'results': [], 'offset': 0, 'next_cursor': None}
+
+        if collection == 'toplanma':
+            return search_toplanma_alanlari_page(indexer, query, limit, cursor)
+        if collection == 'ilkyardim':
+            return search_ilkyardim_page(indexer, query, limit, cursor)
+        return indexer.search_page(query, limit, cursor)
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Tek bir JSON isteğini işler"""
+        response: Dict[str, Any] = {}
+        if 'id' in request:
+            response['id'] = request['id']
+
+        op = request.get('op', 'search')
+        start = time.perf_counter()
+
+        try:
+            # İstenen alanlar (ör. ["name", "district"]); verilmezse full_data hariç tüm sonuç
+            fields = parse_fields(request.get('fields'))
+
+            if op == 'ping':
+                response['ok'] = True
+                response['collections'] = dict(self.store.loaded)
+            elif op == 'stats':
+                response['ok'] = True
+                response.update(self.store.stats())
+                if self.toplanma.typeahead is not None:
+                    response['typeahead'] = self.toplanma.typeahead.stats()
+            elif op in ('nearest', 'within_radius'):
+                if not self.toplanma_loaded:
+                    raise ValueError("Toplanma alanı index'i yüklenmemiş")
+                lat, lng = float(request['lat']), float(request['lng'])
+                with self._lock:
+                    if op == 'nearest':
+                        results = self.toplanma.nearest(lat, lng, int(request.get('k', 5)))
+                    else:
+                        results = self.toplanma.within_radius(lat, lng, float(request['meters']))
+                    unlocated = len(self.toplanma.get_geo_index().unlocated_rows)
+                response['ok'] = True
+                response['results'] = project_results(results, fields)
+                # Koordinatı olmayan alanlar konum aramasına giremez, ayrıca bildirilir
+                response['unlocated'] = unlocated
+            elif op == 'evacuation':
+                if not self.toplanma_loaded:
+                    raise ValueError("Toplanma alanı index'i yüklenmemiş")
+                max_distance_m = request.get('max_distance_m')
+                with self._lock:
+                    plan = self.toplanma.plan_evacuation(
+                        list(request['points']), method=request.get('method', 'greedy'),
+                        candidates=int(request['candidates']) if request.get('candidates') else None,
+                        max_distance_m=float(max_distance_m) if max_distance_m is not None else None)
+                response['ok'] = True
+                response.update(plan)
+            elif op == 'suggest':
+                if not self.toplanma_loaded:
+                    raise ValueError("Toplanma alanı index'i yüklenmemiş")
+                # Ağaç salt okunur olduğundan kilit beklemeden cevaplanır
+                response['ok'] = True
+                response['results'] = self.toplanma.suggest(str(request.get('prefix', '')),
+                                                            int(request.get('k', 5)))
+            elif op in ('availability', 'set_availability'):
+                if request.get('area_key'):
+                    key = normalize_area_key(request['area_key'])
+                else:
+                    if request.get('ilce') is None:
+                        raise ValueError("Alan için area_key veya ilce ile alan_id gerekli")
+                    key = normalize_area_key(request['alan_id'], request['ilce'], int(request.get('occurrence', 0)))
+                if op == 'set_availability':
+                    occupancy = request.get('occupancy')
+                    # Katman kendi dosya kilidini kullanır; sürüm artışı sonuç önbelleğini geçersiz kılar
+                    result = self.toplanma.availability.set(
+                        key, request.get('status'), int(occupancy) if occupancy is not None else None)
+                else:
+                    result = self.toplanma.availability.get(key)
+                response['ok'] = True
+                response['availability'] = result
+            elif op == 'search' and request.get('lat') is not None and request.get('lng') is not None:
+                if request.get('collection', 'toplanma') != 'toplanma':
+                    raise ValueError("Konumlu arama sadece toplanma koleksiyonunda desteklenir")
+                if not self.toplanma_loaded:
+                    raise ValueError("Toplanma alanı index'i yüklenmemiş")
+                radius_m, decay_m = request.get('radius_m'), request.get('decay_m')
+                with self._lock:
+                    results = search_toplanma_alanlari_near(
+                        self.toplanma, request['query'], int(request.get('k', 5)),
+                        float(request['lat']), float(request['lng']),
+                        float(radius_m) if radius_m is not None else None,
+                        float(decay_m) if decay_m is not None else None, request.get('filters'))
+                response['ok'] = True
+                response['results'] = project_results(results, fields)
+            elif op == 'search':
+                with self._lock:
+                    results = self.search_batch(request.get('collection', 'toplanma'),
+                                                [request['query']], int(request.get('k', 5)),
+                                                request.get('filters'))
+                response['ok'] = True
+                response['results'] = project_results(results[0], fields)
+            elif op == 'search_batch':
+                queries = list(request['queries'])
+                with self._lock:
+                    results = self.search_batch(request.get('collection', 'toplanma'),
+                                                queries, int(request.get('k', 5)), request.get('filters'))
+                response['ok'] = True
+                response['results'] = [project_results(query_results, fields) for query_results in results]
+            elif op == 'search_page':
+                with self._lock:
+                    page = self.search_page(request.get('collection', 'toplanma'), request.get('query'),
+                                            int(request.get('k', 5)), request.get('cursor'))
+                response['ok'] = True
+                response['results'] = project_results(page['results'], fields)
+                response['offset'] = page['offset']
+                response['next_cursor'] = page['next_cursor']
+            else:
+                raise ValueError(f"Bilinmeyen işlem: {op}")
+
+        except Exception as e:
+            response['ok'] = False
+            logger.error(f"İstek hatası: {e!r}")
+            response['error'] = str(e) or type(e).__name__
+
+        response['took_ms'] = round((time.perf_counter() - start) * 1000, 3)
+        return response
+
+    def handle_line(self, line: str) -> str:
+        """JSON satırını işler ve cevabı JSON satırı olarak döner"""
+        try:
+            request = loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("İstek JSON nesnesi olmalı")
+        except ValueError as e:
+            return dumps({'ok': False, 'error': f"Geçersiz istek: {e}"})
+
+        return dumps(self.handle(request))
+
+
+def serve_stdio(server: SearchServer):
+    """stdin'den satır satır istek okur, cevapları stdout'a yazar"""
+    logger.info("stdin/stdout üzerinden istek bekleniyor...")
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        sys.stdout.write(server.handle_line(line) + '\n')
+        sys.stdout.flush()
+
+
+def serve_socket(server: SearchServer, socket_path: Path):
+    """Unix socket üzerinden istekleri karşılar"""
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            # Aynı bağlantı üzerinden birden çok istek gönderilebilir
+            for raw in self.rfile:
+                line = raw.decode('utf-8').strip()
+                if not line:
+                    continue
+                self.wfile.write((server.handle_line(line) + '\n').encode('utf-8'))
+                self.wfile.flush()
+
+    # Önceki çalışmadan kalan socket dosyasını temizle
+    if socket_path.exists():
+        socket_path.unlink()
+
+    with socketserver.ThreadingUnixStreamServer(str(socket_path), Handler) as unix_server:
+        unix_server.daemon_threads = True
+        logger.info(f"Unix socket dinleniyor: {socket_path}")
+
+        try:
+            unix_server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if socket_path.exists():
+                socket_path.unlink()
+
+
+def main():
+    """Ana fonksiyon"""
+    parser = argparse.ArgumentParser(description="Kalıcı FAISS arama sunucusu")
+    parser.add_argument('--socket', nargs='?', const=str(get_socket_path()), default=None,
+                        help="Unix socket yolu (değer verilmezse varsayılan yol)")
+    parser.add_argument('--data-dir', default="new_datas")
+    parser.add_argument('--ilkyardim-file', default="Datas/ilkyardım.txt")
+    parser.add_argument('--index-dir', default="faiss_index")
+    args = parser.parse_args()
+
+    server = SearchServer(args.data_dir, args.ilkyardim_file, args.index_dir)
+
+    if args.socket:
+        serve_socket(server, Path(args.socket))
+    else:
+        serve_stdio(server)
+
+
+if __name__ == "__main__":
+    main()
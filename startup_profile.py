@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Başlangıç Süresi Profili
+Arama script'lerinin soğuk başlangıç aşamalarını (import, index yükleme, model
+yükleme, arama) ölçer. --profile-startup ile rapor stderr'e JSON olarak yazılır;
+--startup-budget-ms aşıldığında script sıfırdan farklı kodla çıkar.
+"""
+
+import sys
+import json
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Hangi ağır modüllerin gerçekten yüklendiği raporlanır
+HEAVY_MODULES = ('numpy', 'faiss', 'torch', 'sentence_transformers', 'onnxruntime')
+
+# Bütçe aşımında kullanılan çıkış kodu
+BUDGET_EXCEEDED_EXIT_CODE = 3
+
+
+class StartupProfiler:
+    def __init__(self, enabled: bool = False, budget_ms: Optional[float] = None):
+        self.enabled = enabled or budget_ms is not None
+        self.budget_ms = budget_ms
+        self.start = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Bir aşamanın süresini ölçer (profil kapalıyken maliyetsiz)"""
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, (time.perf_counter() - start) * 1000))
+
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            'phases_ms': {name: round(ms, 1) for name, ms in self.phases},
+            'total_ms': round(self.total_ms(), 1),
+            'budget_ms': self.budget_ms,
+            'loaded_modules': [name for name in HEAVY_MODULES if name in sys.modules]
+        }
+
+    def finish(self) -> int:
+        """Raporu stderr'e yazar, bütçe aşıldıysa hata kodu döner"""
+        if not self.enabled:
+            return 0
+
+        report = self.report()
+        # stdout arama sonuçlarına ayrıldığından rapor stderr'e yazılır
+        sys.stderr.write(json.dumps({'startup_profile': report}, ensure_ascii=False) + '\n')
+
+        if self.budget_ms is not None and report['total_ms'] > self.budget_ms:
+            sys.stderr.write(f"Başlangıç süresi bütçesi aşıldı: {report['total_ms']} ms > {self.budget_ms} ms\n")
+            return BUDGET_EXCEEDED_EXIT_CODE
+        return 0
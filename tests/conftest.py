@@ -0,0 +1,57 @@
+"""Testler depo kökündeki düz modülleri import eder; küçük index kurmak için yardımcılar"""
+
+import json
+import re
+import sys
+import zlib
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+class HashingModel:
+    """Model indirmeden çalışan, kelime hash'lerinden normalize vektör üreten encoder"""
+    model_id = 'test-hashing'
+    dimension = 64
+
+    def encode(self, texts, show_progress_bar=False, **kwargs):
+        import numpy as np
+
+        vectors = np.zeros((len(texts), self.dimension), dtype='float32')
+        for i, text in enumerate(texts):
+            for word in re.findall(r'\w+', text.lower()):
+                vectors[i, zlib.crc32(word.encode('utf-8')) % self.dimension] += 1.0
+            norm = np.linalg.norm(vectors[i])
+            if norm:
+                vectors[i] /= norm
+        return vectors
+
+
+def make_area(area_id, ad, mahalle='Merkez', lat=0.0, lng=0.0, **alan_bilgileri):
+    return {'id': area_id, 'ad': ad, 'mahalle': mahalle, 'koordinat': {'lat': lat, 'lng': lng},
+            'alan_bilgileri': alan_bilgileri, 'altyapi': {}, 'ulasim': {}, 'ozellikler': {}}
+
+
+def write_areas(data_dir: Path, districts):
+    """{ilçe: [alan, ...]} verisini indexer'ın okuduğu ilçe JSON dosyalarına yazar"""
+    data_dir.mkdir(parents=True, exist_ok=True)
+    for ilce, areas in districts.items():
+        with open(data_dir / f"{ilce.lower()}.json", 'w', encoding='utf-8') as f:
+            json.dump({'ilce': ilce, 'toplanma_alanlari': areas}, f, ensure_ascii=False)
+
+
+@pytest.fixture
+def build_indexer(tmp_path):
+    """Verilen ilçe verisinden HashingModel ile küçük bir toplanma alanı index'i kurar"""
+    def build(districts, index_type='flat'):
+        from faiss_indexer import ToplanmaAlanlariIndexer
+
+        write_areas(tmp_path / 'data', districts)
+        indexer = ToplanmaAlanlariIndexer(data_dir=str(tmp_path / 'data'), index_dir=str(tmp_path / 'index'),
+                                          model=HashingModel(), index_type=index_type)
+        indexer.build_full_index(workers=1)
+        return indexer
+    return build
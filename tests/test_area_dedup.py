@@ -0,0 +1,81 @@
+"""Tekrar eden alan birleştirme testleri"""
+
+import logging
+
+from area_dedup import collapse_duplicates, dedup_key
+
+
+def area(alan_id, ad='Şeker Parkı', mahalle='Moda', ilce='Kadıköy', lat=40.98712, lng=29.02611, **fields):
+    meta = {'ilce': ilce, 'alan_id': alan_id, 'alan_adi': ad, 'mahalle': mahalle,
+            'koordinat': {'lat': lat, 'lng': lng}, 'area_key': f"kadıköy/{alan_id}#0",
+            'alan_bilgileri': {}, 'altyapi': {}, 'ulasim': {}, 'ozellikler': {}}
+    meta.update(fields)
+    meta['full_data'] = {'id': alan_id, 'ad': ad, **{key: meta[key] for key in
+                                                   ('alan_bilgileri', 'altyapi', 'ulasim', 'ozellikler')}}
+    return meta
+
+
+def test_dedup_key_ignores_case_accents_and_coordinate_noise():
+    a = area('a', ad='ŞEKER PARKI', mahalle='moda')
+    b = area('b', ad='seker parki', lat=40.987121, lng=29.026114)
+    assert dedup_key(a) == dedup_key(b)
+    assert dedup_key(a) != dedup_key(area('c', lat=40.98812))
+    assert dedup_key(a) != dedup_key(area('d', mahalle='Caferağa'))
+
+
+def test_duplicates_merge_into_most_complete_record(caplog):
+    sparse = area('kadıköy_pdf_1', alan_bilgileri={'toplam_alan': 4000, 'kapasite': 1500},
+                  altyapi={'su': True})
+    rich = area('kadıköy_rtf_1', alan_bilgileri={'toplam_alan': 4000, 'kapasite': 2000,
+                                                  'kullanilabilir_alan': 3000},
+                altyapi={'elektrik': True, 'wc': True}, ulasim={'metro': 'Kadıköy'})
+    other = area('kadıköy_pdf_9', ad='Moda Sahili', lat=40.98)
+    metadata = [sparse, other, rich]
+    documents = ['doc-sparse', 'doc-other', 'doc-rich']
+
+    with caplog.at_level(logging.WARNING, logger='area_dedup'):
+        kept_documents, kept, collapsed = collapse_duplicates(
+            documents, metadata, lambda meta: f"rebuilt:{meta['alan_id']}:{sorted(meta['altyapi'])}")
+
+    assert collapsed == 1
+    assert [meta['alan_id'] for meta in kept] == ['kadıköy_rtf_1', 'kadıköy_pdf_9']
+    merged = kept[0]
+
+    # En dolu kayıt kalır, çakışan değerde onun değeri geçerlidir
+    assert merged['alan_bilgileri'] == {'toplam_alan': 4000, 'kapasite': 2000, 'kullanilabilir_alan': 3000}
+    # Boş alanlar diğer kayıttan doldurulur
+    assert merged['altyapi'] == {'elektrik': True, 'wc': True, 'su': True}
+    assert merged['ulasim'] == {'metro': 'Kadıköy'}
+    assert merged['full_data']['altyapi'] == merged['altyapi']
+    assert merged['alias_ids'] == ['kadıköy_pdf_1']
+    assert merged['alias_keys'] == ['kadıköy/kadıköy_pdf_1#0']
+
+    # Doldurulan kaydın dokümanı yeniden üretilir, diğerleri olduğu gibi kalır
+    assert kept_documents == ["rebuilt:kadıköy_rtf_1:['elektrik', 'su', 'wc']", 'doc-other']
+    assert kept[1]['alias_ids'] == [] and kept[1]['alias_keys'] == []
+
+    # Çakışma grup başına bir kez loglanır
+    warnings = [record.getMessage() for record in caplog.records if record.levelno == logging.WARNING]
+    assert len(warnings) == 1
+    assert 'alan_bilgileri.kapasite' in warnings[0]
+    assert 'toplam_alan' not in warnings[0]
+    # Girdi kayıtları değiştirilmez
+    assert sparse['alan_bilgileri'] == {'toplam_alan': 4000, 'kapasite': 1500}
+
+
+def test_equal_completeness_keeps_first_row():
+    first = area('a', altyapi={'su': True})
+    second = area('b', altyapi={'wc': True})
+    _, kept, _ = collapse_duplicates(['a', 'b'], [first, second])
+    assert kept[0]['alan_id'] == 'a'
+    assert kept[0]['altyapi'] == {'su': True, 'wc': True}
+
+
+def test_unfilled_group_keeps_original_document():
+    full = area('a', alan_bilgileri={'kapasite': 10})
+    empty = area('b')
+    documents, kept, collapsed = collapse_duplicates(['doc-b', 'doc-a'], [empty, full],
+                                                     lambda meta: 'rebuilt')
+    assert collapsed == 1
+    assert documents == ['doc-a']
+    assert kept[0]['alias_ids'] == ['b']
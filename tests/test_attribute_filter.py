@@ -0,0 +1,88 @@
+"""Öznitelik filtresi ayrıştırma ve maske testleri"""
+
+import numpy as np
+import pytest
+
+from attribute_filter import AttributeColumns, normalize_filters
+
+METADATA = [
+    {'altyapi': {'elektrik': True, 'su': True, 'wc': True}, 'alan_bilgileri': {'toplam_alan': 12000},
+     'ozellikler': {'tur': 'Park', 'durum': 'Aktif'}},
+    {'altyapi': {'su': True}, 'alan_bilgileri': {'toplam_alan': '5000'},
+     'ozellikler': {'tur': 'Boş Alan', 'durum': 'Aktif'}},
+    {'altyapi': {'elektrik': True, 'su': False, 'kanalizasyon': True}, 'alan_bilgileri': {'toplam_alan': None},
+     'ozellikler': {'tur': 'PARK', 'durum': 'Pasif'}},
+    {'altyapi': None, 'alan_bilgileri': {'toplam_alan': 'bilinmiyor'}, 'ozellikler': {}},
+]
+
+
+@pytest.fixture
+def columns():
+    return AttributeColumns.from_metadata(METADATA)
+
+
+def rows(mask):
+    return np.flatnonzero(mask).tolist()
+
+
+@pytest.mark.parametrize('filters', [None, {}, {'altyapi': [], 'tur': ''}])
+def test_empty_filters_normalize_to_none(filters):
+    assert normalize_filters(filters) is None
+
+
+def test_normalization_is_canonical():
+    a = normalize_filters({'altyapi': 'WC, su,wc', 'min_alan': '100', 'tur': ['Boş Alan', 'PARK']})
+    b = normalize_filters({'tur': 'park,boş alan', 'min_alan': 100.0, 'altyapi': ['su', 'wc']})
+    assert a == b == {'altyapi': ['su', 'wc'], 'min_alan': 100.0, 'tur': ['boş alan', 'park']}
+
+
+@pytest.mark.parametrize('filters', [
+    ['su'],
+    {'renk': 'mavi'},
+    {'altyapi': ['su', 'internet']},
+    {'min_alan': 'çok'},
+    {'max_alan': [1, 2]},
+])
+def test_invalid_filters_raise(filters):
+    with pytest.raises(ValueError):
+        normalize_filters(filters)
+
+
+def test_columns_from_metadata(columns):
+    assert len(columns) == 4
+    assert columns.toplam_alan.tolist() == [12000.0, 5000.0, 0.0, 0.0]
+    # Tür değerleri normalize edilerek tek kategoriye düşer
+    assert columns.tur_codes[0] == columns.tur_codes[2]
+
+
+def test_altyapi_requires_all_flags(columns):
+    assert rows(columns.mask(normalize_filters({'altyapi': ['su']}))) == [0, 1]
+    assert rows(columns.mask(normalize_filters({'altyapi': ['su', 'elektrik']}))) == [0]
+    assert rows(columns.mask(normalize_filters({'altyapi': ['kanalizasyon']}))) == [2]
+
+
+def test_area_range_is_inclusive(columns):
+    assert rows(columns.mask(normalize_filters({'min_alan': 5000}))) == [0, 1]
+    assert rows(columns.mask(normalize_filters({'min_alan': 1000, 'max_alan': 5000}))) == [1]
+
+
+def test_category_filters(columns):
+    assert rows(columns.mask(normalize_filters({'tur': 'park'}))) == [0, 2]
+    assert rows(columns.mask(normalize_filters({'tur': 'park', 'durum': 'aktif'}))) == [0]
+    assert rows(columns.mask(normalize_filters({'tur': 'stadyum'}))) == []
+
+
+def test_no_filters_allow_everything(columns):
+    assert columns.mask(None).all()
+
+
+def test_save_load_round_trip(columns, tmp_path):
+    path = tmp_path / 'attributes.npz'
+    columns.save(path)
+    loaded = AttributeColumns.load(path)
+
+    assert loaded.tur_values == columns.tur_values
+    assert loaded.durum_values == columns.durum_values
+    for filters in ({'altyapi': ['su']}, {'min_alan': 1000}, {'tur': 'boş alan', 'durum': 'aktif'}):
+        normalized = normalize_filters(filters)
+        assert rows(loaded.mask(normalized)) == rows(columns.mask(normalized))
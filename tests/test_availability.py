@@ -0,0 +1,205 @@
+"""Paylaşımlı mmap canlı durum tablosu testleri"""
+
+import pytest
+
+from availability import (CLOSED, FULL, OPEN, AvailabilityOverlay, availability_keys,
+                          normalize_area_key)
+from index_manifest import area_keys
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / 'availability.bin'
+
+
+def test_empty_overlay(path):
+    overlay = AvailabilityOverlay(path)
+    assert len(overlay) == 0
+    assert overlay.version == 0
+    assert overlay.get('kadıköy/k1#0') is None
+    status, occupancy = overlay.lookup(['kadıköy/k1#0'])
+    assert status.tolist() == [0] and occupancy.tolist() == [0]
+
+
+def test_set_and_get(path):
+    overlay = AvailabilityOverlay(path)
+    entry = overlay.set('kadıköy/k1#0', 'full', 850)
+    assert (entry['area_key'], entry['status'], entry['occupancy']) == ('kadıköy/k1#0', 'full', 850)
+
+    # Sadece doluluk güncellenince durum korunur
+    overlay.set('kadıköy/k1#0', occupancy=900)
+    assert overlay.get('kadıköy/k1#0')['status'] == 'full'
+    assert overlay.get('kadıköy/k1#0')['occupancy'] == 900
+    assert len(overlay) == 1
+
+
+def test_invalid_updates_raise(path):
+    overlay = AvailabilityOverlay(path)
+    with pytest.raises(ValueError):
+        overlay.set('kadıköy/k1#0', 'yarı dolu')
+    with pytest.raises(ValueError):
+        overlay.set('kadıköy/k1#0', occupancy=-1)
+
+
+def test_lookup_mixes_known_and_unknown(path):
+    overlay = AvailabilityOverlay(path)
+    overlay.set('a/1#0', 'closed')
+    overlay.set('b/2#0', 'open', 10)
+    status, occupancy = overlay.lookup(['b/2#0', 'x/9#0', 'a/1#0'])
+    assert status.tolist() == [OPEN, 0, CLOSED]
+    assert occupancy.tolist() == [10, 0, 0]
+
+
+def test_growth_keeps_all_entries(path):
+    overlay = AvailabilityOverlay(path)
+    count = 2000
+    for i in range(count):
+        overlay.set(f"ilce/alan_{i}#0", 'full' if i % 3 == 0 else 'open', i)
+
+    assert len(overlay) == count
+    assert len(overlay._table) * 0.7 >= count
+    status, occupancy = overlay.lookup([f"ilce/alan_{i}#0" for i in range(count)])
+    assert status.tolist() == [FULL if i % 3 == 0 else OPEN for i in range(count)]
+    assert occupancy.tolist() == list(range(count))
+
+
+def test_updates_visible_across_instances(path):
+    reader = AvailabilityOverlay(path)
+    writer = AvailabilityOverlay(path)
+    writer.set('a/1#0', 'full')
+    assert reader.get('a/1#0')['status'] == 'full'
+
+    # Okuyucu açıkken tablo büyüse de yeni dosyayı görür
+    for i in range(1000):
+        writer.set(f"b/{i}#0", 'open')
+    assert len(reader) == 1001
+    assert reader.get('b/999#0') is not None
+
+
+def test_version_and_closed_count(path):
+    overlay = AvailabilityOverlay(path)
+    overlay.set('a/1#0', 'closed')
+    overlay.set('a/2#0', 'closed')
+    version = overlay.version
+    assert overlay.closed_count == 2
+
+    overlay.set('a/1#0', 'open')
+    assert overlay.closed_count == 1
+    overlay.set('a/2#0', 'closed')
+    assert overlay.closed_count == 1
+    assert overlay.version == version + 2
+
+
+def test_reset(path):
+    overlay = AvailabilityOverlay(path)
+    other = AvailabilityOverlay(path)
+    overlay.set('a/1#0', 'closed')
+    assert len(other) == 1
+
+    overlay.reset()
+    assert len(overlay) == 0 and len(other) == 0
+    assert other.closed_count == 0
+    assert overlay.entries() == []
+
+
+def test_repeated_alan_ids_are_separate_areas(path):
+    metadata = [{'ilce': 'Tuzla', 'alan_id': 'tuzla_12'}, {'ilce': 'Tuzla', 'alan_id': 'tuzla_12'},
+                {'ilce': 'Pendik', 'alan_id': 'tuzla_12'}]
+    for meta, key in zip(metadata, area_keys(metadata)):
+        meta['area_key'] = key
+
+    overlay = AvailabilityOverlay(path)
+    overlay.set(normalize_area_key('tuzla_12', 'Tuzla', 1), 'closed')
+    status, _ = overlay.lookup_areas([availability_keys(meta) for meta in metadata])
+    assert status.tolist() == [0, CLOSED, 0]
+
+
+def test_alias_status_applies_to_merged_area(path):
+    merged = {'ilce': 'Şile', 'alan_id': 'şile_rtf_1', 'area_key': 'şile/şile_rtf_1#0',
+              'alias_ids': ['şile_pdf_3', 'şile_pdf_4'], 'alias_keys': ['şile/şile_pdf_3#0', 'şile/şile_pdf_4#0']}
+    other = {'ilce': 'Şile', 'alan_id': 'şile_rtf_2', 'area_key': 'şile/şile_rtf_2#0'}
+
+    overlay = AvailabilityOverlay(path)
+    overlay.set('şile/şile_rtf_1#0', 'full', 100)
+    overlay.set(normalize_area_key('ŞİLE/şile_pdf_4'), 'closed', 40)
+    overlay.set('şile/şile_rtf_2#0', 'open', 5)
+
+    status, occupancy = overlay.lookup_areas([availability_keys(merged), availability_keys(other)])
+    # En ağır durum ve en yüksek doluluk geçerli
+    assert status.tolist() == [CLOSED, OPEN]
+    assert occupancy.tolist() == [100, 5]
+
+
+def test_merged_duplicate_at_later_occurrence(build_indexer):
+    from conftest import make_area
+
+    indexer = build_indexer({'Tuzla': [
+        make_area('tuzla_12', 'Sahil Parkı', lat=40.81, lng=29.30),
+        make_area('tuzla_12', 'Çarşı Meydanı', lat=40.82, lng=29.31),
+        make_area('tuzla_12', 'Çarşı Meydanı', lat=40.82, lng=29.31, kapasite=500),
+    ]})
+    by_name = {meta['alan_adi']: meta for meta in indexer.metadata}
+    assert len(by_name) == 2
+    # En dolu kayıt (#2) kalır, birleştirilen #1 alias anahtarı olur
+    assert by_name['Çarşı Meydanı']['area_key'] == 'tuzla/tuzla_12#2'
+    assert by_name['Çarşı Meydanı']['alias_keys'] == ['tuzla/tuzla_12#1']
+
+    def statuses():
+        status, _ = indexer.availability.lookup_areas(
+            [availability_keys(by_name[name]) for name in ('Sahil Parkı', 'Çarşı Meydanı')])
+        return status.tolist()
+
+    indexer.availability.set(normalize_area_key('tuzla_12', 'Tuzla', 1), 'closed')
+    assert statuses() == [0, CLOSED]
+
+    # #0 ayrı bir alandır, birleştirilmiş kayda uygulanmaz
+    indexer.availability.reset()
+    indexer.availability.set(normalize_area_key('tuzla_12', 'Tuzla', 0), 'full')
+    assert statuses() == [FULL, 0]
+
+
+def test_old_metadata_without_area_key_uses_first_occurrence():
+    assert availability_keys({'ilce': 'Kadıköy', 'alan_id': 'k1'}) == ['kadıköy/k1#0']
+
+
+@pytest.mark.parametrize('text, ilce, occurrence, expected', [
+    ('k1', 'Kadıköy', 0, 'kadıköy/k1#0'),
+    ('tuzla_12', 'TUZLA', 2, 'tuzla/tuzla_12#2'),
+    ('İzmit/i_1', None, 0, 'izmit/i_1#0'),
+    ('tuzla/tuzla_12#3', None, 0, 'tuzla/tuzla_12#3'),
+])
+def test_normalize_area_key(text, ilce, occurrence, expected):
+    assert normalize_area_key(text, ilce, occurrence) == expected
+
+
+@pytest.mark.parametrize('text', ['k1', 'tuzla/t#x'])
+def test_normalize_area_key_rejects_ambiguous(text):
+    with pytest.raises(ValueError):
+        normalize_area_key(text)
+
+
+def test_reset_keeps_version_increasing(path):
+    overlay = AvailabilityOverlay(path)
+    overlay.set('a/1#0', 'closed')
+    before = overlay.version
+
+    overlay.reset()
+    overlay.set('b/2#0', 'closed')
+    assert overlay.version > before + 1
+    assert overlay.get('a/1#0') is None
+
+
+def test_reset_then_set_invalidates_search_cache(build_indexer):
+    from conftest import make_area
+
+    indexer = build_indexer({'Kadıköy': [make_area('k1', 'Moda Parkı'), make_area('k2', 'Moda Sahil Parkı')]})
+    search = lambda: indexer.cached_search(['moda parkı'], 5, lambda queries: indexer.search_batch(queries, 5))[0]
+    ids = lambda results: [result['metadata']['alan_id'] for result in results]
+
+    indexer.availability.set('kadıköy/k1#0', 'closed')
+    assert ids(search()) == ['k2']
+
+    # Aynı sürüm numarası tekrar kullanılsaydı önbellekteki "k1 kapalı" sıralaması dönerdi
+    indexer.availability.reset()
+    indexer.availability.set('kadıköy/k2#0', 'closed')
+    assert ids(search()) == ['k1']
@@ -0,0 +1,39 @@
+"""BM25 index'i ve RRF birleştirme testleri"""
+
+import pytest
+
+from bm25_index import BM25Index, reciprocal_rank_fusion
+
+
+def test_rrf_orders_by_summed_reciprocal_rank():
+    fused = reciprocal_rank_fusion([[3, 1, 2], [1, 4]], k=60)
+    assert [row for row, _ in fused] == [1, 3, 4, 2]
+    scores = dict(fused)
+    assert scores[1] == pytest.approx(1 / 62 + 1 / 61)
+    assert scores[3] == pytest.approx(1 / 61)
+    assert scores[4] == pytest.approx(1 / 62)
+    assert scores[2] == pytest.approx(1 / 63)
+
+
+def test_rrf_ties_keep_first_seen_order():
+    # Aynı puanlı satırlar ilk görüldükleri sırayla döner
+    fused = reciprocal_rank_fusion([[7, 5], [5, 7]])
+    assert [row for row, _ in fused] == [7, 5]
+    assert fused[0][1] == fused[1][1]
+    assert [row for row, _ in reciprocal_rank_fusion([[2], [9]])] == [2, 9]
+
+
+def test_rrf_empty_and_k_weighting():
+    assert reciprocal_rank_fusion([]) == []
+    assert reciprocal_rank_fusion([[], []]) == []
+    # Küçük k ilk sıraları daha çok ödüllendirir: tek listede birinci, iki listede üçüncü olana karşı
+    rankings = [[0, 8, 1], [9, 6, 1]]
+    assert reciprocal_rank_fusion(rankings, k=0)[0][0] == 0
+    assert reciprocal_rank_fusion(rankings, k=60)[0][0] == 1
+
+
+def test_bm25_search_ranks_matching_documents():
+    index = BM25Index().build(['moda parkı kadıköy', 'fenerbahçe parkı kadıköy', 'kuzguncuk korusu üsküdar'])
+    rows = [row for row, _ in index.search('moda parkı', 3)]
+    assert rows[0] == 0
+    assert 2 not in rows
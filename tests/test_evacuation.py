@@ -0,0 +1,180 @@
+"""Kapasiteye duyarlı tahliye ataması testleri"""
+
+import itertools
+import random
+
+import numpy as np
+import pytest
+
+from evacuation import EvacuationPlanner, area_capacities, assign_greedy, assign_min_cost_flow
+from geo_index import GeoIndex
+
+
+def random_instance(rng, points, areas, candidates):
+    """Her nokta için yakından uzağa sıralı, tekrarsız aday listesi"""
+    rows = np.full((points, candidates), -1, dtype=np.int64)
+    distances = np.full((points, candidates), np.inf)
+    for i in range(points):
+        chosen = rng.sample(range(areas), rng.randint(1, candidates))
+        chosen_distances = sorted(rng.randint(1, 500) for _ in chosen)
+        rows[i, :len(chosen)] = chosen
+        distances[i, :len(chosen)] = chosen_distances
+    demand = np.array([rng.randint(0, 6) for _ in range(points)], dtype=np.int64)
+    capacity = np.array([rng.randint(0, 6) for _ in range(areas)], dtype=np.int64)
+    return rows, distances, demand, capacity
+
+
+def served_and_cost(assignment):
+    _, _, people, distances = assignment
+    return int(people.sum()), float((people * distances).sum())
+
+
+def check_feasible(assignment, candidate_rows, demand, capacity):
+    points, rows, people, _ = assignment
+    assert (people > 0).all()
+    assert (np.bincount(rows, weights=people, minlength=len(capacity)) <= capacity).all()
+    assert (np.bincount(points, weights=people, minlength=len(demand)) <= demand).all()
+    for i, row in zip(points.tolist(), rows.tolist()):
+        assert row in candidate_rows[i].tolist()
+
+
+def brute_force(candidate_rows, candidate_distances, demand, capacity):
+    """Tüm bölüşümleri dener; önce atanan kişi en çok, sonra kişi×metre en az"""
+    edges = [(i, int(row), float(distance))
+             for i in range(len(demand))
+             for row, distance in zip(candidate_rows[i], candidate_distances[i]) if row >= 0]
+    best = (0, 0.0)
+    for flows in itertools.product(*(range(int(min(demand[i], capacity[row])) + 1) for i, row, _ in edges)):
+        sent = np.zeros(len(demand), dtype=np.int64)
+        load = np.zeros(len(capacity), dtype=np.int64)
+        for (i, row, _), flow in zip(edges, flows):
+            sent[i] += flow
+            load[row] += flow
+        if (sent > demand).any() or (load > capacity).any():
+            continue
+        candidate = (int(sent.sum()), sum(flow * distance for (_, _, distance), flow in zip(edges, flows)))
+        if candidate[0] > best[0] or (candidate[0] == best[0] and candidate[1] < best[1]):
+            best = candidate
+    return best
+
+
+@pytest.mark.parametrize('assign', [assign_greedy, assign_min_cost_flow])
+def test_capacity_never_exceeded(assign):
+    rng = random.Random(7)
+    for _ in range(30):
+        rows, distances, demand, capacity = random_instance(rng, points=8, areas=5, candidates=3)
+        assignment = assign(rows, distances, demand, capacity)
+        check_feasible(assignment, rows, demand, capacity)
+
+
+def test_exact_matches_brute_force_on_small_inputs():
+    rng = random.Random(11)
+    for _ in range(25):
+        rows, distances, demand, capacity = random_instance(rng, points=3, areas=3, candidates=2)
+        exact = served_and_cost(assign_min_cost_flow(rows, distances, demand, capacity))
+        expected = brute_force(rows, distances, demand, capacity)
+        assert exact[0] == expected[0]
+        assert exact[1] == pytest.approx(expected[1])
+
+
+def test_greedy_matches_exact_without_contention():
+    rng = random.Random(5)
+    for _ in range(20):
+        rows, distances, demand, _ = random_instance(rng, points=6, areas=4, candidates=3)
+        # Her alan tüm talebi alabiliyorsa herkes en yakın adayına gider
+        capacity = np.full(4, int(demand.sum()) + 1, dtype=np.int64)
+        greedy = served_and_cost(assign_greedy(rows, distances, demand, capacity))
+        exact = served_and_cost(assign_min_cost_flow(rows, distances, demand, capacity))
+        assert greedy == pytest.approx(exact)
+        assert greedy[0] == int(demand.sum())
+
+
+def test_greedy_matches_exact_for_single_point():
+    rows = np.array([[2, 0, 1]])
+    distances = np.array([[100.0, 200.0, 300.0]])
+    demand = np.array([10])
+    capacity = np.array([4, 3, 5])
+    greedy = assign_greedy(rows, distances, demand, capacity)
+    assert served_and_cost(greedy) == served_and_cost(assign_min_cost_flow(rows, distances, demand, capacity))
+    assert greedy[1].tolist() == [2, 0, 1]
+    assert greedy[2].tolist() == [5, 4, 1]
+
+
+def test_exact_never_costs_more_than_greedy():
+    # Açgözlü ilk noktayı paylaşılan yakın alana yollar, ikinci nokta uzağa gider
+    rows = np.array([[0, 1], [0, -1]])
+    distances = np.array([[10.0, 20.0], [15.0, np.inf]])
+    demand = np.array([1, 1])
+    capacity = np.array([1, 1])
+    greedy = served_and_cost(assign_greedy(rows, distances, demand, capacity))
+    exact = served_and_cost(assign_min_cost_flow(rows, distances, demand, capacity))
+    assert greedy[0] == 1 and exact[0] == 2
+
+    rng = random.Random(13)
+    for _ in range(30):
+        instance = random_instance(rng, points=6, areas=4, candidates=3)
+        greedy = served_and_cost(assign_greedy(*instance))
+        exact = served_and_cost(assign_min_cost_flow(*instance))
+        assert exact[0] >= greedy[0]
+        if exact[0] == greedy[0]:
+            assert exact[1] <= greedy[1] + 1e-6
+
+
+def test_area_capacities_fall_back_to_area():
+    metadata = [{'alan_bilgileri': {'kapasite': 120, 'toplam_alan': 9000}},
+                {'alan_bilgileri': {'kullanilabilir_alan': 300, 'toplam_alan': 900}},
+                {'alan_bilgileri': {'toplam_alan': '150'}},
+                {'alan_bilgileri': {'toplam_alan': 'bilinmiyor'}},
+                {}]
+    assert area_capacities(metadata, m2_per_person=1.5).tolist() == [120, 200, 100, 0, 0]
+
+
+def make_planner(availability=None):
+    metadata = [
+        {'ilce': 'Kadıköy', 'alan_id': 'k1', 'koordinat': {'lat': 40.990, 'lng': 29.030},
+         'alan_bilgileri': {'kapasite': 100}},
+        {'ilce': 'Kadıköy', 'alan_id': 'k2', 'koordinat': {'lat': 40.995, 'lng': 29.035},
+         'alan_bilgileri': {'kapasite': 50}},
+        {'ilce': 'Üsküdar', 'alan_id': 'u1', 'koordinat': {'lat': 41.030, 'lng': 29.020},
+         'alan_bilgileri': {'kapasite': 80}},
+        {'ilce': 'Üsküdar', 'alan_id': 'u2', 'koordinat': {'lat': 0, 'lng': 0},
+         'alan_bilgileri': {'kapasite': 1000}},
+    ]
+    return EvacuationPlanner(metadata, GeoIndex.from_metadata(metadata), availability)
+
+
+@pytest.mark.parametrize('method', ['greedy', 'exact'])
+def test_plan_reports_overflow_by_district(method):
+    points = [{'id': 'm1', 'lat': 40.991, 'lng': 29.031, 'nufus': 200},
+              {'id': 'm2', 'lat': 41.031, 'lng': 29.021, 'nufus': 60, 'ilce': 'Üsküdar'},
+              {'id': 'm3', 'lat': 0, 'lng': 0, 'nufus': 7, 'ilce': 'Beykoz'}]
+    plan = make_planner().plan(points, method=method, candidates=2, max_distance_m=2000)
+
+    summary = plan['summary']
+    assert summary['people'] == 267
+    assert summary['assigned'] + summary['unassigned'] == summary['people']
+    assert sum(plan['overflow'].values()) == summary['unassigned']
+    # Konumsuz nokta ve konumsuz alan hiçbir atamaya girmez
+    assert plan['overflow']['Beykoz'] == 7
+    assert all(a['alan_id'] != 'u2' for a in plan['areas'])
+    # Kadıköy talebi yakındaki iki alanın toplam kapasitesini aşar
+    assert plan['overflow']['Kadıköy'] == 50
+    assert all(a['assigned'] <= a['capacity'] for a in plan['areas'])
+
+
+def test_plan_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        make_planner().plan([], method='random')
+
+
+def test_closed_areas_get_no_people(tmp_path):
+    from availability import AvailabilityOverlay
+
+    overlay = AvailabilityOverlay(tmp_path / 'availability.bin')
+    overlay.set('kadıköy/k1#0', 'closed')
+    overlay.set('kadıköy/k2#0', occupancy=20)
+    planner = make_planner(overlay)
+
+    assert planner.current_capacities().tolist() == [0, 30, 80, 1000]
+    plan = planner.plan([{'lat': 40.991, 'lng': 29.031, 'nufus': 100}], candidates=3)
+    assert {a['alan_id'] for a in plan['areas']} <= {'k2', 'u1'}
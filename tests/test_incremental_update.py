@@ -0,0 +1,61 @@
+"""Manifest farkı ve artımlı index güncellemesi testleri"""
+
+import pytest
+
+from conftest import HashingModel, make_area, write_areas
+from index_manifest import area_key, build_manifest, diff_manifest, stable_id
+
+# IVF eğitimi için her listeye ~39 vektör düşmeli, 40 alan tek listeli IVF kurar
+AREA_COUNT = 40
+
+
+def district_areas(count=AREA_COUNT):
+    return [make_area(f"kadıköy_{i}", f"Park {i}", mahalle=f"Mahalle {i % 7}",
+                      lat=40.98 + i * 0.001, lng=29.02, kapasite=100 + i)
+            for i in range(count)]
+
+
+def test_diff_manifest_reports_added_changed_removed():
+    old = build_manifest(['a#0', 'b#0', 'c#0'], ['doc a', 'doc b', 'doc c'])
+    new = build_manifest(['a#0', 'b#0', 'd#0'], ['doc a', 'doc b v2', 'doc d'])
+    assert diff_manifest(old, new) == (['d#0'], ['b#0'], ['c#0'])
+    assert diff_manifest(new, new) == ([], [], [])
+    # Id yalnızca anahtardan türetilir, içerik değişse de aynı kalır
+    assert new['b#0']['id'] == old['b#0']['id'] == stable_id('b#0')
+
+
+@pytest.mark.parametrize('index_type', ['flat', 'ivf_flat'])
+def test_incremental_update_applies_edit_delete_add(build_indexer, tmp_path, index_type):
+    areas = district_areas()
+    indexer = build_indexer({'Kadıköy': areas}, index_type=index_type)
+    assert indexer.index.ntotal == AREA_COUNT
+    # IVF index'leri IDMap2 olmadan kendi id'lerini tutar
+    assert type(indexer.index).__name__ == ('IndexIDMap2' if index_type == 'flat' else 'IndexIVFFlat')
+
+    areas[3]['ad'] = 'Yeldeğirmeni Meydanı'
+    removed = areas.pop(5)
+    areas.append(make_area('kadıköy_yeni', 'Fenerbahçe Parkı', mahalle='Fenerbahçe',
+                           lat=40.97, lng=29.04, kapasite=500))
+    write_areas(tmp_path / 'data', {'Kadıköy': areas})
+
+    indexer.update_index_incremental()
+
+    expected_keys = [area_key('Kadıköy', area['id']) for area in areas]
+    assert indexer.index.ntotal == AREA_COUNT
+    assert sorted(indexer.row_ids.tolist()) == sorted(stable_id(key) for key in expected_keys)
+    assert stable_id(area_key('Kadıköy', removed['id'])) not in set(indexer.row_ids.tolist())
+    assert [meta['alan_id'] for meta in indexer.metadata] == [area['id'] for area in areas]
+
+    # Düzenlenen ve eklenen alanların vektörleri yeni dokümanlarından gelir
+    for query, alan_id in (('Yeldeğirmeni Meydanı', 'kadıköy_3'), ('Fenerbahçe Parkı', 'kadıköy_yeni')):
+        results = indexer.search(query, k=1)
+        assert results[0]['metadata']['alan_id'] == alan_id
+
+    # Kaydedilen index yeniden yüklendiğinde aynı id kümesi gelir
+    from faiss_indexer import ToplanmaAlanlariIndexer
+
+    reloaded = ToplanmaAlanlariIndexer(data_dir=str(tmp_path / 'data'), index_dir=str(tmp_path / 'index'),
+                                       model=HashingModel(), index_type=index_type)
+    assert reloaded.load_index()
+    assert reloaded.index.ntotal == AREA_COUNT
+    assert reloaded.row_ids.tolist() == indexer.row_ids.tolist()
@@ -0,0 +1,72 @@
+"""Konumlu aramada benzerlik ve yakınlık sıralaması testleri"""
+
+import pytest
+
+from conftest import make_area
+
+ORIGIN = (41.0, 29.0)
+
+
+@pytest.fixture
+def indexer(build_indexer):
+    return build_indexer({'Kadıköy': [
+        # Sorguya en çok benzeyen alanın koordinatı yok
+        make_area('k0', 'Moda Parkı', mahalle='Moda'),
+        make_area('k1', 'Moda Parkı Girişi', mahalle='Caferağa', lat=41.0009, lng=29.0),
+        make_area('k2', 'Moda Parkı', mahalle='Caferağa', lat=41.045, lng=29.0),
+        make_area('k3', 'Spor Alanı', mahalle='Moda', lat=41.002, lng=29.001),
+        make_area('k4', 'Pazar Yeri', mahalle='Fikirtepe', lat=41.03, lng=29.02),
+    ]})
+
+
+def near(indexer, limit=5, **location):
+    from faiss_search import search_toplanma_alanlari_near
+
+    return search_toplanma_alanlari_near(indexer, 'moda parkı', limit, *ORIGIN, **location)
+
+
+def vector_search(indexer, limit=5, **location):
+    return indexer.search('moda parkı', limit, lat=ORIGIN[0], lng=ORIGIN[1], **location)
+
+
+def ids(results):
+    return [result['metadata']['alan_id'] for result in results]
+
+
+@pytest.mark.parametrize('search', [near, vector_search])
+def test_located_areas_rank_ahead_of_unlocated(indexer, search):
+    results = search(indexer)
+    assert 'k0' in ids(results)
+    distances = [result['distance_m'] for result in results]
+    assert distances.index(None) == len(results) - 1
+    assert all(distance is not None for distance in distances[:-1])
+
+
+@pytest.mark.parametrize('search', [near, vector_search])
+def test_radius_drops_far_and_unlocated_areas(indexer, search):
+    results = search(indexer, radius_m=1000)
+    assert set(ids(results)) == {'k1', 'k3'}
+    assert all(result['distance_m'] <= 1000 for result in results)
+
+
+@pytest.mark.parametrize('search', [near, vector_search])
+def test_small_decay_prefers_nearer_area(indexer, search):
+    # Tam adı taşıyan uzak alan biraz daha benzer, ama 200 m yarılanmada yakın alan öne geçer
+    ranked = ids(search(indexer, decay_m=200))
+    assert ranked.index('k1') < ranked.index('k2')
+
+    ranked = ids(search(indexer, decay_m=1e9))
+    assert ranked.index('k2') < ranked.index('k1')
+
+
+def test_limit_is_respected(indexer):
+    assert len(near(indexer, limit=2)) == 2
+    assert len(near(indexer, limit=4)) == 4
+
+
+def test_located_search_is_cached_per_location(indexer):
+    near(indexer, decay_m=200)
+    near(indexer, decay_m=200)
+    near(indexer, decay_m=1e9)
+    stats = indexer.result_cache.stats()
+    assert (stats['hits'], stats['misses']) == (1, 2)
@@ -0,0 +1,232 @@
+"""İmleç tabanlı sayfalama ve sonuç önbelleği testleri"""
+
+import pytest
+
+import pagination
+import result_cache
+from pagination import CursorPager, decode_cursor, encode_cursor
+from result_cache import ResultCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(pagination.time, 'monotonic', fake)
+    monkeypatch.setattr(result_cache.time, 'monotonic', fake)
+    return fake
+
+
+def make_ranker(total, calls=None):
+    """Derinlik kadar sabit sıralı sonuç döner"""
+    def rank_fn(query, depth, embedding):
+        if calls is not None:
+            calls.append(depth)
+        return [{'document': f"doc-{i}", 'score': 1.0 / (i + 1)} for i in range(min(depth, total))]
+    return rank_fn
+
+
+def fetch_all(pager, query, page_size, total, generation='g1', calls=None):
+    rank_fn = make_ranker(total, calls)
+    page = pager.page(query, page_size, None, generation, rank_fn, lambda q: [0.0], total)
+    pages = [page]
+    while page['next_cursor']:
+        page = pager.page(None, page_size, page['next_cursor'], generation, rank_fn, lambda q: [0.0], total)
+        pages.append(page)
+    return pages
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor('Kadıköy parkları', 30, 'gen-7')
+    assert decode_cursor(cursor) == ('Kadıköy parkları', 30, 'gen-7')
+
+
+@pytest.mark.parametrize('cursor', ['', 'abc', 'abc.def', '!!!.???'])
+def test_malformed_cursor_raises(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_tampered_cursor_raises():
+    payload, signature = encode_cursor('park', 10, 'g1').split('.')
+    forged = pagination._b64encode(b'{"q":"park","o":9990,"g":"g1"}')
+    with pytest.raises(ValueError):
+        decode_cursor(f"{forged}.{signature}")
+    with pytest.raises(ValueError):
+        decode_cursor(f"{payload}.{signature[::-1]}")
+
+
+def test_cursor_signed_with_configured_secret(monkeypatch):
+    cursor = encode_cursor('park', 10, 'g1')
+    monkeypatch.setenv('PAGINATION_SECRET', 'başka-anahtar')
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+    assert decode_cursor(encode_cursor('park', 10, 'g1')) == ('park', 10, 'g1')
+
+
+def test_pages_cover_ranking_without_gaps_or_duplicates(clock):
+    pager = CursorPager(max_sessions=4, ttl_seconds=60)
+    pages = fetch_all(pager, 'park', 7, total=45)
+
+    documents = [r['document'] for page in pages for r in page['results']]
+    assert documents == [f"doc-{i}" for i in range(45)]
+    ranks = [r['rank'] for page in pages for r in page['results']]
+    assert ranks == list(range(1, 46))
+    assert pages[-1]['next_cursor'] is None
+    assert pager.stats()['sessions_created'] == 1
+
+
+def test_deeper_pages_extend_the_session(clock):
+    calls = []
+    pager = CursorPager(max_sessions=4, ttl_seconds=60)
+    fetch_all(pager, 'park', 15, total=100, calls=calls)
+
+    # Derinlik her genişlemede artar, önceki sonuçlar tekrar eklenmez
+    assert calls == sorted(calls) and len(set(calls)) == len(calls)
+    assert pager.stats()['extensions'] == len(calls) - 1
+
+
+def test_cached_pages_do_not_search_again(clock):
+    calls = []
+    pager = CursorPager(max_sessions=4, ttl_seconds=60)
+    rank_fn = make_ranker(100, calls)
+    first = pager.page('park', 5, None, 'g1', rank_fn, lambda q: [0.0], 100)
+    pager.page(None, 5, first['next_cursor'], 'g1', rank_fn, lambda q: [0.0], 100)
+    assert len(calls) == 1
+    assert pager.stats()['cached_pages'] == 1
+
+
+def test_generation_change_expires_cursor(clock):
+    pager = CursorPager(max_sessions=4, ttl_seconds=60)
+    first = pager.page('park', 5, None, 'g1', make_ranker(50), lambda q: [0.0], 50)
+    with pytest.raises(ValueError):
+        pager.page(None, 5, first['next_cursor'], 'g2', make_ranker(50), lambda q: [0.0], 50)
+
+
+def test_expired_session_is_rebuilt_from_cursor(clock):
+    encoded = []
+    pager = CursorPager(max_sessions=4, ttl_seconds=60)
+    encode_fn = lambda q: encoded.append(q) or [0.0]
+    first = pager.page('park', 5, None, 'g1', make_ranker(50), encode_fn, 50)
+
+    clock.now += 61
+    second = pager.page(None, 5, first['next_cursor'], 'g1', make_ranker(50), encode_fn, 50)
+    assert [r['document'] for r in second['results']] == [f"doc-{i}" for i in range(5, 10)]
+    assert encoded == ['park', 'park']
+    assert pager.stats()['sessions_created'] == 2
+
+
+def test_first_page_requires_query():
+    with pytest.raises(ValueError):
+        CursorPager().page(None, 5, None, 'g1', make_ranker(5), lambda q: [0.0], 5)
+
+
+def test_sessions_are_bounded(clock):
+    pager = CursorPager(max_sessions=2, ttl_seconds=60)
+    for query in ('a', 'b', 'c'):
+        pager.page(query, 5, None, 'g1', make_ranker(10), lambda q: [0.0], 10)
+    assert pager.stats()['sessions'] == 2
+
+
+def counting_search(calls):
+    def search_fn(queries):
+        calls.append(list(queries))
+        return [[{'document': query}] for query in queries]
+    return search_fn
+
+
+def test_result_cache_hits_and_batch_dedup(clock):
+    calls = []
+    cache = ResultCache(max_items=10, ttl_seconds=60)
+    search_fn = counting_search(calls)
+
+    first = cache.cached_batch(['park', 'okul', 'park'], 5, search_fn, 'g1')
+    assert calls == [['park', 'okul']]
+    assert first[0] is first[2]
+
+    # Normalize edilmiş aynı sorgu önbellekten gelir
+    cache.cached_batch(['PARK '], 5, search_fn, 'g1')
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (1, 2)
+
+
+def test_result_cache_key_includes_k_and_filters(clock):
+    calls = []
+    cache = ResultCache(max_items=10, ttl_seconds=60)
+    search_fn = counting_search(calls)
+    cache.cached_batch(['park'], 5, search_fn, 'g1')
+    cache.cached_batch(['park'], 10, search_fn, 'g1')
+    cache.cached_batch(['park'], 5, search_fn, 'g1', filters={'wc': True})
+    assert len(calls) == 3
+
+
+def test_result_cache_entries_expire(clock):
+    calls = []
+    cache = ResultCache(max_items=10, ttl_seconds=60)
+    search_fn = counting_search(calls)
+    cache.cached_batch(['park'], 5, search_fn, 'g1')
+    clock.now += 61
+    cache.cached_batch(['park'], 5, search_fn, 'g1')
+    assert len(calls) == 2
+    assert cache.stats()['expired'] == 1
+
+
+def test_result_cache_evicts_least_recently_used(clock):
+    calls = []
+    cache = ResultCache(max_items=2, ttl_seconds=60)
+    search_fn = counting_search(calls)
+    cache.cached_batch(['a'], 5, search_fn, 'g1')
+    cache.cached_batch(['b'], 5, search_fn, 'g1')
+    cache.cached_batch(['a'], 5, search_fn, 'g1')
+    cache.cached_batch(['c'], 5, search_fn, 'g1')
+
+    calls.clear()
+    cache.cached_batch(['a'], 5, search_fn, 'g1')
+    cache.cached_batch(['b'], 5, search_fn, 'g1')
+    assert calls == [['b']]
+    assert cache.stats()['evictions'] >= 1
+
+
+def test_result_cache_generation_change_invalidates(clock):
+    calls = []
+    cache = ResultCache(max_items=10, ttl_seconds=60)
+    search_fn = counting_search(calls)
+    cache.cached_batch(['park'], 5, search_fn, 'g1')
+    cache.cached_batch(['park'], 5, search_fn, 'g2')
+    assert len(calls) == 2
+    assert cache.stats()['invalidations'] == 1
+    assert cache.stats()['items'] == 1
+
+
+def test_disabled_result_cache_always_searches():
+    calls = []
+    cache = ResultCache(max_items=0, ttl_seconds=60)
+    search_fn = counting_search(calls)
+    cache.cached_batch(['park'], 5, search_fn, 'g1')
+    cache.cached_batch(['park'], 5, search_fn, 'g1')
+    assert len(calls) == 2
+
+
+def test_availability_change_expires_indexer_cursors(build_indexer):
+    from conftest import make_area
+
+    indexer = build_indexer({'Kadıköy': [make_area(f"k{i}", f"Moda Parkı {i}") for i in range(6)]})
+    first = indexer.search_page('moda parkı', 2)
+    assert first['next_cursor']
+
+    # Kapanan alan eski oturumdaki sıralamayla servis edilmemeli
+    indexer.availability.set(first['results'][0]['metadata']['area_key'], 'closed')
+    with pytest.raises(ValueError):
+        indexer.search_page(None, 2, first['next_cursor'])
+
+    closed = first['results'][0]['metadata']['alan_id']
+    restarted = indexer.search_page('moda parkı', 6)
+    assert closed not in [result['metadata']['alan_id'] for result in restarted['results']]
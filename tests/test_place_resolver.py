@@ -0,0 +1,90 @@
+"""Bulanık ilçe ve mahalle çözümleyici testleri"""
+
+import pytest
+
+from place_resolver import PlaceResolver, edit_distance, fold_place_name, mahalle_place_id
+
+METADATA = [
+    {'ilce': 'Kadıköy', 'mahalle': 'Moda Mahallesi'},
+    {'ilce': 'Kadıköy', 'mahalle': 'Caferağa Mh.'},
+    {'ilce': 'Ataşehir', 'mahalle': 'İnönü'},
+    {'ilce': 'Beykoz', 'mahalle': 'Anadolu Hisarı'},
+    {'ilce': 'Sultanbeyli', 'mahalle': 'Hasanpaşa'},
+    {'ilce': 'Üsküdar', 'mahalle': 'Kuzguncuk'},
+    {'ilce': 'İstanbul Havalimanı', 'mahalle': ''},
+    {'ilce': 'Sarıyer', 'mahalle': 'Fatih'},
+    {'ilce': 'Fatih', 'mahalle': 'Balat'},
+]
+
+
+@pytest.fixture(scope='module')
+def resolver():
+    return PlaceResolver.from_metadata(METADATA)
+
+
+@pytest.mark.parametrize('query, ilce', [
+    ('Kadıköy toplanma alanı', 'kadıköy'),
+    ('kadikoy park', 'kadıköy'),
+    ('KADIKÖY', 'kadıköy'),
+    ('kadkoy', 'kadıköy'),
+    ('kadıkyö', 'kadıköy'),
+    ("Kadıköy'de park", 'kadıköy'),
+    ('atasehirde toplanma alanı', 'ataşehir'),
+    ('beykoza yakın alan', 'beykoz'),
+    ('uskudardan', 'üsküdar'),
+    ('sultan beyli', 'sultanbeyli'),
+    ('İSTANBUL HAVALİMANI', 'istanbul havalimanı'),
+    ('ıstanbul havalımanı', 'istanbul havalimanı'),
+])
+def test_resolves_district(resolver, query, ilce):
+    assert resolver.resolve(query)['ilce'] == ilce
+
+
+@pytest.mark.parametrize('query', [
+    'su ve wc olan alanlar',
+    'en büyük park',
+    'deprem toplanma alanı nerede',
+    '',
+])
+def test_generic_words_resolve_to_nothing(resolver, query):
+    place = resolver.resolve(query)
+    assert place['ilce'] is None
+    assert place['districts'] == [] and place['mahalleler'] == []
+
+
+def test_mahalle_implies_district(resolver):
+    place = resolver.resolve('moda sahili')
+    assert place['ilce'] == 'kadıköy'
+    assert place['mahalleler'] == ['mahalle:kadıköy/moda']
+
+
+def test_mahalle_suffix_is_stripped(resolver):
+    assert resolver.resolve('caferağa')['mahalleler'] == ['mahalle:kadıköy/caferağa']
+
+
+def test_explicit_district_narrows_shared_names(resolver):
+    # "fatih" hem ilçe hem Sarıyer'de mahalle; ilçe adı öncelikli
+    place = resolver.resolve('fatih balat')
+    assert place['ilce'] == 'fatih'
+    assert 'mahalle:sarıyer/fatih' not in place['mahalleler']
+    assert 'mahalle:fatih/balat' in place['mahalleler']
+
+
+def test_short_words_need_exact_match(resolver):
+    # 4 harfe kadar bulanık eşleşme yapılmaz
+    assert resolver.resolve('mida')['mahalleler'] == []
+
+
+def test_unknown_place(resolver):
+    assert resolver.resolve('Ankara Kızılay')['ilce'] is None
+
+
+def test_helpers():
+    assert fold_place_name("Kadıköy'de") == 'kadikoyde'
+    assert fold_place_name('İNÖNÜ') == 'inonu'
+    assert mahalle_place_id('Kadıköy', 'Moda  Mahallesi') == 'mahalle:kadıköy/moda'
+    assert mahalle_place_id('Kadıköy', 'Park') is None
+    assert edit_distance('kadkoy', 'kadikoy', 2) == 1
+    # Komşu harf yer değiştirmesi tek düzenlemedir
+    assert edit_distance('kadikyo', 'kadikoy', 2) == 1
+    assert edit_distance('abc', 'xyzxyz', 2) == 3
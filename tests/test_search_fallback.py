@@ -0,0 +1,52 @@
+"""Index yokken JSON verisinde yapılan basit arama testleri"""
+
+import os
+import json
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT, make_area, write_areas
+from faiss_search import fallback_search
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    data_dir = tmp_path / 'new_datas'
+    write_areas(data_dir, {
+        'Kadıköy': [make_area('k0', 'Yoğurtçu Parkı', mahalle='Caferağa', toplam_alan=20000),
+                    make_area('k1', 'Fenerbahçe Parkı', mahalle='Fenerbahçe', toplam_alan=5000)],
+        'Üsküdar': [make_area('u0', 'Fethi Paşa Korusu', mahalle='Kuzguncuk', toplam_alan=30000)],
+    })
+    (data_dir / '00_ozet.json').write_text(json.dumps({'toplam': 3}), encoding='utf-8')
+    return data_dir
+
+
+def alan_ids(results):
+    return [result['metadata']['alan_id'] for result in results]
+
+
+def test_fallback_matches_district_mahalle_and_name(data_dir):
+    assert alan_ids(fallback_search("kadikoyde toplanma alanı", data_dir=data_dir)) == ['k0', 'k1']
+    # Mahalle eşleşmesi ilçedeki diğer alanların önüne geçer
+    assert alan_ids(fallback_search('kadıköy fenerbahçe', data_dir=data_dir)) == ['k1', 'k0']
+    assert alan_ids(fallback_search('fethi paşa korusu', data_dir=data_dir)) == ['u0']
+    assert fallback_search('toplanma alanı', data_dir=data_dir) == []
+
+
+def test_fallback_applies_limit_and_filters(data_dir):
+    results = fallback_search('kadıköy', limit=1, data_dir=data_dir)
+    assert alan_ids(results) == ['k0']
+    assert results[0]['rank'] == 1
+    assert alan_ids(fallback_search('kadıköy', filters={'min_alan': 10000}, data_dir=data_dir)) == ['k0']
+
+
+def test_cli_without_index_falls_back_to_json(data_dir, tmp_path):
+    env = dict(os.environ)
+    env['REACH_SEARCH_SOCKET'] = str(tmp_path / 'yok.sock')
+    result = subprocess.run([sys.executable, str(ROOT / 'faiss_search.py'), 'üsküdar', '--fields', 'name'],
+                            cwd=tmp_path, env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout) == [{'metadata': {'alan_adi': 'Fethi Paşa Korusu'}}]
+    assert 'FAISS index' in result.stderr
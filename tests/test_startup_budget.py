@@ -0,0 +1,47 @@
+"""
+Soğuk başlangıç regresyon testi: index yokken arama script'leri bütçe içinde
+(STARTUP_BUDGET_MS, varsayılan 1500 ms) boş sonuç dönmeli ve ağır modülleri
+(faiss, torch, sentence_transformers) hiç import etmemeli.
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+from conftest import ROOT
+
+BUDGET_MS = float(os.environ.get('STARTUP_BUDGET_MS', 1500))
+
+HEAVY_MODULES = ('faiss', 'torch', 'sentence_transformers')
+
+
+def run_script(script, tmp_path):
+    env = dict(os.environ)
+    # Çalışan bir arama sunucusuna bağlanılmamalı, index de bulunmamalı (cwd boş dizin)
+    env['REACH_SEARCH_SOCKET'] = str(tmp_path / 'yok.sock')
+    return subprocess.run(
+        [sys.executable, str(ROOT / script), 'kanama', '--profile-startup', '--startup-budget-ms', str(BUDGET_MS)],
+        cwd=tmp_path, env=env, capture_output=True, text=True, timeout=60
+    )
+
+
+def startup_report(stderr):
+    for line in stderr.splitlines():
+        if line.startswith('{') and 'startup_profile' in line:
+            return json.loads(line)['startup_profile']
+    raise AssertionError(f"Profil raporu bulunamadı:\n{stderr}")
+
+
+@pytest.mark.parametrize('script', ['faiss_search.py', 'ilkyardim_search.py'])
+def test_no_index_cold_start_within_budget(script, tmp_path):
+    result = run_script(script, tmp_path)
+    report = startup_report(result.stderr)
+
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout) == []
+    assert report['total_ms'] < BUDGET_MS
+    loaded = set(report['loaded_modules'])
+    assert not loaded & set(HEAVY_MODULES), f"Index yokken ağır modül yüklendi: {sorted(loaded)}"
@@ -0,0 +1,119 @@
+"""Ön ek ağacı ile otomatik tamamlama testleri"""
+
+import random
+
+import pytest
+
+from turkish_text import ascii_fold, normalize_query
+from typeahead import PrefixTrie, suggestion_keys, suggestions_from_metadata
+
+NAMES = ['Kadıköy Parkı', 'Kadirli Meydanı', 'Kadıköy Spor Alanı', 'İnönü Stadı', 'Işık Parkı',
+         'Şeker Parkı', 'Çamlıca Korusu', 'Kartal Sahil', 'Karaköy Meydanı', 'Ümraniye Pazar Yeri']
+
+
+def make_suggestions(names):
+    return [{'text': name, 'type': 'alan', 'toplam_alan': float(1000 + 37 * i % 11 * 100)}
+            for i, name in enumerate(names)]
+
+
+def brute_force(suggestions, prefix, limit):
+    """Tüm anahtarları tarayan referans gerçekleme"""
+    key = normalize_query(prefix)
+    matching = [i for i, s in enumerate(suggestions)
+                if any(k.startswith(key) for k in suggestion_keys(s['text']))]
+    if not matching:
+        key = ascii_fold(key)
+        matching = [i for i, s in enumerate(suggestions)
+                    if any(k.startswith(key) for k in suggestion_keys(s['text']))]
+    matching.sort(key=lambda i: (-suggestions[i]['toplam_alan'], suggestions[i]['text'], i))
+    return [suggestions[i]['text'] for i in matching[:limit]]
+
+
+def texts(results):
+    return [r['text'] for r in results]
+
+
+@pytest.fixture
+def trie():
+    return PrefixTrie(top_n=10).build(make_suggestions(NAMES))
+
+
+def test_prefix_matches_word_starts(trie):
+    assert set(texts(trie.complete('parkı', 10))) == {'Kadıköy Parkı', 'Işık Parkı', 'Şeker Parkı'}
+    assert texts(trie.complete('meydan', 10)) and all('Meydanı' in t for t in texts(trie.complete('meydan', 10)))
+
+
+def test_turkish_case_and_ascii_folding(trie):
+    expected = texts(trie.complete('kadı', 10))
+    assert expected and set(expected) <= {'Kadıköy Parkı', 'Kadıköy Spor Alanı'}
+    assert texts(trie.complete('KADI', 10)) == expected
+    assert texts(trie.complete('inönü', 10)) == texts(trie.complete('İNÖNÜ', 10)) == ['İnönü Stadı']
+    assert texts(trie.complete('inonu', 10)) == ['İnönü Stadı']
+    # ASCII "kadi" hem Kadıköy hem Kadirli ile eşleşir
+    assert set(texts(trie.complete('kadi', 10))) == {'Kadıköy Parkı', 'Kadıköy Spor Alanı', 'Kadirli Meydanı'}
+
+
+def test_results_ordered_by_area_size():
+    suggestions = [{'text': 'Park A', 'type': 'alan', 'toplam_alan': 10.0},
+                   {'text': 'Park B', 'type': 'alan', 'toplam_alan': 30.0},
+                   {'text': 'Park C', 'type': 'alan', 'toplam_alan': 20.0}]
+    results = PrefixTrie(top_n=5).build(suggestions).complete('park', 5)
+    assert texts(results) == ['Park B', 'Park C', 'Park A']
+    assert [r['rank'] for r in results] == [1, 2, 3]
+
+
+def test_unknown_and_empty_prefix(trie):
+    assert trie.complete('xyz', 5) == []
+    assert trie.complete('   ', 5) == []
+
+
+def test_matches_brute_force_on_random_names():
+    rng = random.Random(3)
+    alphabet = 'abcçıişöüğ'
+    names = [' '.join(''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 5)))
+                      for _ in range(rng.randint(1, 3))) for _ in range(300)]
+    suggestions = [{'text': name, 'type': 'alan', 'toplam_alan': float(rng.randint(0, 50))}
+                   for name in names]
+    trie = PrefixTrie(top_n=8).build(suggestions)
+
+    prefixes = [name[:n] for name in names[:100] for n in (1, 2, 3)] + ['ci', 'si', 'ou', 'zz']
+    for prefix in prefixes:
+        assert texts(trie.complete(prefix, 8)) == brute_force(suggestions, prefix, 8), prefix
+
+
+def test_limit_above_top_n_is_rejected(trie):
+    assert len(trie.complete('k', 10)) <= 10
+    with pytest.raises(ValueError):
+        trie.complete('k', 11)
+
+
+def test_top_n_from_environment(monkeypatch):
+    monkeypatch.setenv('TYPEAHEAD_TOP_N', '3')
+    trie = PrefixTrie().build(make_suggestions(NAMES))
+    assert len(trie.complete('k', 3)) == 3
+    with pytest.raises(ValueError):
+        trie.complete('k', 4)
+
+
+def test_suggestions_from_metadata_aggregates_mahalle_and_ilce():
+    metadata = [
+        {'ilce': 'Kadıköy', 'mahalle': 'Moda', 'alan_adi': 'Moda Parkı', 'alan_id': 'k1',
+         'alan_bilgileri': {'toplam_alan': 100}},
+        {'ilce': 'Kadıköy', 'mahalle': 'MODA', 'alan_adi': 'Moda Sahil', 'alan_id': 'k2',
+         'alan_bilgileri': {'toplam_alan': '250'}},
+        {'ilce': 'Kadıköy', 'mahalle': '', 'alan_adi': '', 'alan_id': 'k3',
+         'alan_bilgileri': {'toplam_alan': None}},
+    ]
+    suggestions = suggestions_from_metadata(metadata)
+    by_type = {}
+    for suggestion in suggestions:
+        by_type.setdefault(suggestion['type'], []).append(suggestion)
+
+    assert sorted(s['text'] for s in by_type['alan']) == ['Moda Parkı', 'Moda Sahil']
+    assert len(by_type['mahalle']) == 1
+    assert by_type['mahalle'][0]['toplam_alan'] == 350.0
+    assert by_type['mahalle'][0]['alan_sayisi'] == 2
+    assert by_type['ilce'][0]['alan_sayisi'] == 3
+
+    trie = PrefixTrie(top_n=5).build(suggestions)
+    assert texts(trie.complete('moda', 5))[0] == 'Moda'
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Türkçe Metin Yardımcıları
+Arama anahtarları için İ/ı farkını doğru işleyen küçük harf ve normalizasyon fonksiyonları.
+"""
+
+import unicodedata
+
+# str.lower() 'I' -> 'i' ve 'İ' -> 'i̇' (birleşik nokta) üretir, Türkçe için düzeltilir
+_TURKISH_UPPER_MAP = str.maketrans({'I': 'ı', 'İ': 'i'})
+
+# Türkçe karakterlerin ASCII karşılıkları (kullanıcılar çoğunlukla şapkasız yazar)
+_ASCII_FOLD = str.maketrans('çğıöşüâîû', 'cgiosuaiu')
+
+
+def turkish_lower(text: str) -> str:
+    """Türkçe kurallarına göre küçük harfe çevirir"""
+    return unicodedata.normalize('NFC', text).translate(_TURKISH_UPPER_MAP).lower()
+
+
+def normalize_query(query: str) -> str:
+    """Sorguyu önbellek anahtarı için normalize eder (küçük harf, tek boşluk)"""
+    return ' '.join(turkish_lower(query).split())
+
+
+def ascii_fold(text: str) -> str:
+    """Küçük harfli Türkçe metni ASCII karşılığına çevirir (kadıköy -> kadikoy)"""
+    return text.translate(_ASCII_FOLD)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Ön Ek Ağacı ile Otomatik Tamamlama
+Toplanma alanı adları (ad), mahalle ve ilçe adları üzerinde sıkıştırılmış (radix)
+ön ek ağacı kurar. Anahtarlar Türkçe küçük harfe (İ/ı doğru) ve ASCII karşılığına
+çevrilerek eklenir; "kadı", "KADI" ve "kadi" aynı önerileri döner. Her düğümde alan
+büyüklüğüne (toplam_alan) göre en iyi N öneri önceden hesaplanır, böylece sorgu
+sadece ön ek uzunluğu kadar adım yürür.
+
+Mahalle ve ilçe önerilerinin ağırlığı içlerindeki alanların toplam büyüklüğüdür.
+Çok kelimeli adlar her kelimenin başından da bulunur ("parkı" -> "Şeker Parkı").
+TYPEAHEAD_TOP_N (varsayılan 10) düğüm başına saklanan öneri sayısı ve tek istekte
+istenebilecek en fazla öneridir.
+"""
+
+import os
+import heapq
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from turkish_text import ascii_fold, normalize_query
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_N = 10
+
+
+def suggestion_keys(text: str) -> List[str]:
+    """Bir ad için ağaca eklenecek anahtarlar (Türkçe ve ASCII, her kelime başından)"""
+    words = normalize_query(text).split()
+    keys = []
+    for start in range(len(words)):
+        key = ' '.join(words[start:])
+        keys.append(key)
+        folded = ascii_fold(key)
+        if folded != key:
+            keys.append(folded)
+    return keys
+
+
+class _Node:
+    __slots__ = ('children', 'entries', 'top')
+
+    def __init__(self):
+        # İlk karakter -> (kenar etiketi, alt düğüm)
+        self.children: Dict[str, Tuple[str, "_Node"]] = {}
+        # Anahtarı tam bu düğümde biten öneriler
+        self.entries: List[int] = []
+        # Bu düğümün altındaki en iyi N öneri (ağırlığa göre sıralı)
+        self.top: List[int] = []
+
+
+class PrefixTrie:
+    def __init__(self, top_n: Optional[int] = None):
+        self.top_n = top_n if top_n is not None else int(os.environ.get('TYPEAHEAD_TOP_N', DEFAULT_TOP_N))
+        self.root = _Node()
+        self.suggestions: List[Dict[str, Any]] = []
+        self.node_count = 1
+        self.key_count = 0
+
+    def _insert(self, key: str, entry: int):
+        node = self.root
+        while key:
+            edge = node.children.get(key[0])
+            if edge is None:
+                leaf = _Node()
+                node.children[key[0]] = (key, leaf)
+                self.node_count += 1
+                node = leaf
+                break
+
+            label, child = edge
+            common = 0
+            limit = min(len(label), len(key))
+            while common < limit and label[common] == key[common]:
+                common += 1
+
+            if common < len(label):
+                # Kenarı ortak ön ekte böl
+                middle = _Node()
+                middle.children[label[common]] = (label[common:], child)
+                node.children[key[0]] = (label[:common], middle)
+                self.node_count += 1
+                child = middle
+
+            node = child
+            key = key[common:]
+
+        node.entries.append(entry)
+        self.key_count += 1
+
+    def _rank_key(self, entry: int) -> Tuple[float, str, int]:
+        suggestion = self.suggestions[entry]
+        return (-suggestion['toplam_alan'], suggestion['text'], entry)
+
+    def _compute_top(self, node: _Node) -> List[int]:
+        """Alt ağaçlardaki en iyi önerileri yukarı taşır (iteratif, derin ağaçta yığın taşmaz)"""
+        stack = [(node, False)]
+        while stack:
+            current, expanded = stack.pop()
+            if not expanded:
+                stack.append((current, True))
+                stack.extend((child, False) for _, child in current.children.values())
+                continue
+
+            candidates = set(current.entries)
+            for _, child in current.children.values():
+                candidates.update(child.top)
+            current.top = heapq.nsmallest(self.top_n, candidates, key=self._rank_key)
+        return node.top
+
+    def build(self, suggestions: Sequence[Dict[str, Any]]) -> "PrefixTrie":
+        """suggestions: {'text', 'type', 'toplam_alan', ...} kayıtları"""
+        self.suggestions = list(suggestions)
+        for entry, suggestion in enumerate(self.suggestions):
+            for key in dict.fromkeys(suggestion_keys(suggestion['text'])):
+                self._insert(key, entry)
+        self._compute_top(self.root)
+
+        logger.info(f"Otomatik tamamlama ağacı: {len(self.suggestions)} öneri, "
+                    f"{self.key_count} anahtar, {self.node_count} düğüm")
+        return self
+
+    def _find(self, prefix: str) -> Optional[_Node]:
+        node = self.root
+        while prefix:
+            edge = node.children.get(prefix[0])
+            if edge is None:
+                return None
+            label, child = edge
+            if len(prefix) <= len(label):
+                # Ön ek kenarın ortasında bitebilir, o zaman alt düğümün önerileri geçerli
+                return child if label.startswith(prefix) else None
+            if not prefix.startswith(label):
+                return None
+            node = child
+            prefix = prefix[len(label):]
+        return node
+
+    def complete(self, prefix: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Ön eke uyan en büyük alanlı önerileri döner; limit top_n'i aşarsa ValueError"""
+        limit = int(limit)
+        if limit > self.top_n:
+            # Düğümlerde sadece top_n öneri saklanır, fazlası sessizce kesilmemeli
+            raise ValueError(f"Öneri sayısı en fazla {self.top_n} olabilir (TYPEAHEAD_TOP_N)")
+
+        key = normalize_query(prefix)
+        if not key:
+            return []
+
+        # Kullanıcı Türkçe karakterle yazdıysa Türkçe anahtar, yoksa ASCII anahtar eşleşir
+        node = self._find(key)
+        if node is None:
+            node = self._find(ascii_fold(key))
+        if node is None:
+            return []
+
+        return [{'rank': i + 1, **self.suggestions[entry]}
+                for i, entry in enumerate(node.top[:max(0, limit)])]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'suggestions': len(self.suggestions),
+            'keys': self.key_count,
+            'nodes': self.node_count,
+            'top_n': self.top_n
+        }
+
+
+def _area_size(meta: Dict[str, Any]) -> float:
+    try:
+        return float((meta.get('alan_bilgileri') or {}).get('toplam_alan', 0) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def suggestions_from_metadata(metadata: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Alan kayıtlarından alan, mahalle ve ilçe önerileri üretir"""
+    suggestions = []
+    mahalleler: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    ilceler: Dict[str, Dict[str, Any]] = {}
+
+    for meta in metadata:
+        ilce = meta.get('ilce', '') or ''
+        mahalle = (meta.get('mahalle', '') or '').strip()
+        size = _area_size(meta)
+
+        if (meta.get('alan_adi') or '').strip():
+            suggestions.append({
+                'text': meta['alan_adi'].strip(),
+                'type': 'alan',
+                'ilce': ilce,
+                'mahalle': mahalle,
+                'alan_id': meta.get('alan_id', ''),
+                'toplam_alan': size
+            })
+
+        if mahalle:
+            key = (normalize_query(ilce), normalize_query(mahalle))
+            entry = mahalleler.setdefault(key, {'text': mahalle, 'type': 'mahalle', 'ilce': ilce,
+                                                'toplam_alan': 0.0, 'alan_sayisi': 0})
+            entry['toplam_alan'] += size
+            entry['alan_sayisi'] += 1
+
+        if ilce:
+            entry = ilceler.setdefault(normalize_query(ilce), {'text': ilce, 'type': 'ilce',
+                                                               'toplam_alan': 0.0, 'alan_sayisi': 0})
+            entry['toplam_alan'] += size
+            entry['alan_sayisi'] += 1
+
+    return suggestions + list(mahalleler.values()) + list(ilceler.values())
@@ -0,0 +1,549 @@
+#!/usr/bin/env python3
+"""
+Çok Koleksiyonlu Vektör Deposu
+Toplanma alanı, ilkyardım (ve ileride hastane) index'lerinin ortak tabanı.
+Tek bir SharedEncoder modeli ve sorgu embedding önbelleğini tutar; her koleksiyon
+(VectorCollection) kendi FAISS index'ini, kayıt depolarını, model yokken kullanılan
+hash'lenmiş TF-IDF vektörleştiricisini ve sıralanmış sonuç önbelleğini yönetir.
+VectorStore koleksiyonları adla kaydeder ve aynı sorguları bir kez encode ederek
+birden çok koleksiyonda arar.
+"""
+
+import os
+import time
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from embedding_model import MODEL_NAME, load_sentence_model, model_id
+from embedding_cache import EmbeddingCache
+from embedding_pipeline import DEFAULT_CHUNK_SIZE, default_workers, encode_stream
+from hashing_vectorizer import HashingTfidfVectorizer
+from index_types import (configure_search, create_index, enable_reconstruct, get_index_type,
+                         index_type_of, train_index, training_size)
+from record_store import RecordStore, compact_record, expand_record, migrate_pickle, store_exists
+from result_cache import ResultCache
+from pagination import CursorPager
+
+logger = logging.getLogger(__name__)
+
+
+class SharedEncoder:
+    """Koleksiyonlar arasında paylaşılan model ve sorgu embedding önbelleği"""
+
+    def __init__(self, index_dir: str = "faiss_index", model: Any = None, model_name: str = MODEL_NAME):
+        self.index_dir = Path(index_dir)
+
+        # Model ilk kullanımda yüklenir (torch import'u index yoksa hiç yapılmaz)
+        self._model = model
+        self._model_loaded = model is not None
+
+        # Modelin yüklendiği ad/yol; dışarıdan verilen modelde None (süreç havuzunda yeniden yüklenemez)
+        self.model_name = None if model is not None else model_name
+
+        # Sorgu embedding önbelleği (bellekte LRU, diskte faiss_index/query_embeddings.sqlite)
+        self._embedding_cache = None
+
+    @property
+    def model(self) -> Optional[Any]:
+        if not self._model_loaded:
+            self._model = load_sentence_model(self.model_name)
+            self._model_loaded = True
+        return self._model
+
+    @property
+    def embedding_cache(self) -> Optional[EmbeddingCache]:
+        if self._embedding_cache is None and self.model is not None:
+            self._embedding_cache = EmbeddingCache(self.index_dir / "query_embeddings.sqlite", model_id(self.model))
+        return self._embedding_cache
+
+    def encode_queries(self, queries: List[str]) -> Optional[np.ndarray]:
+        """Sorguları önbellek üzerinden encode eder (model yoksa None)"""
+        if self.model is None:
+            return None
+        # Eksik sorgular tek seferde encode edilir
+        return np.asarray(self.embedding_cache.encode(list(queries), self.model.encode), dtype='float32')
+
+
+class TrainingSpool:
+    """
+    Eğitim isteyen index tipleri için akışlı kurulumda vektörleri geçici bir diske eşlenmiş
+    dosyada tutar ve tüm akış üzerinden rezervuar örneklemesiyle eğitim örneği seçer
+    (veri ilçeye göre sıralı geldiğinden ilk parçalar tüm veriyi temsil etmez).
+    """
+
+    def __init__(self, directory: Path, total: int, dimension: int, sample_size: int, seed: int = 0):
+        self.path = Path(directory) / f".training_spool_{os.getpid()}.f32"
+        self.vectors = np.memmap(self.path, dtype='float32', mode='w+', shape=(max(total, 1), dimension))
+        self.count = 0
+        self.sample_size = max(1, sample_size)
+        self.reservoir = np.empty((min(self.sample_size, max(total, 1)), dimension), dtype='float32')
+        self.rng = np.random.default_rng(seed)
+
+    def append(self, embeddings: np.ndarray):
+        embeddings = np.asarray(embeddings, dtype='float32')
+        positions = np.arange(self.count, self.count + len(embeddings))
+        self.vectors[positions[0]:positions[-1] + 1] = embeddings
+
+        # Rezervuar dolana kadar doğrudan, sonra t. vektör sample_size / (t + 1) olasılıkla girer
+        fill = positions < len(self.reservoir)
+        self.reservoir[positions[fill]] = embeddings[fill]
+        rest = np.flatnonzero(~fill)
+        if len(rest):
+            slots = self.rng.integers(0, positions[rest] + 1)
+            chosen = slots < len(self.reservoir)
+            self.reservoir[slots[chosen]] = embeddings[rest[chosen]]
+        self.count += len(embeddings)
+
+    def sample(self) -> np.ndarray:
+        return self.reservoir[:min(self.count, len(self.reservoir))]
+
+    def chunks(self, size: int):
+        """(başlangıç, vektörler) parçalarını akış sırasıyla döner"""
+        for start in range(0, self.count, size):
+            yield start, np.ascontiguousarray(self.vectors[start:min(start + size, self.count)])
+
+    def __enter__(self) -> "TrainingSpool":
+        return self
+
+    def __exit__(self, *exc_info):
+        del self.vectors
+        self.path.unlink(missing_ok=True)
+
+
+class VectorCollection:
+    """Tek bir FAISS index'i ve kayıt depoları; alt sınıflar veri hazırlığını tanımlar"""
+
+    # Koleksiyon adı ve dosya adları (alt sınıflarda tanımlanır)
+    name = 'collection'
+    index_file_name = 'collection.index'
+    file_prefix = ''
+
+    # full_data alanlarının metadata karşılıkları (diskte full_data tekrar saklanmaz)
+    full_data_fields: Dict[str, str] = {}
+
+    def __init__(self, index_dir: str = "faiss_index", model: Any = None, index_type: Optional[str] = None,
+                 encoder: Optional[SharedEncoder] = None):
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(exist_ok=True)
+
+        # Model ve sorgu önbelleği VectorStore'daki tüm koleksiyonlarla paylaşılır
+        self.encoder = encoder or SharedEncoder(index_dir, model)
+
+        # FAISS index (tip: flat, ivf_flat, ivf_pq, hnsw, sq8; varsayılan FAISS_INDEX_TYPE)
+        self.index_type = get_index_type(index_type)
+        self.index = None
+        self.documents = []
+        self.metadata = []
+
+        # Satır -> FAISS id eşlemesi (ID'li index'lerde); None ise id == satır
+        self.row_ids: Optional[np.ndarray] = None
+        self._id_to_row: Dict[int, int] = {}
+
+        # Model yokken kullanılan hash'lenmiş TF-IDF vektörleştirici (IDF koleksiyona özgüdür)
+        self.vectorizer: Optional[HashingTfidfVectorizer] = None
+
+        # Sıralanmış sonuç önbelleği (anahtar index neslini içerir)
+        self.result_cache = ResultCache()
+        self._generation_state: Tuple[Optional[int], Optional[str]] = (None, None)
+
+        # İmleçli sayfalama oturumları (aday listesi ve sorgu vektörü)
+        self.pager = CursorPager()
+
+        # Index dosya yolları
+        self.index_file = self.index_dir / self.index_file_name
+        self.ids_file = self.index_dir / f"{self.file_prefix}ids.npy"
+        self.vectorizer_file = self.index_dir / f"{self.file_prefix}hashing_idf.npz"
+        self.documents_store = self.index_dir / f"{self.file_prefix}documents"
+        self.metadata_store = self.index_dir / f"{self.file_prefix}metadata"
+        self.generation_file = self.index_dir / f"{self.file_prefix}generation"
+
+        # Eski pickle dosyaları (migrate_pickles ile dönüştürülür)
+        self.documents_file = self.index_dir / f"{self.file_prefix}documents.pkl"
+        self.metadata_file = self.index_dir / f"{self.file_prefix}metadata.pkl"
+
+    @property
+    def model(self) -> Optional[Any]:
+        return self.encoder.model
+
+    @property
+    def embedding_cache(self) -> Optional[EmbeddingCache]:
+        return self.encoder.embedding_cache
+
+    def create_embeddings(self, documents: List[str]) -> np.ndarray:
+        """Dokümanlardan embedding'ler oluşturur"""
+        logger.info("Embedding'ler oluşturuluyor...")
+
+        if self.model is not None:
+            embeddings = self.model.encode(documents, show_progress_bar=True)
+        else:
+            embeddings = self.create_simple_embeddings(documents)
+
+        logger.info(f"Embedding boyutu: {embeddings.shape}")
+        return embeddings
+
+    def create_simple_embeddings(self, documents: List[str]) -> np.ndarray:
+        """Model yokken sabit boyutlu hash'lenmiş TF-IDF embedding'i oluşturur"""
+        # İlk çağrı (index kurulumu) IDF'i öğrenir, sorgular aynı vektörleştiriciyi kullanır
+        if self.vectorizer is None:
+            self.vectorizer = HashingTfidfVectorizer().fit(documents)
+        return self.vectorizer.transform(documents)
+
+    def build_index(self, embeddings: np.ndarray, ids: Optional[np.ndarray] = None):
+        """FAISS index oluşturur (ids verilmezse id == satır)"""
+        logger.info("FAISS index oluşturuluyor...")
+
+        # FAISS index oluştur (L2 distance için, artımlı güncelleme için id eşlemeli)
+        embeddings = embeddings.astype('float32')
+        self.index = create_index(self.index_type, embeddings.shape[1], len(embeddings))
+        train_index(self.index, embeddings)
+        enable_reconstruct(self.index)
+        configure_search(self.index)
+
+        # Embedding'leri kararlı id'leriyle index'e ekle
+        add_ids = np.arange(len(embeddings), dtype='int64') if ids is None else np.asarray(ids, dtype='int64')
+        self.index.add_with_ids(embeddings, add_ids)
+        self.set_row_ids(ids)
+
+        logger.info(f"Index oluşturuldu: {self.index.ntotal} vektör")
+
+    def build_index_streaming(self, documents: Iterable[str], ids: np.ndarray,
+                              chunk_size: int = DEFAULT_CHUNK_SIZE, workers: Optional[int] = None):
+        """Dokümanları parça parça encode edip index'e ekler (tüm embedding matrisi bellekte tutulmaz)"""
+        total = len(ids)
+        workers = workers or default_workers(total, chunk_size)
+
+        # Worker'lar modeli koleksiyonun yüklediği ad/yoldan yükler ve aynı model olduğunu doğrular;
+        # dışarıdan verilen model (veya özel encoder) kopyalanamadığından tek süreçte kullanılır
+        model_name = self.encoder.model_name
+        if model_name is None and workers > 1:
+            logger.info("Dışarıdan verilen model süreç havuzunda yüklenemez, tek süreçte encode edilecek")
+            workers = 1
+        logger.info(f"FAISS index akışlı oluşturuluyor: {total} doküman, {workers} worker")
+        encode_fn = lambda chunk: self.model.encode(chunk, show_progress_bar=False)
+        stream = encode_stream(documents, encode_fn=encode_fn, model_name=model_name or MODEL_NAME,
+                               expected_model_id=model_id(self.model), chunk_size=chunk_size,
+                               workers=workers, total=total)
+
+        self.index = None
+        spool = None
+        offset = 0
+        for embeddings in stream:
+            if self.index is None:
+                self.index = create_index(self.index_type, embeddings.shape[1], total)
+                if not self.index.is_trained:
+                    spool = TrainingSpool(self.index_dir, total, embeddings.shape[1],
+                                          training_size(self.index_type, total))
+
+            # Eğitim isteyen tiplerde vektörler diske yazılır, eğitim örneği tüm akıştan seçilir
+            if spool is not None:
+                spool.append(embeddings)
+                continue
+            self.index.add_with_ids(embeddings, ids[offset:offset + len(embeddings)])
+            offset += len(embeddings)
+
+        if spool is not None:
+            with spool:
+                train_index(self.index, spool.sample())
+                for start, embeddings in spool.chunks(chunk_size):
+                    self.index.add_with_ids(embeddings, ids[start:start + len(embeddings)])
+
+        enable_reconstruct(self.index)
+        configure_search(self.index)
+        self.set_row_ids(ids)
+
+        logger.info(f"Index oluşturuldu: {self.index.ntotal} vektör")
+
+    def set_row_ids(self, ids: Optional[np.ndarray]):
+        """Satır -> FAISS id eşlemesini ayarlar"""
+        self.row_ids = None if ids is None else np.asarray(ids, dtype='int64')
+        self._id_to_row = {} if ids is None else {int(i): row for row, i in enumerate(self.row_ids)}
+
+    def _ids_to_rows(self, ids: np.ndarray) -> List[int]:
+        """FAISS'in döndürdüğü id'leri metadata satırlarına çevirir (bulunamayan: -1)"""
+        if self.row_ids is None:
+            return [int(i) for i in ids]
+        return [self._id_to_row.get(int(i), -1) for i in ids]
+
+    def _row_embeddings(self) -> np.ndarray:
+        """Tüm satırların vektörlerini satır sırasıyla index'ten geri okur"""
+        if self.row_ids is None:
+            return self.index.reconstruct_n(0, self.index.ntotal)
+        return np.vstack([self.index.reconstruct(int(i)) for i in self.row_ids])
+
+    def save_index(self):
+        """Index'i, id eşlemesini, vektörleştiriciyi ve kayıt depolarını kaydeder"""
+        import faiss
+
+        logger.info(f"Index kaydediliyor ({self.name})...")
+
+        # FAISS index'i kaydet
+        faiss.write_index(self.index, str(self.index_file))
+
+        # Satır -> id eşlemesi (id == satır ise dosya tutulmaz)
+        if self.row_ids is not None:
+            np.save(self.ids_file, self.row_ids)
+        elif self.ids_file.exists():
+            self.ids_file.unlink()
+
+        # Model yokken kurulan index'in IDF'i (model ile kurulduysa eskisi silinir)
+        if self.vectorizer is not None and self.vectorizer.dimension == self.index.d:
+            self.vectorizer.save(self.vectorizer_file)
+        elif self.vectorizer_file.exists():
+            self.vectorizer_file.unlink()
+
+        # Dokümanları ve metadata'yı mmap kayıt depolarına yaz
+        RecordStore.write(self.documents_store, self.documents)
+        RecordStore.write(self.metadata_store,
+                          (compact_record(meta, self.full_data_fields) for meta in self.metadata))
+
+        # Koleksiyona özgü yardımcı yapılar
+        self._save_extras()
+
+        # Nesil dosyası en son yazılır; değişmesi tüm dosyaların yazıldığını gösterir
+        self.write_generation()
+
+        logger.info("Index başarıyla kaydedildi")
+
+    def _save_extras(self):
+        """Alt sınıfların ek dosyaları (BM25, alt index'ler vb.) için"""
+
+    def write_generation(self) -> str:
+        """Yeni index nesli (sürüm hash'i) yazar; eski sonuç önbelleği girdileri geçersizleşir"""
+        raw = f"{self.name}:{time.time_ns()}:{os.getpid()}:{self.index.ntotal}"
+        generation = hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+        tmp_file = self.generation_file.with_name(self.generation_file.name + ".tmp")
+        tmp_file.write_text(generation, encoding='utf-8')
+        os.replace(tmp_file, self.generation_file)
+        return generation
+
+    def current_generation(self) -> str:
+        """Diskteki index neslini döner (dosya sadece mtime değiştiğinde yeniden okunur)"""
+        try:
+            mtime = self.generation_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            # Nesil dosyası olmayan eski index'lerde index dosyasının mtime'ı kullanılır
+            try:
+                return f"mtime-{self.index_file.stat().st_mtime_ns}"
+            except FileNotFoundError:
+                return "none"
+
+        cached_mtime, generation = self._generation_state
+        if cached_mtime != mtime:
+            generation = self.generation_file.read_text(encoding='utf-8').strip()
+            self._generation_state = (mtime, generation)
+        return generation
+
+    def cached_search(self, queries: List[str], k: int, search_fn: Callable[[List[str]], List[Any]],
+                      filters: Optional[Dict[str, Any]] = None) -> List[Any]:
+        """search_fn sonuçlarını (sorgu, k, filtreler, index nesli) anahtarıyla önbellekler"""
+        return self.result_cache.cached_batch(queries, k, search_fn, self.cache_generation(), filters)
+
+    def cache_generation(self) -> str:
+        """Sonuç önbelleği anahtarındaki nesil (alt sınıflar index dışı durumları ekleyebilir)"""
+        return self.current_generation()
+
+    def search_page(self, query: Optional[str], page_size: int = 5, cursor: Optional[str] = None,
+                    rank_fn: Optional[Callable[[str, int, Any], List[Dict[str, Any]]]] = None) -> Dict[str, Any]:
+        """İmleçli sayfalı arama; rank_fn(sorgu, derinlik, sorgu vektörü) sıralı sonuçları döner"""
+        if self.index is None:
+            raise ValueError(f"Index yüklenmemiş ({self.name})")
+
+        if rank_fn is None:
+            rank_fn = lambda text, depth, embedding: self.search_batch([text], depth, query_embeddings=embedding)[0]
+        # Nesil sonuç önbelleğindekiyle aynıdır; canlı durum değişikliği de oturumu ve imleçleri geçersiz kılar
+        return self.pager.page(query, page_size, cursor, self.cache_generation(), rank_fn,
+                               lambda text: self._encode_queries([text]), int(self.index.ntotal))
+
+    def load_index(self) -> bool:
+        """Index'i dosyadan yükler"""
+        import faiss
+
+        try:
+            if not self.index_file.exists():
+                return False
+
+            logger.info(f"Index yükleniyor ({self.name})...")
+
+            # FAISS index'i yükle (tip dosyanın kendisinde saklıdır, arama parametreleri yeniden ayarlanır)
+            self.index = faiss.read_index(str(self.index_file))
+            enable_reconstruct(self.index)
+            configure_search(self.index)
+
+            # ID eşlemeli index'lerde satır -> id eşlemesi (eski düz index'lerde id == satır)
+            self.set_row_ids(np.load(self.ids_file) if self.ids_file.exists() else None)
+
+            if store_exists(self.documents_store) and store_exists(self.metadata_store):
+                # Sadece aramanın döndürdüğü satırlar materialize edilir
+                self.documents = RecordStore(self.documents_store)
+                self.metadata = RecordStore(self.metadata_store,
+                                            decode=lambda record: expand_record(record, self.full_data_fields))
+            else:
+                logger.warning("Kayıt deposu bulunamadı, eski pickle dosyaları okunuyor "
+                               "(--migrate ile dönüştürülebilir)")
+                self.documents, self.metadata = self.load_pickles()
+
+            # Index hash'lenmiş TF-IDF ile kurulduysa sorgular da aynı vektörleştiriciyle encode edilir
+            self.vectorizer = None
+            if self.vectorizer_file.exists():
+                vectorizer = HashingTfidfVectorizer.load(self.vectorizer_file)
+                if vectorizer.dimension == self.index.d:
+                    self.vectorizer = vectorizer
+
+            self._load_extras()
+
+            logger.info(f"Index yüklendi: {self.index.ntotal} vektör ({index_type_of(self.index)})")
+            return True
+
+        except Exception as e:
+            logger.error(f"Index yükleme hatası ({self.name}): {e}")
+            return False
+
+    def _load_extras(self):
+        """Alt sınıfların ek dosyaları için (load_index sonunda çağrılır)"""
+
+    def load_pickles(self) -> Tuple[List[str], List[Dict[str, Any]]]:
+        """Eski documents/metadata pickle dosyalarını okur"""
+        import pickle
+
+        with open(self.documents_file, 'rb') as f:
+            documents = pickle.load(f)
+
+        with open(self.metadata_file, 'rb') as f:
+            metadata = pickle.load(f)
+
+        return documents, metadata
+
+    def migrate_pickles(self) -> bool:
+        """Eski pickle dosyalarını mmap kayıt depolarına dönüştürür"""
+        if not (self.documents_file.exists() and self.metadata_file.exists()):
+            logger.error("Dönüştürülecek pickle dosyası bulunamadı")
+            return False
+
+        migrate_pickle(self.documents_file, self.documents_store)
+        migrate_pickle(self.metadata_file, self.metadata_store,
+                       transform=lambda meta: compact_record(meta, self.full_data_fields))
+
+        logger.info(f"Pickle dönüştürme tamamlandı ({self.name})")
+        return True
+
+    def _encode_queries(self, queries: List[str],
+                        query_embeddings: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """Sorguları index ile aynı uzayda encode eder (mümkün değilse None)
+
+        query_embeddings: VectorStore'un tüm koleksiyonlar için bir kez hesapladığı model vektörleri
+        """
+        if query_embeddings is not None and query_embeddings.shape[1] == self.index.d:
+            return query_embeddings
+
+        embeddings = self.encoder.encode_queries(queries)
+        if embeddings is None:
+            if self.vectorizer is None:
+                return None
+            embeddings = self.vectorizer.transform(queries)
+
+        embeddings = np.asarray(embeddings, dtype='float32')
+        if embeddings.shape[1] != self.index.d:
+            logger.warning(f"Sorgu boyutu ({embeddings.shape[1]}) index boyutu ({self.index.d}) ile uyuşmuyor")
+            return None
+        return embeddings
+
+    def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
+        """Arama yapar"""
+        return self.search_batch([query], k)[0]
+
+    def search_batch(self, queries: List[str], k: int = 5,
+                     query_embeddings: Optional[np.ndarray] = None) -> List[List[Dict[str, Any]]]:
+        """Birden çok sorguyu tek encode ve tek index araması ile yapar"""
+        if self.index is None:
+            logger.error("Index yüklenmemiş!")
+            return [[] for _ in queries]
+
+        if not queries:
+            return []
+
+        query_embeddings = self._encode_queries(queries, query_embeddings)
+        if query_embeddings is None:
+            logger.error(f"Sorgular index ile aynı uzayda encode edilemiyor ({self.name})")
+            return [[] for _ in queries]
+
+        return self._vector_search(self.index, query_embeddings, k)
+
+    def _vector_search(self, index: Any, query_embeddings: np.ndarray, k: int) -> List[List[Dict[str, Any]]]:
+        """Tüm sorgular için tek matris araması yapar"""
+        distances, ids = index.search(query_embeddings, min(k, index.ntotal))
+        return [self._build_results(row_distances, row_ids)
+                for row_distances, row_ids in zip(distances, ids)]
+
+    def _build_results(self, distances: np.ndarray, ids: np.ndarray) -> List[Dict[str, Any]]:
+        """Tek sorgunun FAISS çıktısını sonuç listesine çevirir"""
+        results = []
+        for i, (distance, idx) in enumerate(zip(distances, self._ids_to_rows(ids))):
+            # k > ntotal olduğunda FAISS -1 döner
+            if 0 <= idx < len(self.metadata):
+                results.append({
+                    'rank': i + 1,
+                    'distance': float(distance),
+                    'similarity': float(1 / (1 + distance)),
+                    'document': self.documents[idx],
+                    'metadata': self.metadata[idx]
+                })
+
+        return results
+
+
+class VectorStore:
+    """Tek encoder'ı paylaşan adlandırılmış koleksiyonlar"""
+
+    def __init__(self, index_dir: str = "faiss_index", model: Any = None):
+        self.encoder = SharedEncoder(index_dir, model)
+        self.collections: Dict[str, VectorCollection] = {}
+        self.loaded: Dict[str, bool] = {}
+
+    def register(self, collection: VectorCollection, name: Optional[str] = None) -> VectorCollection:
+        """Koleksiyonu ekler; modeli tekrar yüklenmesin diye deponun encoder'ına bağlar"""
+        collection.encoder = self.encoder
+        self.collections[name or collection.name] = collection
+        return collection
+
+    def get(self, name: str) -> VectorCollection:
+        if name not in self.collections:
+            raise ValueError(f"Bilinmeyen koleksiyon: {name}")
+        return self.collections[name]
+
+    def is_loaded(self, name: str) -> bool:
+        return self.loaded.get(name, False)
+
+    def load_all(self) -> Dict[str, bool]:
+        """Tüm koleksiyonların index'lerini yükler"""
+        for name, collection in self.collections.items():
+            self.loaded[name] = collection.load_index()
+        return dict(self.loaded)
+
+    def search_all(self, queries: List[str], k: int = 5,
+                   names: Optional[List[str]] = None) -> Dict[str, List[List[Dict[str, Any]]]]:
+        """Sorguları bir kez encode edip yüklü koleksiyonların hepsinde arar"""
+        names = [name for name in (names or self.collections) if self.is_loaded(name)]
+        query_embeddings = self.encoder.encode_queries(queries) if queries and names else None
+        return {name: self.collections[name].search_batch(queries, k, query_embeddings=query_embeddings)
+                for name in names}
+
+    def stats(self) -> Dict[str, Any]:
+        """Koleksiyon boyutları ve paylaşılan sorgu önbelleği sayaçları"""
+        stats: Dict[str, Any] = {
+            'collections': {
+                name: {
+                    'loaded': self.is_loaded(name),
+                    'vectors': int(collection.index.ntotal) if collection.index is not None else 0,
+                    'result_cache': collection.result_cache.stats(),
+                    'pagination': collection.pager.stats()
+                }
+                for name, collection in self.collections.items()
+            }
+        }
+        if self.encoder._model_loaded and self.encoder.embedding_cache is not None:
+            stats['embedding_cache'] = self.encoder.embedding_cache.stats()
+        return stats